@@ -0,0 +1,48 @@
+"""
+Time grouping the terms of a large PauliSum into commuting sets, compared with the previous
+implementation which checked each term against the terms of each set in Python.
+
+Run from the top-level directory with::
+
+    python benchmarks/commuting_sets.py [n_terms] [n_qubits]
+"""
+import sys
+import warnings
+
+import numpy as np
+
+from pauli_table import random_pauli_sum, timed
+
+from pyquil.paulis import commuting_sets
+
+
+def python_commuting_sets(pauli_sum):
+    def commutes(p1, p2):
+        return sum(p1[q] != p2[q] for q in set(p1._ops) & set(p2._ops)) % 2 == 0
+
+    groups = []
+    for term in pauli_sum:
+        for group in groups:
+            if all(commutes(other, term) for other in group):
+                group.append(term)
+                break
+        else:
+            groups.append([term])
+    return groups
+
+
+if __name__ == '__main__':
+    n_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    warnings.simplefilter('ignore')
+    pauli_sum = random_pauli_sum(np.random.RandomState(0), n_terms, n_qubits, max_weight=8)
+
+    expected, python_time = timed(python_commuting_sets, pauli_sum)
+    print(f"{'python':>30}: {python_time:7.3f} s, {len(expected)} sets")
+    for qubitwise in [False, True]:
+        for strategy in ['sequential', 'largest_first']:
+            groups, elapsed = timed(lambda: commuting_sets(pauli_sum, qubitwise, strategy))
+            if not qubitwise and strategy == 'sequential':
+                assert groups == expected
+            print(f"{'qubitwise' if qubitwise else 'full':>10} {strategy:>19}: {elapsed:7.3f} s, "
+                  f"{len(groups)} sets")
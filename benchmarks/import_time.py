@@ -0,0 +1,42 @@
+"""
+Measure the time taken by ``import pyquil`` with ``python -X importtime``, and list the slowest
+modules it imports.
+
+Run from the top-level directory with::
+
+    python benchmarks/import_time.py [module] [n_slowest]
+
+The script exits with an error if one of the dependencies which should only be imported on
+first use (e.g. the clients of the QVM and quilc) is imported.
+"""
+import subprocess
+import sys
+
+# Dependencies which `import pyquil` must not import.
+LAZY_MODULES = ['requests', 'rpcq', 'zmq', 'networkx', 'antlr4', 'pyquil.api',
+                'pyquil.operator_estimation', 'pyquil._parser.PyQuilListener']
+
+
+def import_times(module: str):
+    """The cumulative import time in microseconds of each module imported by ``module``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+if __name__ == '__main__':
+    module = sys.argv[1] if len(sys.argv) > 1 else 'pyquil'
+    n_slowest = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    times = import_times(module)
+    print(f"import {module}: {times[module] / 1e6:.3f} s, {len(times)} modules")
+    for name, time in sorted(times.items(), key=lambda item: -item[1])[1:n_slowest + 1]:
+        print(f"{time / 1e6:8.3f} s  {name}")
+
+    imported = [name for name in LAZY_MODULES if name in times]
+    if imported:
+        sys.exit(f"These modules should be imported on first use: {', '.join(imported)}")
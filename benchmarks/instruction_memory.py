@@ -0,0 +1,42 @@
+"""
+Measure the memory used per instruction by a long program.
+
+Run from the top-level directory with::
+
+    python benchmarks/instruction_memory.py [n_instructions]
+"""
+import sys
+import tracemalloc
+
+import numpy as np
+
+from pyquil import Program
+from pyquil.gates import CNOT, H, MEASURE, RX
+from pyquil.quilatom import MemoryReference
+
+
+def build_program(n_instructions: int) -> Program:
+    """A Trotter-like sequence of parametric rotations and entanglers on 20 qubits."""
+    prog = Program()
+    theta = MemoryReference('theta', declared_size=n_instructions)
+    for i in range(n_instructions // 4):
+        q = i % 20
+        prog += H(q)
+        prog += RX(0.25 * np.pi, q)
+        prog += RX(theta[i], (q + 1) % 20)
+        prog += CNOT(q, (q + 1) % 20)
+    return prog
+
+
+def bytes_per_instruction(n_instructions: int) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    prog = build_program(n_instructions)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(prog)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{bytes_per_instruction(n):.0f} bytes per instruction ({n} instructions)")
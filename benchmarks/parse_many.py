@@ -0,0 +1,43 @@
+"""
+Compare parsing many Quil files one after the other with parsing them in a pool of processes.
+
+Run from the top-level directory with::
+
+    python benchmarks/parse_many.py [n_programs] [workers] [chunksize]
+"""
+import gc
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+from parser import native_quil
+
+from pyquil.parser import clear_parse_cache, parse_many, parse_program
+
+
+def timed(f, *args, **kwargs):
+    gc.collect()
+    clear_parse_cache()
+    start = time.perf_counter()
+    result = f(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(n):
+            paths.append(pathlib.Path(directory) / f'{i}.quil')
+            # programs of 100 to 500 instructions which are all different
+            paths[-1].write_text(native_quil(100 + i % 400).replace('RX(pi/2) 0', f'RX({i}) 0'))
+
+        serial, serial_time = timed(lambda: [parse_program(path.read_text()) for path in paths])
+        parallel, parallel_time = timed(parse_many, paths, workers=workers, chunksize=chunksize)
+        assert parallel == serial
+        print(f"serial: {serial_time:6.2f} s, {workers} workers: {parallel_time:6.2f} s "
+              f"({n} programs)")
@@ -0,0 +1,61 @@
+"""
+Compare the ANTLR parser with the fast parser on native Quil like the output of the compiler,
+and on a program alternating between lines the fast parser supports and lines it leaves to the
+ANTLR parser.
+
+Run from the top-level directory with::
+
+    python benchmarks/parser.py [n_instructions]
+"""
+import gc
+import sys
+import time
+
+import numpy as np
+
+from pyquil._parser.PyQuilListener import run_parser
+from pyquil._parser.fast_parser import iter_fast_parser, run_fast_parser
+
+
+def native_quil(n_instructions: int) -> str:
+    """Rotations and CZs on 20 qubits, with the header and measurements the compiler adds."""
+    rs = np.random.RandomState(52)
+    lines = ['PRAGMA EXPECTED_REWIRING "#(0 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19)"',
+             'DECLARE ro BIT[20]', 'DECLARE theta REAL[20]']
+    for i in range(n_instructions // 4):
+        q = i % 20
+        lines.append(f'RZ({rs.uniform(-np.pi, np.pi)}) {q}')
+        lines.append(f'RX(pi/2) {q}')
+        lines.append(f'RZ(-1.0*theta[{q}]) {q}')
+        lines.append(f'CZ {q} {(q + 1) % 20}')
+    lines += [f'MEASURE {q} ro[{q}]' for q in range(20)]
+    lines.append('PRAGMA CURRENT_REWIRING "#(0 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19)"')
+    return '\n'.join(lines) + '\n'
+
+
+def mixed_quil(n_instructions: int) -> str:
+    """Gates alternating with classical instructions, which the fast parser doesn't support."""
+    return 'DECLARE x INTEGER\n' + 'H 0\nADD x 1\n' * (n_instructions // 2)
+
+
+def timed(f, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    quil = native_quil(n)
+    fast, fast_time = timed(run_fast_parser, quil)
+    antlr, antlr_time = timed(run_parser, quil)
+    assert fast == antlr
+    print(f"ANTLR: {antlr_time:6.2f} s, fast: {fast_time:6.2f} s ({len(fast)} instructions)")
+
+    quil = mixed_quil(n // 4)
+    fast, fast_time = timed(lambda: list(iter_fast_parser(quil.splitlines())))
+    antlr, antlr_time = timed(run_parser, quil)
+    assert fast == antlr
+    print(f"mixed ANTLR: {antlr_time:6.2f} s, line by line: {fast_time:6.2f} s "
+          f"({len(fast)} instructions)")
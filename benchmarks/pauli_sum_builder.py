@@ -0,0 +1,42 @@
+"""
+Compare building a Hamiltonian by adding terms to a PauliSum one at a time with accumulating them
+in a PauliSumBuilder.
+
+Run from the top-level directory with::
+
+    python benchmarks/pauli_sum_builder.py [n_terms] [n_qubits]
+"""
+import sys
+import warnings
+
+import numpy as np
+
+from pauli_table import random_pauli_sum, timed
+
+from pyquil.paulis import PauliSumBuilder, ZERO
+
+
+def add_to_pauli_sum(terms):
+    hamiltonian = ZERO()
+    for term in terms:
+        hamiltonian += term
+    return hamiltonian
+
+
+def add_to_builder(terms):
+    builder = PauliSumBuilder()
+    for term in terms:
+        builder += term
+    return builder.build()
+
+
+if __name__ == '__main__':
+    n_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    warnings.simplefilter('ignore')
+    terms = random_pauli_sum(np.random.RandomState(0), n_terms, n_qubits, max_weight=4).terms
+    expected, pauli_sum_time = timed(add_to_pauli_sum, terms)
+    actual, builder_time = timed(add_to_builder, terms)
+    assert actual == expected
+    print(f"PauliSum +=: {pauli_sum_time:7.3f} s, PauliSumBuilder +=: {builder_time:7.3f} s "
+          f"({n_terms} terms, {len(actual)} after simplification)")
@@ -0,0 +1,55 @@
+"""
+Compare products, commutators and simplification of PauliSums with those of PauliTables.
+
+Run from the top-level directory with::
+
+    python benchmarks/pauli_table.py [n_terms] [n_qubits]
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from pyquil.paulis import PauliSum, PauliTable, PauliTerm
+
+
+def random_pauli_sum(random_state, n_terms, n_qubits, max_weight=6):
+    terms = []
+    for _ in range(n_terms):
+        qubits = random_state.choice(n_qubits, random_state.randint(1, max_weight + 1),
+                                     replace=False)
+        terms.append(PauliTerm.from_list([(random_state.choice(list('XYZ')), int(q))
+                                          for q in qubits], random_state.normal()))
+    return PauliSum(terms)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    warnings.simplefilter('ignore')
+    random_state = np.random.RandomState(0)
+    a = random_pauli_sum(random_state, n_terms, n_qubits)
+    b = random_pauli_sum(random_state, n_terms, n_qubits)
+    (table_a, table_b), conversion_time = timed(
+        lambda: (PauliTable.from_pauli_sum(a), PauliTable.from_pauli_sum(b)))
+    print(f"conversion to PauliTable: {conversion_time:6.3f} s")
+    long_sum = PauliSum(a.terms * 100)
+    long_table = PauliTable.from_pauli_sum(long_sum)
+
+    for name, sums, tables in [
+        ('product', lambda: a * b, lambda: table_a * table_b),
+        ('commutator', lambda: a * b - b * a, lambda: table_a.commutator(table_b)),
+        ('simplify', long_sum.simplify, long_table.simplify),
+    ]:
+        expected, sum_time = timed(sums)
+        actual, table_time = timed(tables)
+        assert actual.to_pauli_sum() == expected
+        print(f"{name:>10}: PauliSum {sum_time:7.3f} s, PauliTable {table_time:7.3f} s "
+              f"({len(expected)} terms)")
@@ -0,0 +1,66 @@
+"""
+Compare saving and loading a long program as Quil text and in pyQuil's binary format.
+
+Run from the top-level directory with::
+
+    python benchmarks/program_serialization.py [n_instructions]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from pyquil import Program
+from pyquil.gates import CNOT, H, MEASURE, RX, RZ
+from pyquil.parser import parse_program
+
+
+def build_program(n_instructions: int) -> Program:
+    """Layers of rotations and entanglers on 20 qubits, followed by measurements."""
+    prog = Program()
+    theta = prog.declare('theta', 'REAL', 20)
+    ro = prog.declare('ro', 'BIT', 20)
+    rs = np.random.RandomState(52)
+    for i in range(n_instructions // 4):
+        q = i % 20
+        prog += H(q)
+        prog += RX(float(rs.rand()), q)
+        prog += RZ(2 * theta[q], (q + 1) % 20)
+        prog += CNOT(q, (q + 1) % 20)
+    prog += [MEASURE(q, ro[q]) for q in range(20)]
+    return prog
+
+
+def timed(f, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+def save_text(prog: Program, path: str):
+    with open(path, 'w') as f:
+        f.write(prog.out())
+
+
+def load_text(path: str) -> Program:
+    with open(path) as f:
+        return parse_program(f.read())
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    prog = build_program(n)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, save, load in [('text', save_text, load_text),
+                                 ('binary', Program.dump, Program.load)]:
+            path = os.path.join(directory, name)
+            # serialize a fresh copy so that out() isn't already cached
+            _, save_time = timed(save, build_program(n), path)
+            loaded, load_time = timed(load, path)
+            assert loaded == prog
+            print(f"{name:>6}: save {save_time:6.2f} s, load {load_time:6.2f} s, "
+                  f"{os.path.getsize(path) / 1e6:6.2f} MB ({len(prog)} instructions)")
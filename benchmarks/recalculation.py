@@ -0,0 +1,58 @@
+"""
+Time the evaluation of the gate parameter arithmetic in the recalculation table of a QPU
+executable, for a table with many entries, and of a matrix of expressions over a parameter sweep.
+
+Run from the top-level directory with::
+
+    python benchmarks/recalculation.py [n_entries] [n_runs]
+"""
+import sys
+import time
+
+import numpy as np
+from rpcq.messages import BinaryExecutableResponse, ParameterAref, ParameterSpec
+
+from pyquil.api import QPU
+from pyquil.quilatom import Parameter, quil_cos, quil_sin, substitute, substitute_array
+
+
+def recalculation_table(n):
+    return {ParameterAref(name='__P', index=i): f'{i % 7 + 1}*theta[{i % 10}] + COS(beta[{i % 3}])/2'
+            for i in range(n)}
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    executable = BinaryExecutableResponse(program='', memory_descriptors={
+        'theta': ParameterSpec(type='REAL', length=10),
+        'beta': ParameterSpec(type='REAL', length=3),
+        '__P': ParameterSpec(type='REAL', length=n),
+    })
+    executable.recalculation_table = recalculation_table(n)
+    qpu = QPU(endpoint='tcp://not-needed:00000')
+
+    start = time.perf_counter()
+    qpu.load(executable)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for run in range(n_runs):
+        qpu.write_memory(region_name='theta', offset=run % 10, value=run / n_runs)
+        qpu._build_patch_values()
+    run_time = (time.perf_counter() - start) / n_runs
+    print(f"load: {load_time:6.3f} s, patch values: {run_time * 1000:6.2f} ms per run "
+          f"({n} recalculation table entries)")
+
+    x = Parameter('x')
+    matrix = np.array([[quil_cos(x / 2), -1j * quil_sin(x / 2)],
+                       [-1j * quil_sin(x / 2), quil_cos(x / 2)]])
+    angles = np.linspace(0, 2 * np.pi, 10000)
+    start = time.perf_counter()
+    expected = [np.array([substitute(v, {x: angle}) for v in matrix.flat]) for angle in angles]
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = substitute_array(matrix, {x: angles})
+    sweep_time = time.perf_counter() - start
+    assert np.allclose(actual.reshape(4, -1).T, expected)
+    print(f"substitute in a loop: {loop_time:6.3f} s, substitute_array over the sweep: "
+          f"{sweep_time:6.3f} s ({len(angles)} values)")
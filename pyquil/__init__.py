@@ -1,4 +1,38 @@
 __version__ = "2.9.1"
 
+import importlib
+import sys
+
 from pyquil.quil import Program
-from pyquil.api import list_quantum_computers, get_qc
+
+# Names which are imported from pyquil.api on first use, since it depends on the clients of the QVM
+# and quilc, which take a while to import.
+_API_NAMES = ('list_quantum_computers', 'get_qc')
+
+
+def _import_module(module_name, name):
+    try:
+        return importlib.import_module(module_name)
+    except AttributeError as e:
+        # `from pyquil import name` would report an AttributeError as a missing name
+        raise ImportError("error while importing {!r} from {!r}: {}".format(name, __name__, e)) from e
+
+
+def __getattr__(name):
+    if name in _API_NAMES:
+        value = getattr(_import_module('pyquil.api', name), name)
+        globals()[name] = value
+        return value
+    # submodules such as pyquil.api used to be imported with this package, and still can be
+    # accessed as its attributes
+    try:
+        return _import_module('{}.{}'.format(__name__, name), name)
+    except ModuleNotFoundError as e:
+        if e.name != '{}.{}'.format(__name__, name):
+            raise
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # module-level __getattr__ is only supported from Python 3.7
+    from pyquil.api import list_quantum_computers, get_qc
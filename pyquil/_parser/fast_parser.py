@@ -0,0 +1,422 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+A hand-written parser for the common subset of Quil, which is much faster than the ANTLR parser.
+
+Each line of a program is matched against a few regular expressions covering gate applications
+(with modifiers and parameters made of numbers, memory references, variables and arithmetic),
+MEASURE, DECLARE, PRAGMA, RESET, WAIT, HALT, NOP, labels and jumps, and the corresponding
+instructions are built the same way as in :py:class:`PyQuilListener`. Consecutive lines which
+aren't recognized, such as gate definitions or classical instructions, are parsed with the ANTLR
+parser on their own, and the line numbers of its errors are shifted to the line of the program.
+If parsing a string fails, the whole string is parsed again with the ANTLR parser.
+
+Since lines are parsed one at a time, :py:func:`iter_fast_parser` can parse a program from a
+file without reading all of it in memory.
+"""
+import operator
+import re
+from typing import Any, Iterable, Iterator, List, Optional
+
+import numpy as np
+from numpy.ma import sin, cos, sqrt, exp
+
+from pyquil.gates import QUANTUM_GATES
+from pyquil.parameters import Parameter
+from pyquil.quilatom import (Expression, Label, MemoryReference, Qubit, quil_cis, quil_cos, quil_exp,
+                             quil_sin, quil_sqrt)
+from pyquil.quilbase import (AbstractInstruction, Declare, Gate, Halt, Jump, JumpTarget, JumpUnless,
+                             JumpWhen, Measurement, Nop, Pragma, Reset, ResetQubit, Wait)
+
+# The keywords of the Quil lexer, which can't be used as identifiers.
+_KEYWORDS = frozenset([
+    'DEFGATE', 'DEFCIRCUIT', 'MEASURE', 'LABEL', 'HALT', 'JUMP', 'JUMP-WHEN', 'JUMP-UNLESS',
+    'RESET', 'WAIT', 'NOP', 'INCLUDE', 'PRAGMA', 'DECLARE', 'SHARING', 'OFFSET', 'AS', 'MATRIX',
+    'PERMUTATION', 'NEG', 'NOT', 'TRUE', 'FALSE', 'AND', 'IOR', 'XOR', 'OR', 'ADD', 'SUB', 'MUL',
+    'DIV', 'MOVE', 'EXCHANGE', 'CONVERT', 'EQ', 'GT', 'GE', 'LT', 'LE', 'LOAD', 'STORE', 'pi',
+    'i', 'SIN', 'COS', 'SQRT', 'EXP', 'CIS', 'CONTROLLED', 'DAGGER'])
+
+_IDENTIFIER = r'[A-Za-z_](?:[A-Za-z0-9\-_]*[A-Za-z0-9_])?'
+_ADDR = r'({0})(?: *\[ *([0-9]+) *\])?'.format(_IDENTIFIER)
+
+_GATE = re.compile(r' *((?:(?:CONTROLLED|DAGGER) +)*)({0})(?: *\((.*)\) *| +)([0-9]+(?: +[0-9]+)*) *$'
+                   .format(_IDENTIFIER))
+_MEASURE = re.compile(r' *MEASURE +([0-9]+)(?: +{0})? *$'.format(_ADDR))
+_DECLARE = re.compile(r' *DECLARE +({0}) +({0})(?: *\[ *([0-9]+) *\])?((?: +SHARING +{0}(?: +OFFSET +[0-9]+ +{0})*)?) *$'
+                      .format(_IDENTIFIER))
+_OFFSET = re.compile(r'OFFSET +([0-9]+) +({0})'.format(_IDENTIFIER))
+_PRAGMA = re.compile(r' *PRAGMA +({0})((?: +(?:{0}|[0-9]+))*)(?: *"(.*)")? *$'.format(_IDENTIFIER))
+_RESET = re.compile(r' *RESET(?: +([0-9]+))? *$')
+_LABEL = re.compile(r' *(LABEL|JUMP) +@({0}) *$'.format(_IDENTIFIER))
+_CONDITIONAL_JUMP = re.compile(r' *(JUMP-WHEN|JUMP-UNLESS) +@({0}) +{1} *$'.format(_IDENTIFIER, _ADDR))
+_NO_OPERANDS = {'HALT': Halt, 'WAIT': Wait, 'NOP': Nop}
+
+_TOKEN = re.compile(r' *(?:([0-9]+(?:\.[0-9]+)?(?:[eE][+\-]?[0-9]+)?)|({0})|(.))'.format(_IDENTIFIER))
+
+# The number of consecutive lines left to the ANTLR parser after which they are parsed as soon as
+# an instruction starts, which bounds the memory used by iter_fast_parser.
+_MAX_UNSUPPORTED_LINES = 1000
+_IDENTIFIER_START = re.compile(r'[A-Za-z_]')
+# The number of runs of lines left to the ANTLR parser after which run_fast_parser parses the whole
+# program with the ANTLR parser, if at least one line in _MAX_FALLBACK_DENSITY starts such a run.
+_MAX_FALLBACK_RUNS = 16
+_MAX_FALLBACK_DENSITY = 4
+# The position of syntax errors in the messages of the ANTLR parser.
+_ERROR_LINE = re.compile(r'(?<=^Error encountered while parsing the quil program )at line ([0-9]+)')
+
+_BINARY_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul,
+                     '/': operator.truediv}
+
+# The functions of gate parameters, applied to expressions and to numbers as in PyQuilListener.
+_FUNCTIONS = {'SIN': (quil_sin, sin), 'COS': (quil_cos, cos), 'SQRT': (quil_sqrt, sqrt),
+              'EXP': (quil_exp, exp), 'CIS': (quil_cis, lambda x: cos(x) + complex(0, 1) * sin(x))}
+
+
+class _Unsupported(Exception):
+    """Raised when a line isn't in the subset of Quil understood by the fast parser."""
+
+
+class _ExpressionParser:
+    """
+    A recursive descent parser for gate parameters, which follows the precedence rules of the
+    Quil grammar: signs bind tighter than powers, which are right associative and bind tighter
+    than products, which bind tighter than sums.
+    """
+
+    def __init__(self, text: str):
+        # each token is a pair of a kind (number, identifier or operator) and its text
+        self.tokens = []
+        for number, identifier, other in _TOKEN.findall(text):
+            if number:
+                self.tokens.append(('number', number))
+            elif identifier:
+                self.tokens.append(('identifier', identifier))
+            elif other and other != ' ':
+                self.tokens.append(('operator', other))
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return None
+
+    def take(self):
+        if self.position == len(self.tokens):
+            raise _Unsupported()
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def expect(self, text: str):
+        if self.take()[1] != text:
+            raise _Unsupported()
+
+    def params(self) -> List[Any]:
+        params = [self.sum()]
+        while self.peek() == ',':
+            self.take()
+            params.append(self.sum())
+        if self.peek() is not None:
+            raise _Unsupported()
+        return params
+
+    def sum(self):
+        value = self.product()
+        while self.peek() in ('+', '-'):
+            value = _BINARY_OPERATORS[self.take()[1]](value, self.product())
+        return value
+
+    def product(self):
+        value = self.power()
+        while self.peek() in ('*', '/'):
+            value = _BINARY_OPERATORS[self.take()[1]](value, self.power())
+        return value
+
+    def power(self):
+        value = self.signed()
+        if self.peek() == '^':
+            self.take()
+            return operator.pow(value, self.power())
+        return value
+
+    def signed(self):
+        if self.peek() == '-':
+            self.take()
+            return -1 * self.signed()
+        if self.peek() == '+':
+            self.take()
+            return self.signed()
+        return self.atom()
+
+    def atom(self):
+        kind, text = self.take()
+        if kind == 'number':
+            value = float(text) if text.strip('0123456789') else int(text)
+            if self.peek() == 'i':
+                self.take()
+                return complex(0, value)
+            return value
+        if kind == 'identifier':
+            if text == 'pi':
+                return np.pi
+            if text == 'i':
+                return complex(0, 1)
+            if text in _FUNCTIONS and self.peek() == '(':
+                self.take()
+                argument = self.sum()
+                self.expect(')')
+                expression_function, number_function = _FUNCTIONS[text]
+                if isinstance(argument, Expression):
+                    return expression_function(argument)
+                return number_function(argument)
+            if text in _KEYWORDS:
+                raise _Unsupported()
+            if self.peek() == '[':
+                self.take()
+                kind, offset = self.take()
+                if kind != 'number' or offset.strip('0123456789'):
+                    raise _Unsupported()
+                self.expect(']')
+                return MemoryReference(text, int(offset))
+            return MemoryReference(text, 0)
+        if text == '%':
+            kind, name = self.take()
+            if kind != 'identifier' or name in _KEYWORDS:
+                raise _Unsupported()
+            return Parameter(name)
+        if text == '(':
+            value = self.sum()
+            self.expect(')')
+            return value
+        raise _Unsupported()
+
+
+def _identifier(text: str) -> str:
+    if text in _KEYWORDS:
+        raise _Unsupported()
+    return text
+
+
+def _addr(name: str, offset: str) -> MemoryReference:
+    return MemoryReference(_identifier(name), int(offset) if offset else 0)
+
+
+def _parse_gate(match) -> Gate:
+    modifiers, name, params, qubits = match.groups()
+    _identifier(name)
+    params = _ExpressionParser(params).params() if params is not None else []
+    qubits = [Qubit(int(q)) for q in qubits.split()]
+    # the same as PyQuilListener.exitGate
+    modifiers = modifiers.split()[::-1]
+    control_qubits = qubits[0:modifiers.count('CONTROLLED')][::-1]
+    target_qubits = qubits[len(control_qubits):]
+
+    if name in QUANTUM_GATES:
+        if params:
+            gate = QUANTUM_GATES[name](*params, *target_qubits)
+        else:
+            gate = QUANTUM_GATES[name](*target_qubits)
+    else:
+        gate = Gate(name, params, target_qubits)
+
+    for modifier in modifiers:
+        if modifier == 'CONTROLLED':
+            gate.controlled(control_qubits.pop(0))
+        else:
+            gate.dagger()
+    return gate
+
+
+def _parse_line(line: str) -> Optional[AbstractInstruction]:
+    """
+    Parse a line of Quil without comments.
+
+    :param line: The line.
+    :return: The instruction, or None if the line is blank.
+    :raises _Unsupported: If the line isn't in the subset of Quil understood by the fast parser.
+    """
+    words = line.split(None, 1)
+    if not words:
+        return None
+    keyword = words[0]
+
+    if keyword not in _KEYWORDS or keyword in ('CONTROLLED', 'DAGGER'):
+        match = _GATE.match(line)
+        if match:
+            return _parse_gate(match)
+    elif keyword == 'MEASURE':
+        match = _MEASURE.match(line)
+        if match:
+            qubit, name, offset = match.groups()
+            return Measurement(Qubit(int(qubit)), _addr(name, offset) if name else None)
+    elif keyword == 'DECLARE':
+        match = _DECLARE.match(line)
+        if match:
+            name, memory_type, size, sharing = match.groups()
+            if sharing:
+                shared_region = _identifier(sharing.split()[1])
+                offsets = [(int(offset), _identifier(offset_type))
+                           for offset, offset_type in _OFFSET.findall(sharing)]
+            else:
+                shared_region = None
+                offsets = []
+            return Declare(_identifier(name), _identifier(memory_type),
+                           int(size) if size else 1, shared_region=shared_region,
+                           offsets=offsets)
+    elif keyword == 'PRAGMA':
+        match = _PRAGMA.match(line)
+        if match:
+            command, args, freeform_string = match.groups()
+            args = [arg if arg[0].isdigit() else _identifier(arg) for arg in args.split()]
+            if freeform_string is not None:
+                return Pragma(_identifier(command), args, freeform_string)
+            return Pragma(_identifier(command), args)
+    elif keyword == 'RESET':
+        match = _RESET.match(line)
+        if match:
+            qubit, = match.groups()
+            return ResetQubit(Qubit(int(qubit))) if qubit else Reset()
+    elif keyword in ('LABEL', 'JUMP'):
+        match = _LABEL.match(line)
+        if match:
+            keyword, label = match.groups()
+            label = Label(_identifier(label))
+            return JumpTarget(label) if keyword == 'LABEL' else Jump(label)
+    elif keyword in ('JUMP-WHEN', 'JUMP-UNLESS'):
+        match = _CONDITIONAL_JUMP.match(line)
+        if match:
+            keyword, label, name, offset = match.groups()
+            jump = JumpWhen if keyword == 'JUMP-WHEN' else JumpUnless
+            return jump(Label(_identifier(label)), _addr(name, offset))
+    elif keyword in _NO_OPERANDS and line.strip(' ') == keyword:
+        return _NO_OPERANDS[keyword]()
+    raise _Unsupported()
+
+
+def _run_parser(quil: str) -> List[AbstractInstruction]:
+    # the ANTLR runtime and the generated parser take a while to import, so they are only
+    # imported for programs which need them
+    from pyquil._parser.PyQuilListener import run_parser
+    return run_parser(quil)
+
+
+def _run_parser_at(lines: List[str], start: int) -> List[AbstractInstruction]:
+    """
+    Run the ANTLR parser on consecutive lines of a program starting at the line ``start``, and
+    shift the line number of syntax errors to the line of the whole program.
+    """
+    try:
+        return _run_parser('\n'.join(lines))
+    except RuntimeError as e:
+        message = _ERROR_LINE.sub(lambda match: 'at line {}'.format(int(match.group(1)) + start),
+                                  str(e), count=1)
+        raise RuntimeError(message) from None
+
+
+def _clean_line(line: str, last: bool) -> str:
+    """
+    Strip the comment and the trailing whitespace of a line, which the Quil lexer skips.
+    Four spaces and tabs anywhere else are significant to the lexer, so lines containing them
+    outside of a string are left to the ANTLR parser.
+    """
+    # a string extends from the first to the last quote of the line, and may contain a '#'
+    string_start, string_end = line.find('"'), line.rfind('"')
+    comment = line.find('#', string_end + 1)
+    if 0 <= line.find('#') < string_start:
+        comment = line.find('#')
+        string_start = -1
+    elif string_start == string_end != -1:
+        raise _Unsupported()
+    if comment >= 0:
+        line = line[:comment].rstrip(' \t')
+    elif not last:
+        line = line.rstrip(' \t')
+
+    outside = line if string_start < 0 else line[:string_start] + line[string_end + 1:]
+    if '\t' in outside or '    ' in outside:
+        raise _Unsupported()
+    return line
+
+
+def iter_fast_parser(lines: Iterable[str],
+                     max_fallback_runs: Optional[int] = None) -> Iterator[AbstractInstruction]:
+    """
+    Parse the lines of a Quil program one at a time, using the ANTLR parser only for the lines
+    which aren't in the subset of Quil understood by the fast parser.
+
+    Errors are reported with the line numbers of the whole program.
+
+    :param lines: the lines of a Quil program, with or without their line endings
+    :param max_fallback_runs: if given, the number of runs of lines left to the ANTLR parser after
+        which parsing stops with an error if they are too close together to be worth parsing
+        separately
+    :return: a generator of the instructions that were parsed
+    """
+    # consecutive lines left to the ANTLR parser, the index of the first one and the number of runs
+    unsupported = []  # type: List[str]
+    start = runs = 0
+    lines = iter(lines)
+    index, line = 0, next(lines, None)
+    while line is not None:
+        next_line = next(lines, None)
+        last = next_line is None and not line.endswith(('\n', '\r'))
+        line = line.rstrip('\r\n')
+        try:
+            instruction = _parse_line(_clean_line(line, last))
+        except Exception:
+            # a line starting with an identifier starts a new instruction, so a long run of
+            # unsupported lines can be parsed there without splitting a gate definition
+            if len(unsupported) >= _MAX_UNSUPPORTED_LINES and _IDENTIFIER_START.match(line):
+                yield from _run_parser_at(unsupported, start)
+                unsupported = []
+            if not unsupported:
+                start = index
+                runs += 1
+                if max_fallback_runs is not None and runs > max_fallback_runs \
+                        and runs * _MAX_FALLBACK_DENSITY > index:
+                    raise _Unsupported()
+            unsupported.append(line)
+        else:
+            if instruction is not None:
+                if unsupported:
+                    yield from _run_parser_at(unsupported, start)
+                    unsupported = []
+                yield instruction
+            elif unsupported:
+                # blank lines are kept in a run so that its lines keep their position
+                unsupported.append(line)
+        index, line = index + 1, next_line
+    if unsupported:
+        yield from _run_parser_at(unsupported, start)
+
+
+def run_fast_parser(quil: str) -> List[AbstractInstruction]:
+    """
+    Parse a Quil program, using the ANTLR parser only for the lines which aren't in the subset
+    of Quil understood by the fast parser.
+
+    The instructions are the same as the ones returned by :py:func:`run_parser`.
+
+    Programs in which many lines left to the ANTLR parser alternate with supported lines are
+    parsed with the ANTLR parser at once, which is faster than parsing each run of lines on its
+    own.
+
+    :param quil: a single or multiline Quil program
+    :return: list of instructions that were parsed
+    """
+    try:
+        return list(iter_fast_parser(re.split(r'\r\n|\r|\n', quil), _MAX_FALLBACK_RUNS))
+    except Exception:
+        return _run_parser(quil)
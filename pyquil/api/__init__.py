@@ -15,7 +15,12 @@
 ##############################################################################
 """
 Module for facilitating connections to the QVM / QPU.
+
+The classes and functions of this module are imported from its submodules on first use, since
+they depend on the clients of the QVM and quilc, which take a while to import.
 """
+import importlib
+import sys
 import warnings
 
 __all__ = ['QVMConnection', 'QVMCompiler', 'QPUCompiler',
@@ -24,24 +29,51 @@ __all__ = ['QVMConnection', 'QVMCompiler', 'QPUCompiler',
            'QAM', 'QVM', 'QPU', 'QPUConnection',
            'BenchmarkConnection', 'get_benchmarker']
 
-from pyquil.api._base_connection import ForestConnection
-from pyquil.api._benchmark import BenchmarkConnection, get_benchmarker
-from pyquil.api._compiler import QVMCompiler, QPUCompiler
-from pyquil.api._error_reporting import pyquil_protect
-from pyquil.api._job import Job
-from pyquil.api._qam import QAM
-from pyquil.api._qpu import QPU
-from pyquil.api._quantum_computer import QuantumComputer, list_quantum_computers, get_qc, local_qvm
-from pyquil.api._qvm import QVMConnection, QVM
-from pyquil.api._wavefunction_simulator import WavefunctionSimulator
-from pyquil.device import Device
+# The module defining each name exported by this module.
+_LAZY_IMPORTS = {
+    'ForestConnection': 'pyquil.api._base_connection',
+    'BenchmarkConnection': 'pyquil.api._benchmark',
+    'get_benchmarker': 'pyquil.api._benchmark',
+    'QVMCompiler': 'pyquil.api._compiler',
+    'QPUCompiler': 'pyquil.api._compiler',
+    'pyquil_protect': 'pyquil.api._error_reporting',
+    'Job': 'pyquil.api._job',
+    'QAM': 'pyquil.api._qam',
+    'QPU': 'pyquil.api._qpu',
+    'QPUConnection': 'pyquil.api._qpu',
+    'QuantumComputer': 'pyquil.api._quantum_computer',
+    'list_quantum_computers': 'pyquil.api._quantum_computer',
+    'get_qc': 'pyquil.api._quantum_computer',
+    'local_qvm': 'pyquil.api._quantum_computer',
+    'QVMConnection': 'pyquil.api._qvm',
+    'QVM': 'pyquil.api._qvm',
+    'SyncConnection': 'pyquil.api._qvm',
+    'WavefunctionSimulator': 'pyquil.api._wavefunction_simulator',
+    'Device': 'pyquil.device',
+}
 
 
-class SyncConnection(QVMConnection):
-    def __init__(self, *args, **kwargs):
-        warnings.warn("SyncConnection has been renamed to QVMConnection and will be removed in the future",
-                      stacklevel=2)
-        super(SyncConnection, self).__init__(*args, **kwargs)
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    try:
+        module = importlib.import_module(_LAZY_IMPORTS[name])
+    except AttributeError as e:
+        # `from pyquil.api import name` would report an AttributeError as a missing name
+        raise ImportError("error while importing {!r} from {!r}: {}".format(name, __name__, e)) from e
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+if sys.version_info < (3, 7):
+    # module-level __getattr__ is only supported from Python 3.7
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
 
 
 class JobConnection(object):
@@ -64,12 +96,3 @@ with just this:
     result = qvm.run(program, ...)
 
 For more information see https://go.rigetti.com/connections\n""")
-
-
-class QPUConnection(QPU):
-    def __init__(self, *args, **kwargs):
-        warnings.warn("QPUConnection's semantics have changed for Forest 2. Consider using "
-                      "pyquil.get_qc('...') instead of creating this object directly. "
-                      "Please consult the migration guide for full details.",
-                      DeprecationWarning)
-        super(QPU, self).__init__(*args, **kwargs)
@@ -15,7 +15,7 @@
 ##############################################################################
 import uuid
 import warnings
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 from rpcq import Client
@@ -25,7 +25,7 @@ from pyquil import Program
 from pyquil.parser import parse
 from pyquil.api._qam import QAM
 from pyquil.api._error_reporting import _record_call
-from pyquil.quilatom import MemoryReference, BinaryExp, Function, Parameter, Expression
+from pyquil.quilatom import CompiledExpressions, MemoryReference, Expression
 
 
 def decode_buffer(buffer: dict) -> np.ndarray:
@@ -95,6 +95,7 @@ support at support@rigetti.com.""")
         self.client = Client(endpoint)
         self.user = user
         self._last_results: Dict[str, np.ndarray] = {}
+        self._recalculation: Optional[CompiledExpressions] = None
         self.priority = priority
 
     def get_version_info(self) -> dict:
@@ -108,20 +109,23 @@ support at support@rigetti.com.""")
     @_record_call
     def load(self, executable):
         """
-        Initialize a QAM into a fresh state. Load the executable and parse the expressions
-        in the recalculation table (if any) into pyQuil Expression objects.
+        Initialize a QAM into a fresh state. Load the executable, parse the expressions
+        in the recalculation table (if any) into pyQuil Expression objects and compile them.
 
         :param executable: Load a compiled executable onto the QAM.
         """
         super().load(executable)
+        self._recalculation = None
         if hasattr(self._executable, "recalculation_table"):
             recalculation_table = self._executable.recalculation_table
-            for memory_reference, recalc_rule in recalculation_table.items():
-                # We can only parse complete lines of Quil, so we wrap the arithmetic expression
-                # in a valid Quil instruction to parse it.
-                # TODO: This hack should be replaced after #687
-                expression = parse(f"RZ({recalc_rule}) 0")[0].params[0]
-                recalculation_table[memory_reference] = expression
+            # We can only parse complete lines of Quil, so we wrap the arithmetic expressions
+            # in valid Quil instructions to parse them.
+            # TODO: This hack should be replaced after #687
+            instructions = parse(''.join(f"RZ({recalc_rule}) 0\n"
+                                         for recalc_rule in recalculation_table.values()))
+            for memory_reference, instruction in zip(list(recalculation_table), instructions):
+                recalculation_table[memory_reference] = instruction.params[0]
+            self._recalculation = self._compile_expressions(recalculation_table.values())
         return self
 
     @_record_call
@@ -183,11 +187,41 @@ support at support@rigetti.com.""")
         return {k: decode_buffer(v) for k, v in buffers.items()}
 
     def _build_patch_values(self) -> dict:
-        patch_values = {}
+        """
+        Build the table of values to be patched into the executable, in revolutions rather than
+        radians, from the values written by the user and from the arithmetic expressions of the
+        original program.
 
-        # Now that we are about to run, we have to resolve any gate parameter arithmetic that was
-        # saved in the executable's recalculation table, and add those values to the variables shim
-        self._update_variables_shim_with_recalculation_table()
+        For example:
+
+            DECLARE theta REAL
+            DECLARE beta REAL
+            RZ(3 * theta) 0
+            RZ(beta+theta) 0
+
+        gets translated to:
+
+            DECLARE theta REAL
+            DECLARE __P REAL[2]
+            RZ(__P[0]) 0
+            RZ(__P[1]) 0
+
+        and the recalculation table will contain:
+
+        {
+            ParameterAref('__P', 0): Mul(3.0, <MemoryReference theta[0]>),
+            ParameterAref('__P', 1): Add(<MemoryReference beta[0]>, <MemoryReference theta[0]>)
+        }
+
+        Let's say we've made the following two function calls:
+
+            qpu.write_memory(region_name='theta', value=0.5)
+            qpu.write_memory(region_name='beta', value=0.1)
+
+        The values of __P are then 1.5, which is (3.0) * theta[0], and 0.6, which is
+        beta[0] + theta[0].
+        """
+        patch_values = {}
 
         # Initialize our patch table
         if hasattr(self._executable, "recalculation_table"):
@@ -217,78 +251,45 @@ support at support@rigetti.com.""")
 
             patch_values[k.name][k.index] = v
 
+        # Now that we are about to run, we have to resolve any gate parameter arithmetic that was
+        # saved in the executable's recalculation table, and add those values to the patch table.
+        # They don't go through the variables shim, since hashing its keys is slow.
+        if hasattr(self._executable, "recalculation_table"):
+            values = self._evaluate(self._recalculation).tolist()
+            for memory_reference, value in zip(self._executable.recalculation_table, values):
+                patch_values[memory_reference.name][memory_reference.index] = \
+                    float(value) / (2 * np.pi)
+
         return patch_values
 
-    def _update_variables_shim_with_recalculation_table(self):
+    @staticmethod
+    def _compile_expressions(expressions: Iterable[Expression]) -> CompiledExpressions:
         """
-        Update self._variables_shim with the final values to be patched into the gate parameters,
-        according to the arithmetic expressions in the original program.
+        Compile gate parameter expressions, which may only contain memory references.
 
-        For example:
-
-            DECLARE theta REAL
-            DECLARE beta REAL
-            RZ(3 * theta) 0
-            RZ(beta+theta) 0
-
-        gets translated to:
-
-            DECLARE theta REAL
-            DECLARE __P REAL[2]
-            RZ(__P[0]) 0
-            RZ(__P[1]) 0
-
-        and the recalculation table will contain:
-
-        {
-            ParameterAref('__P', 0): Mul(3.0, <MemoryReference theta[0]>),
-            ParameterAref('__P', 1): Add(<MemoryReference beta[0]>, <MemoryReference theta[0]>)
-        }
-
-        Let's say we've made the following two function calls:
-
-            qpu.write_memory(region_name='theta', value=0.5)
-            qpu.write_memory(region_name='beta', value=0.1)
-
-        After executing this function, our self.variables_shim in the above example would contain
-        the following:
-
-        {
-            ParameterAref('theta', 0): 0.5,
-            ParameterAref('beta', 0): 0.1,
-            ParameterAref('__P', 0): 1.5,       # (3.0) * theta[0]
-            ParameterAref('__P', 1): 0.6        # beta[0] + theta[0]
-        }
-
-        Once the _variables_shim is filled, execution continues as with regular binary patching.
+        :param expressions: the Expressions to compile
         """
-        if not hasattr(self._executable, "recalculation_table"):
-            # No recalculation table, no work to be done here.
-            return
-        for memory_reference, expression in self._executable.recalculation_table.items():
-            # Replace the user-declared memory references with any values the user has written,
-            # coerced to a float because that is how we declared it.
-            self._variables_shim[memory_reference] = float(self._resolve_memory_references(expression))
-
-    def _resolve_memory_references(self, expression: Expression) -> Union[float, int]:
+        compiled = CompiledExpressions(expressions)
+        for variable in compiled.variables:
+            if not isinstance(variable, MemoryReference):
+                raise ValueError(f"Unexpected Parameter in gate expression: {variable}")
+        return compiled
+
+    def _evaluate(self, compiled: CompiledExpressions) -> np.ndarray:
         """
-        Traverse the given Expression, and replace any Memory References with whatever values
-        have been so far provided by the user for those memory spaces. Declared memory defaults
-        to zero.
+        Evaluate compiled expressions with the values so far provided by the user for the memory
+        references they contain, which default to zero.
 
-        :param expression: an Expression
+        :param compiled: the compiled Expressions
         """
-        if isinstance(expression, BinaryExp):
-            left = self._resolve_memory_references(expression.op1)
-            right = self._resolve_memory_references(expression.op2)
-            return expression.fn(left, right)
-        elif isinstance(expression, Function):
-            return expression.fn(self._resolve_memory_references(expression.expression))
-        elif isinstance(expression, Parameter):
-            raise ValueError(f"Unexpected Parameter in gate expression: {expression}")
-        elif isinstance(expression, float) or isinstance(expression, int):
-            return expression
-        elif isinstance(expression, MemoryReference):
-            return self._variables_shim.get(ParameterAref(name=expression.name, index=expression.offset), 0)
-        else:
-            raise ValueError(f"Unexpected expression in gate parameter: {expression}")
+        return compiled([self._variables_shim.get(ParameterAref(name=mr.name, index=mr.offset), 0)
+                         for mr in compiled.variables])
+
+
+class QPUConnection(QPU):
+    def __init__(self, *args, **kwargs):
+        warnings.warn("QPUConnection's semantics have changed for Forest 2. Consider using "
+                      "pyquil.get_qc('...') instead of creating this object directly. "
+                      "Please consult the migration guide for full details.",
+                      DeprecationWarning)
+        super(QPU, self).__init__(*args, **kwargs)
@@ -13,10 +13,11 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##############################################################################
+import logging
 import re
 import warnings
 from math import pi
-from typing import List, Dict, Tuple, Iterator, Union
+from typing import List, Dict, Tuple, Iterator, Union, Sequence
 import subprocess
 from contextlib import contextmanager
 
@@ -35,10 +36,13 @@ from pyquil.api._qvm import ForestConnection, QVM
 from pyquil.device import AbstractDevice, NxDevice, gates_in_isa, ISA, Device
 from pyquil.gates import RX, MEASURE
 from pyquil.noise import decoherence_noise_with_asymmetric_ro, NoiseModel
+from pyquil.peephole import peephole_optimize
 from pyquil.pyqvm import PyQVM
 from pyquil.quil import Program, validate_supported_quil
 from pyquil.quilbase import Measurement, Pragma
 
+_log = logging.getLogger(__name__)
+
 pyquil_config = PyquilConfig()
 
 Executable = Union[BinaryExecutableResponse, PyQuilExecutableResponse]
@@ -153,6 +157,32 @@ class QuantumComputer:
             .wait() \
             .read_memory(region_name='ro')
 
+    @_record_call
+    def run_batch(self, executable: Executable,
+                  memory_maps: Sequence[Dict[str, List[Union[int, float]]]]) -> List[np.ndarray]:
+        """
+        Run a parametric quil executable once for each of several memory maps.
+
+        The runs are sequential, as with a loop of calls to :py:func:`run`, except that the
+        executable is loaded onto the QAM only once and only the parameter values are written
+        between runs.
+
+        :param executable: The program to run. You are responsible for compiling this first.
+        :param memory_maps: A list of mappings of declared parameters to their values. See
+            :py:func:`run`.
+        :return: A list with one numpy array of shape (trials, len(ro-register)) per memory map.
+        """
+        self.qam.load(executable)
+        results = []
+        for memory_map in memory_maps:
+            for region_name, values_list in memory_map.items():
+                for offset, value in enumerate(values_list):
+                    self.qam.write_memory(region_name=region_name, offset=offset, value=value)
+            results.append(self.qam.run()
+                           .wait()
+                           .read_memory(region_name='ro'))
+        return results
+
     @_record_call
     def run_symmetrized_readout(self, program: Program, trials: int) -> np.ndarray:
         """
@@ -233,7 +263,9 @@ class QuantumComputer:
     @_record_call
     def compile(self, program: Program,
                 to_native_gates: bool = True,
-                optimize: bool = True) -> Union[BinaryExecutableResponse, PyQuilExecutableResponse]:
+                optimize: bool = True,
+                peephole: bool = False) -> Union[BinaryExecutableResponse,
+                                                 PyQuilExecutableResponse]:
         """
         A high-level interface to program compilation.
 
@@ -246,12 +278,20 @@ class QuantumComputer:
         :param program: A Program
         :param to_native_gates: Whether to compile non-native gates to native gates.
         :param optimize: Whether to optimize programs to reduce the number of operations.
+        :param peephole: Whether to first remove obvious redundancies from the program locally
+            with :py:func:`~pyquil.peephole.peephole_optimize`, which makes the request to the
+            compiler smaller. The reduction is logged at the INFO level.
         :return: An executable binary suitable for passing to :py:func:`QuantumComputer.run`.
         """
         flags = [to_native_gates, optimize]
         assert all(flags) or all(not f for f in flags), "Must turn quilc all on or all off"
         quilc = all(flags)
 
+        if peephole:
+            program, report = peephole_optimize(program)
+            _log.info("Peephole optimization removed %d of %d instructions", report.reduction,
+                      report.original_length)
+
         if quilc:
             nq_program = self.compiler.quil_to_native_quil(program)
         else:
@@ -380,6 +380,13 @@ programs run on this QVM.
             payload['rng-seed'] = self.random_seed
 
 
+class SyncConnection(QVMConnection):
+    def __init__(self, *args, **kwargs):
+        warnings.warn("SyncConnection has been renamed to QVMConnection and will be removed in the future",
+                      stacklevel=2)
+        super(SyncConnection, self).__init__(*args, **kwargs)
+
+
 class QVM(QAM):
     @_record_call
     def __init__(self,
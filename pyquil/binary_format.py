@@ -0,0 +1,248 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+A compact binary file format for programs, which is much faster to save and load than Quil text.
+
+A file starts with a magic string and the length of a header, followed by the header and a few
+flat numpy arrays describing the gates: an index into a table of gate names per instruction
+(-1 for instructions which aren't gates), the number of qubits and parameters of each gate,
+and all of their qubits and parameters one after the other. Each array uses the smallest
+integer type that fits its values. The header is a pickle holding:
+
+- the gate definitions, number of shots and native Quil metadata of the program,
+- the table of gate names,
+- a symbol table of qubit placeholders, which the qubits array refers to with negative numbers,
+- a symbol table of the gate parameters which aren't floats (expressions, memory references,
+  ints and complex numbers), which a parallel array refers to,
+- gate modifiers and every instruction which isn't a gate, by row.
+
+Since the header is a pickle, only load files you trust. Loading the arrays doesn't copy them:
+they are views of the bytes read from the file.
+"""
+import pickle
+import struct
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from pyquil.quil import Program
+from pyquil.quilatom import Expression, Qubit, QubitPlaceholder
+from pyquil.quilbase import Gate
+
+_MAGIC = b'PYQUILB\x01'
+_HEADER_LENGTH = struct.Struct('<Q')
+_ALIGNMENT = 8
+
+# the arrays of a file, in the order they're stored
+_ARRAYS = ['opcodes', 'arities', 'qubits', 'n_params', 'params', 'param_symbols']
+
+
+def _padding(length: int) -> int:
+    return -length % _ALIGNMENT
+
+
+def _int_array(values: List[int]) -> np.ndarray:
+    """``values`` as an array of the smallest little-endian integer type that fits them."""
+    low, high = min(values, default=0), max(values, default=0)
+    for dtype in [np.int8, np.int16, np.int32, np.int64]:
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return np.array(values, dtype=np.dtype(dtype).newbyteorder('<'))
+
+
+def _program_arrays(program: Program) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """The header and the arrays of a program."""
+    gate_names = {}  # type: Dict[str, int]
+    placeholders = {}  # type: Dict[QubitPlaceholder, int]
+    # Parameters are looked up by their type and text, which determines how they're written
+    # out. Equal expressions are stored once.
+    param_symbols = {}  # type: Dict[Tuple[type, str], int]
+    param_table = []  # type: List[Any]
+    opcodes = []  # type: List[int]
+    arities = []  # type: List[int]
+    qubits = []  # type: List[int]
+    n_params = []  # type: List[int]
+    params = []  # type: List[float]
+    symbols = []  # type: List[int]
+    modifiers = {}  # type: Dict[int, Tuple[str, ...]]
+    others = {}  # type: Dict[int, Any]
+
+    for row, instr in enumerate(program._instructions):
+        if not isinstance(instr, Gate):
+            opcodes.append(-1)
+            arities.append(0)
+            n_params.append(0)
+            others[row] = instr
+            continue
+        opcodes.append(gate_names.setdefault(instr.name, len(gate_names)))
+        arities.append(len(instr.qubits))
+        for q in instr.qubits:
+            if isinstance(q, Qubit):
+                qubits.append(q.index)
+            else:
+                qubits.append(-1 - placeholders.setdefault(q, len(placeholders)))
+        n_params.append(len(instr.params))
+        for param in instr.params:
+            # only floats are stored in the params array; ints, numpy scalars and complex
+            # numbers would be formatted differently after a round trip
+            if type(param) is float:
+                params.append(param)
+                symbols.append(-1)
+            else:
+                key = type(param), str(param) if isinstance(param, Expression) else repr(param)
+                if key not in param_symbols:
+                    param_symbols[key] = len(param_table)
+                    param_table.append(param)
+                params.append(np.nan)
+                symbols.append(param_symbols[key])
+        if instr.modifiers:
+            modifiers[row] = tuple(instr.modifiers)
+
+    arrays = {
+        'opcodes': _int_array(opcodes),
+        'arities': np.array(arities, dtype=np.uint8),
+        'qubits': _int_array(qubits),
+        'n_params': np.array(n_params, dtype=np.uint8),
+        'params': np.array(params, dtype='<f8'),
+        'param_symbols': _int_array(symbols),
+    }
+    header = {
+        'defined_gates': program.defined_gates,
+        'num_shots': program.num_shots,
+        'native_quil_metadata': program.native_quil_metadata,
+        'gate_names': list(gate_names),
+        'qubit_placeholders': list(placeholders),
+        'param_table': param_table,
+        'modifiers': modifiers,
+        'others': others,
+        'arrays': [(name, arrays[name].dtype.str, len(arrays[name])) for name in _ARRAYS],
+    }
+    return header, arrays
+
+
+def dumps_program(program: Program) -> bytes:
+    """
+    Serialize a program to the binary format.
+
+    :param program: The program.
+    :return: The serialized program.
+    """
+    header, arrays = _program_arrays(program)
+    header_bytes = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    chunks = [_MAGIC, _HEADER_LENGTH.pack(len(header_bytes)), header_bytes]
+    length = sum(len(chunk) for chunk in chunks)
+    for name in _ARRAYS:
+        chunks.append(b'\0' * _padding(length))
+        length += _padding(length)
+        chunks.append(arrays[name].tobytes())
+        length += arrays[name].nbytes
+    return b''.join(chunks)
+
+
+def loads_arrays(data: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Read the header and the arrays of a serialized program without building the program.
+
+    The arrays are read-only views of ``data``:
+
+    - ``opcodes`` holds, for each instruction, the index of its name in
+      ``header['gate_names']``, or -1 if the instruction isn't a gate.
+    - ``arities`` and ``n_params`` hold the number of qubits and parameters of each instruction.
+    - ``qubits`` holds the qubits of all gates, where a negative number ``-1 - k`` refers to
+      ``header['qubit_placeholders'][k]``.
+    - ``params`` holds the parameters of all gates, and ``param_symbols`` holds for each of them
+      -1 if it's a float, or its index in ``header['param_table']``.
+
+    :param data: The serialized program.
+    :return: The header and a dictionary of arrays.
+    """
+    data = memoryview(data)
+    if bytes(data[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError("Not a binary pyQuil program")
+    offset = len(_MAGIC)
+    header_length, = _HEADER_LENGTH.unpack_from(data, offset)
+    offset += _HEADER_LENGTH.size
+    header = pickle.loads(data[offset:offset + header_length])
+    offset += header_length
+
+    arrays = {}
+    for name, dtype, length in header['arrays']:
+        offset += _padding(offset)
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+        offset += arrays[name].nbytes
+    return header, arrays
+
+
+def loads_program(data: bytes) -> Program:
+    """
+    Deserialize a program from the binary format.
+
+    :param data: The serialized program, as returned by :py:func:`dumps_program`.
+    :return: The program.
+    """
+    header, arrays = loads_arrays(data)
+    gate_names = header['gate_names']
+    placeholders = header['qubit_placeholders']
+    param_table = header['param_table']
+    modifiers = header['modifiers']
+    others = header['others']
+    qubits = [Qubit(q) if q >= 0 else placeholders[-1 - q] for q in arrays['qubits'].tolist()]
+    params = [param if symbol < 0 else param_table[symbol] for param, symbol in
+              zip(arrays['params'].tolist(), arrays['param_symbols'].tolist())]
+
+    instructions = []
+    qubit_offset = param_offset = 0
+    for row, (opcode, arity, n_params) in enumerate(zip(
+            arrays['opcodes'].tolist(), arrays['arities'].tolist(),
+            arrays['n_params'].tolist())):
+        if opcode < 0:
+            instructions.append(others[row])
+            continue
+        gate = Gate(gate_names[opcode], params[param_offset:param_offset + n_params],
+                    qubits[qubit_offset:qubit_offset + arity])
+        qubit_offset += arity
+        param_offset += n_params
+        if row in modifiers:
+            gate.modifiers = list(modifiers[row])
+        instructions.append(gate)
+
+    program = Program()
+    program._defined_gates = list(header['defined_gates'])
+    program.num_shots = header['num_shots']
+    program.native_quil_metadata = header['native_quil_metadata']
+    program.inst(instructions)
+    return program
+
+
+def dump_program(program: Program, path: str):
+    """
+    Save a program to a file in the binary format.
+
+    :param program: The program.
+    :param path: The path of the file.
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps_program(program))
+
+
+def load_program(path: str) -> Program:
+    """
+    Load a program saved with :py:func:`dump_program`.
+
+    :param path: The path of the file.
+    :return: The program.
+    """
+    with open(path, 'rb') as f:
+        return loads_program(f.read())
@@ -0,0 +1,302 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+A columnar representation of programs made only of gates.
+
+A :py:class:`CircuitArray` stores a circuit as a few numpy arrays (one row per gate) instead of
+a list of :py:class:`~pyquil.quilbase.Gate` objects, which makes large generated circuits cheap
+to build, store and serialize. Parameters which aren't floats (symbolic expressions, memory
+references, ints, complex numbers) and gate modifiers are kept in small side tables so that
+converting to and from a :py:class:`~pyquil.quil.Program` is lossless.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from pyquil.gate_matrices import QUANTUM_GATES
+from pyquil.quil import Program
+from pyquil.quilatom import Qubit, format_parameter
+from pyquil.quilbase import DefGate, Gate
+
+
+def _is_numeric_param(param) -> bool:
+    # only floats are stored in the params column; ints and complex numbers format differently
+    return type(param) is float or type(param) is np.float64
+
+
+def _apply_modifiers(matrix: np.ndarray, modifiers: Sequence[str]) -> np.ndarray:
+    """The matrix of a gate with ``modifiers`` applied, innermost (rightmost) first."""
+    for modifier in reversed(modifiers):
+        if modifier == 'DAGGER':
+            matrix = matrix.conj().T
+        elif modifier == 'CONTROLLED':
+            dim = matrix.shape[0]
+            controlled = np.eye(2 * dim, dtype=np.complex128)
+            controlled[dim:, dim:] = matrix
+            matrix = controlled
+        else:
+            raise NotImplementedError(f"The {modifier} modifier is not supported")
+    return matrix
+
+
+def _as_rows(array, n_rows: int, dtype) -> np.ndarray:
+    """``array`` as a 2D array with ``n_rows`` rows."""
+    array = np.asarray(array, dtype=dtype)
+    if array.size == 0:
+        return array.reshape(n_rows, array.shape[-1] if array.ndim == 2 else 0)
+    return array.reshape(n_rows, -1)
+
+
+class CircuitArray:
+    """
+    A circuit of gates stored column-wise, one row per gate.
+
+    .. code-block:: python
+
+        # 1000 layers of RX rotations and a CZ ladder on 50 qubits
+        n_qubits, n_layers = 50, 1000
+        rx = np.column_stack([np.arange(n_qubits), np.full(n_qubits, -1)])
+        cz = np.column_stack([np.arange(n_qubits - 1), np.arange(1, n_qubits)])
+        layer = np.concatenate([rx, cz])
+        circuit = CircuitArray(
+            gate_names=['RX', 'CZ'],
+            opcodes=np.tile([0] * n_qubits + [1] * (n_qubits - 1), n_layers),
+            qubits=np.tile(layer, (n_layers, 1)),
+            params=np.tile([[0.1]] * n_qubits + [[np.nan]] * (n_qubits - 1), (n_layers, 1)),
+        )
+        quil = circuit.out()
+        wf = NumpyWavefunctionSimulator(n_qubits).do_program(circuit).wf
+
+    The columns are:
+
+    * ``opcodes``, an integer array indexing into ``gate_names``;
+    * ``qubits``, an ``(n_gates, max_arity)`` integer array, padded on the right with ``-1``;
+    * ``params``, an ``(n_gates, max_params)`` float array, padded on the right with ``nan``;
+    * ``n_params``, the number of parameters of each gate.
+
+    Parameters that aren't floats are stored in ``symbolic_params``, keyed by ``(row, column)``,
+    and gate modifiers are stored in ``modifiers``, keyed by row.
+    """
+
+    def __init__(self, gate_names: Sequence[str], opcodes: np.ndarray, qubits: np.ndarray,
+                 params: np.ndarray = None, n_params: np.ndarray = None,
+                 symbolic_params: Dict[Tuple[int, int], Any] = None,
+                 modifiers: Dict[int, Tuple[str, ...]] = None,
+                 defined_gates: Iterable[DefGate] = (), num_shots: int = 1):
+        """
+        :param gate_names: The names of the gates that opcodes refer to.
+        :param opcodes: The index into ``gate_names`` of each gate.
+        :param qubits: The qubit indices of each gate, padded with ``-1``.
+        :param params: The float parameters of each gate, padded with ``nan``. Defaults to no
+            parameters.
+        :param n_params: The number of parameters of each gate. Defaults to the number of
+            leading entries of each row of ``params`` which are not ``nan`` or symbolic.
+        :param symbolic_params: Parameters which aren't floats, keyed by ``(row, column)``. The
+            corresponding entries of ``params`` are ignored.
+        :param modifiers: Gate modifiers (e.g. ``('DAGGER',)``) keyed by row.
+        :param defined_gates: The DEFGATEs the circuit uses.
+        :param num_shots: The number of shots, as in :py:attr:`Program.num_shots`.
+        """
+        self.gate_names = tuple(gate_names)
+        self.opcodes = np.asarray(opcodes, dtype=np.int32).reshape(-1)
+        n_gates = len(self.opcodes)
+        self.qubits = _as_rows(qubits, n_gates, np.int64)
+        if params is None:
+            params = np.empty((n_gates, 0))
+        self.params = _as_rows(params, n_gates, np.float64)
+        self.symbolic_params = dict(symbolic_params or {})
+        self.modifiers = {row: tuple(mods) for row, mods in (modifiers or {}).items() if mods}
+        self.defined_gates = list(defined_gates)
+        self.num_shots = num_shots
+
+        if n_params is None:
+            present = ~np.isnan(self.params)
+            for row, col in self.symbolic_params:
+                present[row, col] = True
+            # the number of leading parameters of each row
+            n_params = np.argmin(np.column_stack([present, np.zeros(n_gates, bool)]), axis=1)
+        self.n_params = np.asarray(n_params, dtype=np.int64).reshape(n_gates)
+
+        if n_gates > 0:
+            if self.opcodes.min() < 0 or self.opcodes.max() >= len(self.gate_names):
+                raise ValueError("Every opcode must index into gate_names")
+            if np.any(self.qubits[:, 0] < 0):
+                raise ValueError("Every gate must act on at least one qubit")
+            padding = self.qubits < 0
+            if np.any(padding[:, :-1] & ~padding[:, 1:]):
+                raise ValueError("Qubit rows must only be padded on the right")
+        for row, col in self.symbolic_params:
+            if col >= self.n_params[row]:
+                raise ValueError(f"Symbolic parameter {(row, col)} is outside of its gate")
+
+    @classmethod
+    def from_program(cls, program: Program) -> 'CircuitArray':
+        """
+        Convert a program made only of gates (and DEFGATEs) to a :py:class:`CircuitArray`.
+
+        :param program: The program. Qubits must not be placeholders.
+        :return: The equivalent circuit.
+        """
+        opcode_of = {}  # type: Dict[str, int]
+        opcodes, qubit_rows, param_rows = [], [], []
+        symbolic_params, modifiers = {}, {}
+        for row, instr in enumerate(program):
+            if not isinstance(instr, Gate):
+                raise ValueError(f"A CircuitArray can only hold gates, not {instr}")
+            if any(not isinstance(q, Qubit) for q in instr.qubits):
+                raise ValueError("A CircuitArray can't hold QubitPlaceholders")
+            opcodes.append(opcode_of.setdefault(instr.name, len(opcode_of)))
+            qubit_rows.append([q.index for q in instr.qubits])
+            param_row = []
+            for col, param in enumerate(instr.params):
+                if _is_numeric_param(param):
+                    param_row.append(param)
+                else:
+                    symbolic_params[row, col] = param
+                    param_row.append(np.nan)
+            param_rows.append(param_row)
+            if instr.modifiers:
+                modifiers[row] = tuple(instr.modifiers)
+
+        n_gates = len(opcodes)
+        max_arity = max((len(row) for row in qubit_rows), default=1)
+        max_params = max((len(row) for row in param_rows), default=0)
+        qubits = np.full((n_gates, max_arity), -1, dtype=np.int64)
+        params = np.full((n_gates, max_params), np.nan)
+        for row, (qubit_row, param_row) in enumerate(zip(qubit_rows, param_rows)):
+            qubits[row, :len(qubit_row)] = qubit_row
+            params[row, :len(param_row)] = param_row
+
+        return cls(gate_names=list(opcode_of), opcodes=opcodes, qubits=qubits, params=params,
+                   n_params=[len(row) for row in param_rows], symbolic_params=symbolic_params,
+                   modifiers=modifiers, defined_gates=program.defined_gates,
+                   num_shots=program.num_shots)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __iter__(self) -> Iterator[Gate]:
+        arities = self.arities
+        for row, (opcode, qubit_row, param_row) in enumerate(
+                zip(self.opcodes.tolist(), self.qubits.tolist(), self.params.tolist())):
+            params = [self.symbolic_params.get((row, col), param)
+                      for col, param in enumerate(param_row[:self.n_params[row]])]
+            gate = Gate(self.gate_names[opcode], params,
+                        [Qubit(q) for q in qubit_row[:arities[row]]])
+            gate.modifiers = list(self.modifiers.get(row, ()))
+            yield gate
+
+    @property
+    def arities(self) -> np.ndarray:
+        """The number of qubits each gate acts on."""
+        return np.sum(self.qubits >= 0, axis=1)
+
+    def to_program(self) -> Program:
+        """
+        Convert back to a :py:class:`~pyquil.quil.Program`.
+        """
+        program = Program(self.defined_gates)
+        program.inst(list(self))
+        program.num_shots = self.num_shots
+        return program
+
+    def get_qubits(self) -> set:
+        """The indices of the qubits used by the circuit."""
+        return set(np.unique(self.qubits[self.qubits >= 0]).tolist())
+
+    def out(self) -> str:
+        """
+        Serialize the circuit to Quil. The result is identical to ``self.to_program().out()``.
+
+        Each distinct gate name, qubit and float parameter is formatted once and the lines are
+        assembled column by column.
+        """
+        n_gates = len(self)
+        if n_gates == 0:
+            return ''.join(dg.out() + '\n' for dg in self.defined_gates)
+
+        lines = np.array(self.gate_names, dtype=object)[self.opcodes]
+        if self.modifiers:
+            rows = np.fromiter(self.modifiers, dtype=np.int64, count=len(self.modifiers))
+            prefixes = np.array([' '.join(mods) + ' ' for mods in self.modifiers.values()],
+                                dtype=object)
+            lines[rows] = prefixes + lines[rows]
+
+        if self.params.shape[1] > 0:
+            has_params = self.n_params > 0
+            finite = np.where(np.isnan(self.params), 0.0, self.params)
+            values, inverse = np.unique(finite, return_inverse=True)
+            formatted = np.array([format_parameter(v) for v in values.tolist()], dtype=object)
+            param_strs = formatted[inverse.reshape(finite.shape)]
+            for (row, col), param in self.symbolic_params.items():
+                param_strs[row, col] = format_parameter(param)
+            for col in range(self.params.shape[1]):
+                sep = '(' if col == 0 else ','
+                lines = np.where(col < self.n_params, lines + sep + param_strs[:, col], lines)
+            lines = np.where(has_params, lines + ')', lines)
+
+        max_qubit = int(self.qubits.max())
+        qubit_strs = np.array([' ' + str(q) for q in range(max_qubit + 1)] + [''], dtype=object)
+        for col in range(self.qubits.shape[1]):
+            # -1 padding picks the trailing empty string
+            lines = lines + qubit_strs[self.qubits[:, col]]
+
+        return '\n'.join([dg.out() for dg in self.defined_gates] + lines.tolist() + [''])
+
+    def unitaries(self) -> Iterator[Tuple[np.ndarray, List[int]]]:
+        """
+        Yield the matrix of each gate and the qubits it acts on, in order.
+
+        Matrices are computed once per distinct gate name and parameter values.
+
+        :raises ValueError: If a parameter is symbolic.
+        """
+        if self.symbolic_params:
+            for param in self.symbolic_params.values():
+                if not isinstance(param, (int, complex, np.number)):
+                    raise ValueError(f"Can't compute the matrix of a gate with parameter {param}; "
+                                     "substitute numeric values first")
+        defined = {}
+        for dg in self.defined_gates:
+            if dg.parameters is not None and len(dg.parameters) > 0:
+                raise NotImplementedError("Parameterized DEFGATEs are not supported")
+            defined[dg.name] = dg.matrix
+
+        # Rows with symbolic parameters get a key of their own, as their ``params`` are nan.
+        symbolic_rows = np.zeros(len(self), dtype=np.float64)
+        for row, _ in self.symbolic_params:
+            symbolic_rows[row] = row + 1
+        keys = np.column_stack([self.opcodes, symbolic_rows,
+                                np.where(np.isnan(self.params), 0.0, self.params)])
+        _, first_rows, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        matrices = []
+        for row in first_rows.tolist():
+            name = self.gate_names[self.opcodes[row]]
+            params = [self.symbolic_params.get((row, col), param)
+                      for col, param in enumerate(self.params[row, :self.n_params[row]].tolist())]
+            if name in defined:
+                matrices.append(defined[name])
+            elif len(params) > 0:
+                matrices.append(QUANTUM_GATES[name](*params))
+            else:
+                matrices.append(QUANTUM_GATES[name])
+
+        arities = self.arities.tolist()
+        for row, (index, qubit_row) in enumerate(zip(inverse.tolist(), self.qubits.tolist())):
+            matrix = matrices[index]
+            if row in self.modifiers:
+                matrix = _apply_modifiers(matrix, self.modifiers[row])
+            yield matrix, qubit_row[:arities[row]]
@@ -0,0 +1,264 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+The dependency graph of a program, and the layers and circuit depths derived from it.
+
+An instruction depends on an earlier one if both act on a common qubit, or if one of them writes
+a memory location the other reads or writes. The graph is built in a single pass over the
+program by remembering, for each qubit and memory location, the last instruction that wrote it
+and the instructions that have read it since.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from pyquil.quil import Program
+from pyquil.quilatom import BinaryExp, Function, MemoryReference, Qubit, QubitPlaceholder
+from pyquil.quilbase import (AbstractInstruction, ArithmeticBinaryOp, ClassicalComparison,
+                             ClassicalConvert, ClassicalExchange, ClassicalLoad, ClassicalMove,
+                             ClassicalStore, Declare, Gate, Jump, JumpConditional, JumpTarget,
+                             LogicalBinaryOp, Measurement, Nop, ResetQubit,
+                             UnaryClassicalInstruction)
+
+
+def _memory_references(expression) -> List[MemoryReference]:
+    if isinstance(expression, MemoryReference):
+        return [expression]
+    elif isinstance(expression, BinaryExp):
+        return _memory_references(expression.op1) + _memory_references(expression.op2)
+    elif isinstance(expression, Function):
+        return _memory_references(expression.expression)
+    return []
+
+
+def _accesses(instr: AbstractInstruction) -> Optional[Tuple[list, list]]:
+    """
+    The operands an instruction reads and writes.
+
+    Qubits are always written. Memory is given as :py:class:`MemoryReference` objects, or as a
+    region name when an instruction addresses a whole region (``LOAD`` and ``STORE``). Operands
+    which are immediate values are ignored by the caller.
+
+    :return: A pair of lists of the operands read and written, or None if the instruction must
+        be ordered with respect to every other instruction, e.g. ``RESET`` or a ``PRAGMA``.
+    """
+    if isinstance(instr, Gate):
+        return [ref for param in instr.params for ref in _memory_references(param)], \
+            list(instr.qubits)
+    elif isinstance(instr, Measurement):
+        if instr.classical_reg is None:
+            return [], [instr.qubit]
+        return [], [instr.qubit, instr.classical_reg]
+    elif isinstance(instr, ResetQubit):
+        return [], [instr.qubit]
+    elif isinstance(instr, UnaryClassicalInstruction):
+        return [], [instr.target]
+    elif isinstance(instr, (LogicalBinaryOp, ArithmeticBinaryOp, ClassicalMove,
+                            ClassicalConvert)):
+        return [instr.right], [instr.left]
+    elif isinstance(instr, ClassicalExchange):
+        return [], [instr.left, instr.right]
+    elif isinstance(instr, (ClassicalLoad, ClassicalStore, ClassicalComparison)):
+        return [instr.left, instr.right], [instr.target]
+    return None
+
+
+class DependencyGraph:
+    """
+    The dependency graph of a program without control flow.
+
+    The nodes of the graph are the instructions of the program, in program order, except for
+    DECLAREs and NOPs. Instructions which don't act on specific qubits or memory locations, like
+    ``RESET``, ``WAIT``, ``HALT`` and ``PRAGMA``, are ordered with respect to every other
+    instruction.
+
+    .. code-block:: python
+
+        graph = DependencyGraph(Program(H(0), CNOT(0, 1), H(2), MEASURE(1, ro[0])))
+        graph.layers()  # [[H 0, H 2], [CNOT 0 1], [MEASURE 1 ro[0]]]
+        graph.depth(), graph.gate_depth(), graph.multiqubit_gate_depth()  # 3, 2, 1
+
+    :ivar instructions: The instructions in the graph.
+    :ivar predecessors: For each instruction, the sorted indices of the instructions it directly
+        depends on.
+    :ivar successors: For each instruction, the sorted indices of the instructions which
+        directly depend on it.
+    """
+
+    def __init__(self, program: Union[Program, Iterable[AbstractInstruction]]):
+        """
+        :param program: A program, or a sequence of instructions, without control flow.
+        """
+        self.instructions = []  # type: List[AbstractInstruction]
+        self.predecessors = []  # type: List[List[int]]
+        self.successors = []  # type: List[List[int]]
+
+        # The state of each qubit and memory location: the last instruction to write it, the
+        # instructions which read it since, and the last instruction to access it. Accessing
+        # a whole memory region, or every qubit and region, resets these lazily: a state older
+        # than that access is replaced by it.
+        last_writer = {}  # type: Dict[object, int]
+        readers = {}  # type: Dict[object, List[int]]
+        last_access = {}  # type: Dict[object, int]
+        barrier = -1
+        region_barriers = {}  # type: Dict[str, int]
+        # the instructions accessing each region since the last access to the whole region
+        region_accessors = {}  # type: Dict[str, List[int]]
+        # the instructions nothing depends on yet
+        sinks = set()  # type: Set[int]
+
+        def refresh(key, since):
+            if key not in last_access or last_access[key] < since:
+                last_writer[key] = since
+                readers[key] = []
+                last_access[key] = since
+
+        for instr in program:
+            if isinstance(instr, (Declare, Nop)):
+                continue
+            if isinstance(instr, (JumpTarget, Jump, JumpConditional)):
+                raise ValueError("Dependency graphs of programs with control flow are not "
+                                 "supported: {}".format(instr))
+
+            node = len(self.instructions)
+            deps = set()  # type: Set[int]
+            accesses = _accesses(instr)
+            if accesses is None:
+                deps.update(sinks)
+                reads, writes = [], []
+            else:
+                reads, writes = accesses
+
+            # collect the dependencies before updating any state, in case an instruction
+            # accesses a location more than once
+            operands = []  # type: List[Tuple[object, Optional[str], bool]]
+            for is_write, operand in [(False, op) for op in reads] + [(True, op) for op in writes]:
+                if isinstance(operand, MemoryReference):
+                    key, region = (operand.name, operand.offset), operand.name
+                    refresh(key, max(barrier, region_barriers.get(region, -1)))
+                elif isinstance(operand, str):
+                    key, region = None, operand
+                    deps.update(region_accessors.get(region, ()))
+                    deps.add(region_barriers.get(region, -1))
+                    deps.add(barrier)
+                    operands.append((key, region, is_write))
+                    continue
+                elif isinstance(operand, (Qubit, QubitPlaceholder)):
+                    key, region = operand, None
+                    refresh(key, barrier)
+                else:
+                    continue
+                deps.add(last_writer[key])
+                if is_write:
+                    deps.update(readers[key])
+                operands.append((key, region, is_write))
+
+            deps.discard(-1)
+            if accesses is None:
+                barrier = node
+            for key, region, is_write in operands:
+                if key is None:
+                    region_barriers[region] = node
+                    region_accessors[region] = []
+                    continue
+                if region is not None:
+                    region_accessors.setdefault(region, []).append(node)
+                if is_write:
+                    last_writer[key] = node
+                    readers[key] = []
+                else:
+                    readers[key].append(node)
+                last_access[key] = node
+
+            self.instructions.append(instr)
+            self.predecessors.append(sorted(deps))
+            self.successors.append([])
+            for dep in self.predecessors[-1]:
+                self.successors[dep].append(node)
+            sinks.difference_update(deps)
+            sinks.add(node)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def _path_lengths(self, weights: Sequence[int]) -> List[int]:
+        """The largest total weight of a path ending at each instruction."""
+        lengths = []  # type: List[int]
+        for preds, weight in zip(self.predecessors, weights):
+            lengths.append(max((lengths[p] for p in preds), default=0) + weight)
+        return lengths
+
+    def layers(self, indices: bool = False) -> List[list]:
+        """
+        Schedule the instructions into layers of mutually independent instructions, each as
+        early as possible.
+
+        :param indices: Return the indices of the instructions rather than the instructions.
+        :return: A list of layers, each a list of instructions in program order.
+        """
+        lengths = self._path_lengths([1] * len(self))
+        layers = [[] for _ in range(max(lengths, default=0))]  # type: List[list]
+        for node, length in enumerate(lengths):
+            layers[length - 1].append(node if indices else self.instructions[node])
+        return layers
+
+    def critical_path(self, indices: bool = False) -> list:
+        """
+        A longest chain of instructions, each depending on the previous one.
+
+        :param indices: Return the indices of the instructions rather than the instructions.
+        :return: The instructions on the path, in program order.
+        """
+        lengths = self._path_lengths([1] * len(self))
+        if len(lengths) == 0:
+            return []
+        path = [max(range(len(lengths)), key=lambda node: lengths[node])]
+        while lengths[path[-1]] > 1:
+            node = path[-1]
+            path.append(next(p for p in self.predecessors[node]
+                             if lengths[p] == lengths[node] - 1))
+        path.reverse()
+        return path if indices else [self.instructions[node] for node in path]
+
+    def depth(self) -> int:
+        """The number of instructions on the critical path, i.e. the number of layers."""
+        return max(self._path_lengths([1] * len(self)), default=0)
+
+    def gate_depth(self) -> int:
+        """The largest number of gates on a chain of dependent instructions."""
+        return max(self._path_lengths([int(isinstance(instr, Gate))
+                                       for instr in self.instructions]), default=0)
+
+    def multiqubit_gate_depth(self) -> int:
+        """The largest number of gates on two or more qubits on a chain of dependent
+        instructions."""
+        return max(self._path_lengths([int(isinstance(instr, Gate) and len(instr.qubits) > 1)
+                                       for instr in self.instructions]), default=0)
+
+    def ancestors(self, nodes: Iterable[int]) -> List[int]:
+        """
+        The instructions the given ones depend on, directly or indirectly, e.g. the backward
+        light cone of a set of measurements.
+
+        :param nodes: Indices of instructions.
+        :return: The sorted indices of the given instructions and their ancestors.
+        """
+        seen = set(nodes)
+        stack = list(seen)
+        while stack:
+            for pred in self.predecessors[stack.pop()]:
+                if pred not in seen:
+                    seen.add(pred)
+                    stack.append(pred)
+        return sorted(seen)
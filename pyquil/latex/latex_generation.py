@@ -49,6 +49,15 @@ MEASURE = "MEASURE"
 X = "X"
 
 
+def _qubits_and_name(inst):
+    """
+    Return the qubits an instruction acts on and the name to draw it with.
+    """
+    if isinstance(inst, Measurement):
+        return [inst.qubit], MEASURE
+    return inst.qubits, inst.name
+
+
 def to_latex(circuit, settings=None):
     """
     Translates a given pyquil Program to a TikZ picture in a Latex document.
@@ -82,19 +91,15 @@ def body(circuit, settings):
 
     # Allocate each qubit.
     for inst in circuit:
-        if isinstance(inst, Measurement):
-            inst.qubits = [inst.qubit]
-            inst.name = "MEASURE"
-        else:
-            qubits = inst.qubits
+        qubits, _ = _qubits_and_name(inst)
         for qubit in qubits:
             qubit_instruction_mapping[qubit.index] = []
     for k, v in list(qubit_instruction_mapping.items()):
         v.append(command(ALLOCATE, [k], [], [k], k))
 
     for inst in circuit:
-        qubits = [qubit.index for qubit in inst.qubits]
-        gate = inst.name
+        inst_qubits, gate = _qubits_and_name(inst)
+        qubits = [qubit.index for qubit in inst_qubits]
         # If this is a single qubit instruction.
         if len(qubits) == 1:
             for qubit in qubits:
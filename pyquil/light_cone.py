@@ -0,0 +1,226 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+Program transformations that shrink the amount of work a simulator has to do when only a few
+qubits are observed.
+
+The backward light cone of a set of qubits is the set of gates that can influence the state of
+those qubits: walking the program from the end, a gate is in the light cone if it touches a
+qubit that is already in it. Everything else can be dropped without changing measurement
+statistics or expectation values on the observed qubits.
+"""
+from typing import Iterable, List, Tuple, Dict, Type, Union
+
+from pyquil.paulis import PauliTerm, PauliSum, sI
+from pyquil.quil import Program, validate_protoquil
+from pyquil.quilatom import Qubit
+from pyquil.quilbase import Gate, Measurement, Reset, ResetQubit
+
+
+def light_cone(program: Program, qubits: Iterable[int] = ()) -> Program:
+    """
+    Drop every gate that cannot influence the observed qubits.
+
+    The observed qubits are ``qubits`` together with every qubit that is measured into classical
+    memory. In particular, gates that come after the last measurement of a qubit and never
+    interact with an observed qubit are dropped.
+
+    Instructions that do not act on qubits (DECLAREs, PRAGMAs, RESET, HALT) are kept.
+    Measurements for effect (i.e. without a classical register) on qubits outside the light
+    cone are dropped.
+
+    :param program: A ProtoQuil program, i.e. one without control flow or classical
+        instructions.
+    :param qubits: Indices of qubits whose final state is observed, e.g. the qubits an
+        operator acts on.
+    :return: A new program containing only the instructions in the backward light cone.
+    """
+    validate_protoquil(program)
+
+    observed = set(qubits)
+    kept = []
+    for instr in reversed(program.instructions):
+        if isinstance(instr, Gate):
+            gate_qubits = {q.index for q in instr.qubits}
+            if gate_qubits & observed:
+                observed |= gate_qubits
+                kept.append(instr)
+        elif isinstance(instr, Measurement):
+            if instr.classical_reg is not None:
+                observed.add(instr.qubit.index)
+                kept.append(instr)
+            elif instr.qubit.index in observed:
+                kept.append(instr)
+        elif isinstance(instr, ResetQubit):
+            if instr.qubit.index in observed:
+                kept.append(instr)
+        else:
+            kept.append(instr)
+
+    new_prog = program.copy_everything_except_instructions()
+    new_prog.inst(list(reversed(kept)))
+    return new_prog
+
+
+def qubit_clusters(program: Program, qubits: Iterable[int] = ()) -> List[List[int]]:
+    """
+    Partition the qubits of a program into clusters that never interact.
+
+    Two qubits are in the same cluster if they are connected by a chain of multi-qubit gates.
+    The state of the program is a product state across clusters, so each cluster can be
+    simulated on its own.
+
+    :param program: The program.
+    :param qubits: Additional qubits to include, e.g. measured or observed qubits which the
+        program might not act on.
+    :return: A list of sorted lists of qubit indices, ordered by their smallest qubit.
+    """
+    # union-find with path halving
+    parent = {}  # type: Dict[int, int]
+
+    def find(q):
+        parent.setdefault(q, q)
+        while parent[q] != q:
+            parent[q] = parent[parent[q]]
+            q = parent[q]
+        return q
+
+    for q in program.get_qubits(indices=True) | set(qubits):
+        find(q)
+
+    for instr in program:
+        if isinstance(instr, Gate) and len(instr.qubits) > 1:
+            first, *rest = [find(q.index) for q in instr.qubits]
+            for other in rest:
+                parent[find(other)] = find(first)
+
+    clusters = {}  # type: Dict[int, List[int]]
+    for q in sorted(parent):
+        clusters.setdefault(find(q), []).append(q)
+    return sorted(clusters.values(), key=lambda cluster: cluster[0])
+
+
+def split_program(program: Program,
+                  qubits: Iterable[int] = ()) -> List[Tuple[List[int], Program]]:
+    """
+    Split a program into one program per cluster of interacting qubits.
+
+    Each of the returned programs contains the gates and measurements of its cluster along with
+    every instruction which does not act on qubits (DECLAREs, PRAGMAs, etc.).
+
+    :param program: A ProtoQuil program.
+    :param qubits: Additional qubits to include. See :py:func:`qubit_clusters`.
+    :return: A list of ``(qubits, program)`` pairs, one per cluster, as returned by
+        :py:func:`qubit_clusters`.
+    """
+    clusters = qubit_clusters(program, qubits)
+    cluster_of = {q: i for i, cluster in enumerate(clusters) for q in cluster}
+    programs = [program.copy_everything_except_instructions() for _ in clusters]
+
+    for instr in program:
+        if isinstance(instr, Gate):
+            programs[cluster_of[instr.qubits[0].index]].inst(instr)
+        elif isinstance(instr, (Measurement, ResetQubit)):
+            programs[cluster_of[instr.qubit.index]].inst(instr)
+        else:
+            for prog in programs:
+                prog.inst(instr)
+
+    return list(zip(clusters, programs))
+
+
+def _simulate_gates(simulator, program: Program, qubit_mapping: Dict[int, int]):
+    """
+    Apply the gates of ``program`` to ``simulator``, relabeling qubits with ``qubit_mapping``.
+    """
+    defined_gates = {}
+    for dg in program.defined_gates:
+        if dg.parameters is not None and len(dg.parameters) > 0:
+            raise NotImplementedError("Parameterized DEFGATEs are not supported")
+        defined_gates[dg.name] = dg.matrix
+
+    for instr in program:
+        if not isinstance(instr, Gate):
+            continue
+        qubits = [qubit_mapping[q.index] for q in instr.qubits]
+        if instr.name in defined_gates:
+            simulator.do_gate_matrix(matrix=defined_gates[instr.name], qubits=qubits)
+        else:
+            gate = Gate(instr.name, instr.params, [Qubit(q) for q in qubits])
+            gate.modifiers = instr.modifiers.copy()
+            simulator.do_gate(gate)
+    return simulator
+
+
+def light_cone_expectation(program: Program, operator: Union[PauliTerm, PauliSum],
+                           quantum_simulator_type: Type = None) -> complex:
+    """
+    Compute the expectation value of ``operator`` on the state prepared by ``program``,
+    simulating only the part of the program in each term's light cone.
+
+    Each term is evaluated by simulating the clusters of its (pruned) light cone separately on
+    a register just large enough for that cluster, and multiplying the per-cluster
+    expectations. Simulations are shared between terms with the same light cone.
+
+    :param program: A program consisting only of gate applications (and, optionally, PRAGMAs
+        and DECLAREs) acting on the ``|0...0>`` state.
+    :param operator: The operator whose expectation to compute.
+    :param quantum_simulator_type: The simulator to use for each cluster. Defaults to
+        :py:class:`~pyquil.numpy_simulator.NumpyWavefunctionSimulator`.
+    :return: The expectation value.
+    """
+    if quantum_simulator_type is None:
+        from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+        quantum_simulator_type = NumpyWavefunctionSimulator
+
+    if not isinstance(operator, PauliSum):
+        operator = PauliSum([operator])
+
+    if any(isinstance(instr, (Measurement, Reset, ResetQubit)) for instr in program):
+        raise ValueError("Light-cone expectations are only supported for programs composed "
+                         "of gate applications")
+
+    # Map a cluster to a simulator holding its final state. Light cones only ever contain
+    # instructions from `program`, so the identities of their gates make a cheap key.
+    simulated = {}
+
+    def cluster_simulator(qubits, cluster_program):
+        key = tuple(qubits), tuple(id(instr) for instr in cluster_program
+                                   if isinstance(instr, Gate))
+        if key not in simulated:
+            mapping = {q: i for i, q in enumerate(qubits)}
+            simulator = quantum_simulator_type(n_qubits=len(qubits), rs=None)
+            simulated[key] = _simulate_gates(simulator, cluster_program, mapping), mapping
+        return simulated[key]
+
+    total = 0j
+    for term in operator:
+        term_qubits = term.get_qubits()
+        value = term.coefficient
+        if len(term_qubits) > 0:
+            cone = light_cone(program, term_qubits)
+            for qubits, cluster_program in split_program(cone, term_qubits):
+                cluster_ops = [(q, op) for q, op in term if q in qubits]
+                if len(cluster_ops) == 0:
+                    continue
+                simulator, mapping = cluster_simulator(qubits, cluster_program)
+                cluster_term = sI()
+                for q, op in cluster_ops:
+                    cluster_term *= PauliTerm(op, mapping[q])
+                value *= simulator.expectation(cluster_term)
+        total += value
+
+    return total
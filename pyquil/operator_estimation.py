@@ -812,7 +812,8 @@ def measure_observables(qc: QuantumComputer, tomo_experiment: TomographyExperime
                         n_shots: int = 10000, progress_callback=None, active_reset=False,
                         symmetrize_readout: Optional[str] = 'exhaustive',
                         calibrate_readout: Optional[str] = 'plus-eig',
-                        readout_symmetrize: Optional[str] = None):
+                        readout_symmetrize: Optional[str] = None,
+                        exact: bool = False, shot_noise: bool = False):
     """
     Measure all the observables in a TomographyExperiment.
 
@@ -840,7 +841,22 @@ def measure_observables(qc: QuantumComputer, tomo_experiment: TomographyExperime
         method supported is normalizing against the operator's expectation value in its +1
         eigenstate, which can be specified by setting this variable to 'plus-eig' (default value).
         The preceding symmetrization and this step together yield a more accurate estimation of the observable. Set to `None` if no calibration is desired.
+    :param exact: If True, ``qc`` must be backed by a :py:class:`~pyquil.pyqvm.PyQVM`. Instead of
+        compiling and sampling readout programs, the simulator evolves each distinct in-state
+        through ``tomo_experiment.program`` once and computes the expectation of every
+        ``out_operator`` exactly. PyQVM has no readout error, so ``symmetrize_readout`` and
+        ``calibrate_readout`` are ignored.
+    :param shot_noise: Only used if ``exact`` is True. If True, each expectation is replaced by
+        a sample from the distribution of the mean of ``n_shots`` measurements, and ``std_err``
+        is estimated from it as it would be from measured bitstrings. Otherwise, ``std_err`` is
+        zero.
     """
+    if exact:
+        yield from _measure_observables_exact(qc, tomo_experiment, n_shots=n_shots,
+                                              progress_callback=progress_callback,
+                                              shot_noise=shot_noise)
+        return
+
     if readout_symmetrize is not None:
         warnings.warn("'readout_symmetrize' has been renamed to 'symmetrize_readout'",
                       DeprecationWarning)
@@ -971,6 +987,65 @@ def measure_observables(qc: QuantumComputer, tomo_experiment: TomographyExperime
                 raise ValueError("Calibration readout method must be either 'plus-eig' or None")
 
 
+def _measure_observables_exact(qc: QuantumComputer, tomo_experiment: TomographyExperiment,
+                               n_shots: int, progress_callback=None, shot_noise: bool = False):
+    """
+    Compute the results of :py:func:`measure_observables` exactly on a PyQVM.
+
+    See the ``exact`` argument of :py:func:`measure_observables`.
+    """
+    from pyquil.pyqvm import PyQVM
+    qam = qc.qam
+    if not isinstance(qam, PyQVM):
+        raise ValueError("Exact expectations can only be computed on a QuantumComputer backed "
+                         "by a PyQVM")
+
+    groups = list(tomo_experiment)
+    in_states = [_max_weight_state(setting.in_state for setting in settings)
+                 for settings in groups]
+
+    # Evolve each distinct in-state once and compute the expectations of every setting that
+    # starts from it, whichever group it's in.
+    expectations = {}  # type: Dict[Tuple[int, int], float]
+    for in_state in dict.fromkeys(in_states):
+        prog = Program(RESET())
+        for oneq_state in in_state.states:
+            prog += _one_q_state_prep(oneq_state)
+        prog += tomo_experiment.program
+        qam.execute(prog)
+
+        for i, settings in enumerate(groups):
+            if in_states[i] != in_state:
+                continue
+            for j, setting in enumerate(settings):
+                expectation = complex(qam.wf_simulator.expectation(setting.out_operator))
+                if not np.isclose(expectation.imag, 0):
+                    raise ValueError(f"{setting}'s out_operator has a complex coefficient.")
+                expectations[i, j] = expectation.real
+
+    for i, settings in enumerate(groups):
+        if progress_callback is not None:
+            progress_callback(i, len(tomo_experiment))
+
+        for j, setting in enumerate(settings):
+            expectation = expectations[i, j]
+            std_err = 0.0
+            if shot_noise and not is_identity(setting.out_operator):
+                # Each shot yields +/- coeff, so the number of +1 outcomes is binomial.
+                coeff = abs(complex(setting.out_operator.coefficient))
+                p_plus = np.clip((1 + expectation / coeff) / 2, 0, 1)
+                n_plus = qam.rs.binomial(n_shots, p_plus)
+                expectation = coeff * (2 * n_plus / n_shots - 1)
+                std_err = np.sqrt((coeff ** 2 - expectation ** 2) / n_shots)
+
+            yield ExperimentResult(
+                setting=setting,
+                expectation=expectation,
+                std_err=std_err,
+                total_counts=n_shots,
+            )
+
+
 def _ops_bool_to_prog(ops_bool: Tuple[bool], qubits: List[int]) -> Program:
     """
     :param ops_bool: tuple of booleans specifying the operation to be carried out on `qubits`
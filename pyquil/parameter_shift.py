@@ -0,0 +1,246 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+Estimate gradients of expectation values on a :py:class:`~pyquil.api.QuantumComputer` with the
+parameter-shift rule.
+
+For a gate ``exp(-i phi G)`` whose generator ``G`` has eigenvalues ``+/- 1/2`` (or, up to a
+global phase, ``0`` and ``1``)::
+
+    d<H>/d phi = (<H>(phi + pi/2) - <H>(phi - pi/2)) / 2
+
+:py:class:`ParameterShiftGradient` gives every parameterized gate its own entry in an extra
+memory region that is added to the gate's angle, so the shifted circuits only differ in their
+memory maps. The program is compiled once per measurement basis and every shifted memory map
+is run against the same executable.
+"""
+import sys
+from math import pi
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from pyquil.api import QuantumComputer
+from pyquil.gates import MEASURE
+from pyquil.numpy_simulator import _GATE_GENERATORS, _evaluate_with_derivatives
+from pyquil.operator_estimation import _local_pauli_eig_meas, _max_weight_operator
+from pyquil.paulis import PauliSum, PauliTerm, is_identity
+from pyquil.quil import Program
+from pyquil.quilatom import BinaryExp, Function, MemoryReference, Parameter
+from pyquil.quilbase import Declare, Gate, Measurement
+
+if sys.version_info < (3, 7):
+    from pyquil.external.dataclasses import dataclass
+else:
+    from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class GradientEstimate:
+    """
+    An estimate of an expectation value and its gradient with respect to the parameters of a
+    program, as returned by :py:class:`ParameterShiftGradient`.
+    """
+    expectation: float
+    std_err: float
+    gradient: Dict[str, np.ndarray]
+    """The partial derivatives with respect to each offset of each memory region."""
+    gradient_std_err: Dict[str, np.ndarray]
+    total_counts: int
+    """The number of shots taken for each memory map and measurement basis."""
+
+
+def _contained_variables(expression) -> set:
+    if isinstance(expression, BinaryExp):
+        return _contained_variables(expression.op1) | _contained_variables(expression.op2)
+    elif isinstance(expression, Function):
+        return _contained_variables(expression.expression)
+    elif isinstance(expression, (MemoryReference, Parameter)):
+        return {expression}
+    return set()
+
+
+def _group_terms(observable: PauliSum) -> List[Tuple[PauliTerm, List[PauliTerm]]]:
+    """
+    Greedily group the non-identity terms of an observable into sets which can be measured in
+    a common tensor product basis.
+
+    :return: A list of pairs of the measurement basis and the terms measured in it.
+    """
+    groups = []  # type: List[Tuple[PauliTerm, List[PauliTerm]]]
+    for term in observable:
+        if is_identity(term):
+            continue
+        for i, (basis, terms) in enumerate(groups):
+            new_basis = _max_weight_operator([basis, term])
+            if new_basis is not None:
+                groups[i] = (new_basis, terms + [term])
+                break
+        else:
+            groups.append((_max_weight_operator([term]), [term]))
+    return groups
+
+
+class ParameterShiftGradient:
+    """
+    A reusable executor for the expectation of an observable and its gradient with respect to
+    the memory regions that parameterize a program, e.g. in a variational optimization loop.
+
+    The program is compiled once per measurement basis when the executor is created. Each call
+    runs ``2 * n_gates + 1`` memory maps per basis with :py:func:`QuantumComputer.run_batch`,
+    where ``n_gates`` is the number of gates whose angle depends on a memory region.
+
+    .. code-block:: python
+
+        prog = Program()
+        theta = prog.declare('theta', 'REAL', 2)
+        prog += [RX(theta[0], 0), CNOT(0, 1), RY(theta[1], 1)]
+        grad = ParameterShiftGradient(qc, prog, sZ(0) * sZ(1), n_shots=1000)
+        estimate = grad({'theta': [0.1, 0.2]})
+        estimate.gradient['theta'], estimate.gradient_std_err['theta']
+    """
+
+    def __init__(self, qc: QuantumComputer, program: Program,
+                 observable: Union[PauliTerm, PauliSum], n_shots: int = 1000,
+                 shift_region: str = 'parameter_shift'):
+        """
+        :param qc: The QuantumComputer to run on.
+        :param program: A program without measurements whose gate angles are expressions of
+            declared memory regions. Every gate whose angle depends on a memory region must be
+            one of RX, RY, RZ, PHASE, the CPHASE family or PSWAP, with no modifier other than
+            DAGGER.
+        :param observable: A Hermitian operator.
+        :param n_shots: The number of shots per memory map and measurement basis.
+        :param shift_region: The name of the memory region holding the shifts. It must not be
+            declared by ``program``.
+        """
+        if not isinstance(observable, PauliSum):
+            observable = PauliSum([observable])
+        if any(not np.isclose(complex(term.coefficient).imag, 0) for term in observable):
+            raise ValueError("The observable must be Hermitian")
+
+        self.qc = qc
+        self.observable = observable
+        self.n_shots = n_shots
+        self.shift_region = shift_region
+
+        declared = {instr.name for instr in program if isinstance(instr, Declare)}
+        if shift_region in declared or 'ro' in declared:
+            raise ValueError(f"The program must not declare '{shift_region}' or 'ro'")
+
+        # The angle of each shifted gate, before shifting
+        self._angles = []  # type: List
+        shifted = program.copy_everything_except_instructions()
+        shift = MemoryReference(shift_region)
+        for instr in program:
+            if isinstance(instr, Measurement):
+                raise ValueError("The program must not contain measurements")
+            if isinstance(instr, Gate) \
+                    and any(len(_contained_variables(p)) > 0 for p in instr.params):
+                # the generators of controlled rotations also have the eigenvalue 0, for which
+                # the two-term rule is wrong
+                if instr.name not in _GATE_GENERATORS \
+                        or any(modifier != 'DAGGER' for modifier in instr.modifiers):
+                    raise ValueError(f"The parameter-shift rule doesn't apply to {instr}")
+                if any(isinstance(v, Parameter) for v in _contained_variables(instr.params[0])):
+                    raise ValueError(f"{instr} uses a Parameter; use a memory region instead")
+                angle = instr.params[0]
+                gate = Gate(instr.name, [angle + shift[len(self._angles)]], instr.qubits)
+                gate.modifiers = instr.modifiers.copy()
+                self._angles.append(angle)
+                shifted += gate
+            else:
+                shifted += instr
+        if len(self._angles) > 0:
+            shifted = Program(Declare(shift_region, 'REAL', len(self._angles))) + shifted
+
+        self._identity_coefficient = sum(complex(term.coefficient).real
+                                         for term in observable if is_identity(term))
+        self._groups = []  # type: List[Tuple[List[PauliTerm], Dict[int, int], object]]
+        for basis, terms in _group_terms(observable):
+            readout = shifted.copy()
+            qubits = basis.get_qubits()
+            ro = readout.declare('ro', 'BIT', len(qubits))
+            for qubit, op_str in basis:
+                readout += _local_pauli_eig_meas(op_str, qubit)
+            for i, qubit in enumerate(qubits):
+                readout += MEASURE(qubit, ro[i])
+            readout.wrap_in_numshots_loop(n_shots)
+            executable = qc.compile(readout)
+            self._groups.append((terms, {q: i for i, q in enumerate(qubits)}, executable))
+
+    def _memory_maps(self, memory_map: Dict[str, Sequence[float]]) -> List[Dict]:
+        """The unshifted memory map followed by the +/- shifted ones for each gate."""
+        n_angles = len(self._angles)
+        if n_angles == 0:
+            return [dict(memory_map)]
+        shifts = [np.zeros(n_angles)]
+        for k in range(n_angles):
+            for sign in [1, -1]:
+                shift = np.zeros(n_angles)
+                shift[k] = sign * pi / 2
+                shifts.append(shift)
+        return [{**memory_map, self.shift_region: list(shift)} for shift in shifts]
+
+    def _group_stats(self, bitstrings: np.ndarray, terms: List[PauliTerm],
+                     qubit_index_map: Dict[int, int]) -> Tuple[float, float]:
+        """The mean of the terms measured in one basis and the variance of that mean."""
+        eigenvalues = 1 - 2 * bitstrings
+        values = np.zeros(bitstrings.shape[0])
+        for term in terms:
+            idxs = [qubit_index_map[q] for q, _ in term]
+            values += complex(term.coefficient).real * np.prod(eigenvalues[:, idxs], axis=1)
+        return np.mean(values), np.var(values) / len(values)
+
+    def __call__(self, memory_map: Dict[str, Sequence[float]]) -> GradientEstimate:
+        """
+        Estimate the expectation and its gradient at the given parameter values.
+
+        :param memory_map: The values of every memory region used by the program, as for
+            :py:func:`QuantumComputer.run`.
+        :return: The estimates and their standard errors.
+        """
+        memory_maps = self._memory_maps(memory_map)
+        means = np.full(len(memory_maps), self._identity_coefficient, dtype=float)
+        variances = np.zeros(len(memory_maps))
+        for terms, qubit_index_map, executable in self._groups:
+            for i, bitstrings in enumerate(self.qc.run_batch(executable, memory_maps)):
+                mean, var = self._group_stats(bitstrings, terms, qubit_index_map)
+                means[i] += mean
+                variances[i] += var
+
+        # the derivative and its variance with respect to each gate's angle
+        d_angles = (means[1::2] - means[2::2]) / 2
+        d_angle_variances = (variances[1::2] + variances[2::2]) / 4
+
+        values = {MemoryReference(name, offset): value
+                  for name, region in memory_map.items()
+                  for offset, value in enumerate(region)}
+        gradient = {name: np.zeros(len(region)) for name, region in memory_map.items()}
+        gradient_var = {name: np.zeros(len(region)) for name, region in memory_map.items()}
+        for angle, d_angle, d_angle_var in zip(self._angles, d_angles, d_angle_variances):
+            _, slopes = _evaluate_with_derivatives(angle, values)
+            for var, slope in slopes.items():
+                gradient[var.name][var.offset] += d_angle * np.real(slope)
+                gradient_var[var.name][var.offset] += d_angle_var * np.real(slope) ** 2
+
+        return GradientEstimate(
+            expectation=float(means[0]),
+            std_err=float(np.sqrt(variances[0])),
+            gradient=gradient,
+            gradient_std_err={name: np.sqrt(var) for name, var in gradient_var.items()},
+            total_counts=self.n_shots,
+        )
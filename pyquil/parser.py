@@ -16,9 +16,95 @@
 """
 Module for parsing Quil programs from text into PyQuil objects
 """
+import os
+from functools import lru_cache
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pyquil.binary_format import dumps_program, loads_program
 from pyquil.quil import Program
+from pyquil.quilbase import AbstractInstruction
+
+from pyquil._parser.fast_parser import iter_fast_parser, run_fast_parser
+
+DEFAULT_PARSE_CACHE_SIZE = 128
+DEFAULT_MAX_CACHED_LENGTH = 10000
+
+
+def _make_parse_cache(maxsize: Optional[int]):
+    return lru_cache(maxsize=maxsize)(lambda quil: tuple(run_fast_parser(quil)))
+
+
+_parse_cache = _make_parse_cache(DEFAULT_PARSE_CACHE_SIZE)
+# Longer strings are parsed without the cache, so that it doesn't keep large programs alive.
+_max_cached_length = DEFAULT_MAX_CACHED_LENGTH
+
+# The names of the slots of each instruction class, including those of its base classes.
+_slot_names: Dict[type, Tuple[str, ...]] = {}
+
+
+def _copy_instruction(instruction: AbstractInstruction) -> AbstractInstruction:
+    """
+    A copy of a cached instruction with its own lists and arrays, since instructions can be
+    changed in place, e.g. by Gate.dagger().
+    """
+    cls = type(instruction)
+    names = _slot_names.get(cls)
+    if names is None:
+        names = _slot_names[cls] = tuple(name for base in cls.__mro__
+                                         for name in base.__dict__.get('__slots__', ()))
+    new = cls.__new__(cls)
+    for name in names:
+        value = getattr(instruction, name, _missing)
+        if value is not _missing:
+            object.__setattr__(new, name, _copy_value(value))
+    if hasattr(instruction, '__dict__'):
+        new.__dict__.update((name, _copy_value(value))
+                            for name, value in instruction.__dict__.items())
+    return new
+
+
+_missing = object()
+
+
+def _copy_value(value):
+    if isinstance(value, (list, dict, set, np.ndarray)):
+        return value.copy()
+    return value
+
+
+def set_parse_cache_size(maxsize: Optional[int] = DEFAULT_PARSE_CACHE_SIZE,
+                         max_length: Optional[int] = DEFAULT_MAX_CACHED_LENGTH):
+    """
+    Set the number of Quil strings whose parsed instructions are kept by :py:func:`parse`, and
+    clear the cache.
+
+    :param maxsize: The number of strings, or 0 to disable the cache, or None for no limit.
+    :param max_length: The length of the longest string that is cached, or None for no limit.
+        Longer strings are parsed every time, so the cache holds at most about
+        ``maxsize * max_length`` characters of Quil.
+    """
+    global _parse_cache, _max_cached_length
+    _parse_cache = _make_parse_cache(maxsize)
+    _max_cached_length = max_length
+
+
+def parse_cache_info():
+    """
+    The statistics of the cache of :py:func:`parse`.
+
+    :return: A named tuple of the number of hits and misses, the maximum size and the current
+        size of the cache, like ``functools.lru_cache``.
+    """
+    return _parse_cache.cache_info()
 
-from pyquil._parser.PyQuilListener import run_parser
+
+def clear_parse_cache():
+    """
+    Clear the cache of :py:func:`parse` and its statistics.
+    """
+    _parse_cache.cache_clear()
 
 
 def parse_program(quil):
@@ -35,7 +121,82 @@ def parse(quil):
     """
     Parse a raw Quil program and return a corresponding list of PyQuil objects.
 
+    Common instructions such as gates, measurements and declarations are parsed with a fast
+    hand-written parser, and the rest of the program with the ANTLR parser. The instructions of
+    recently parsed strings that are not too long are cached (see
+    :py:func:`set_parse_cache_size`), and copies of them are returned, so that changing a parsed
+    instruction doesn't change those parsed later.
+
     :param str quil: a single or multiline Quil program
     :return: list of instructions
     """
-    return run_parser(quil)
+    if _max_cached_length is not None and len(quil) > _max_cached_length:
+        return run_fast_parser(quil)
+    return [_copy_instruction(instruction) for instruction in _parse_cache(quil)]
+
+
+def iter_parse(source: Union[str, IO[str]]) -> Iterator[AbstractInstruction]:
+    """
+    Parse a Quil program from a file one line at a time, yielding its instructions as they are
+    parsed, so that very large programs can be read without holding their text in memory.
+
+    Gate definitions and other instructions which span several lines are parsed once all their
+    lines have been read. A program can be built from the generator, e.g.
+    ``Program(iter_parse('program.quil'))``.
+
+    :param source: the path of a Quil file, or a file object opened in text mode
+    :return: a generator of instructions
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            yield from iter_fast_parser(f)
+    else:
+        yield from iter_fast_parser(source)
+
+
+def _read_quil(source: Union[str, os.PathLike]) -> str:
+    if isinstance(source, str):
+        return source
+    with open(source) as f:
+        return f.read()
+
+
+def _parse_to_binary(source: Union[str, os.PathLike]) -> bytes:
+    return dumps_program(parse_program(_read_quil(source)))
+
+
+def parse_many(sources: Iterable[Union[str, os.PathLike]], workers: Optional[int] = None,
+               chunksize: int = 16) -> List[Program]:
+    """
+    Parse many Quil programs in parallel, in a pool of processes.
+
+    The programs are sent back from the worker processes in the binary format of
+    :py:mod:`pyquil.binary_format`, which is much faster to transfer and load than the pickled
+    instructions.
+
+    .. code-block:: python
+
+        programs = parse_many(pathlib.Path('results').glob('*.quil'), workers=8)
+
+    :param sources: Quil programs as strings, or paths of Quil files as ``os.PathLike`` objects
+        such as ``pathlib.Path``
+    :param workers: the number of processes, by default the number of CPUs. With a single
+        worker, the programs are parsed in this process.
+    :param chunksize: the number of programs sent to a process at a time. Larger chunks reduce
+        the communication between processes for many short programs.
+    :return: the programs, in the same order as ``sources``
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("The number of workers must be positive")
+    if chunksize < 1:
+        raise ValueError("The chunk size must be positive")
+    if workers == 1:
+        return [parse_program(_read_quil(source)) for source in sources]
+
+    # imported when needed, since importing it registers an exit handler in every process
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [loads_program(data)
+                for data in executor.map(_parse_to_binary, sources, chunksize=chunksize)]
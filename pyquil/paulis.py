@@ -218,6 +218,8 @@ class PauliTerm(object):
             return term_with_coeff(self, self.coefficient * term)
         elif isinstance(term, PauliSum):
             return (PauliSum([self]) * term).simplify()
+        elif isinstance(term, PauliTable):
+            return NotImplemented
         else:
             new_term = PauliTerm("I", 0, 1.0)
             new_term._ops = self._ops.copy()
@@ -267,6 +269,8 @@ class PauliTerm(object):
             return self + PauliTerm("I", 0, other)
         elif isinstance(other, PauliSum):
             return other + self
+        elif isinstance(other, PauliTable):
+            return NotImplemented
         else:
             new_sum = PauliSum([self, other])
             return new_sum.simplify()
@@ -548,7 +552,9 @@ class PauliSum(object):
         :return: A new PauliSum object given by the multiplication.
         :rtype: PauliSum
         """
-        if not isinstance(other, (Number, PauliTerm, PauliSum)):
+        if isinstance(other, PauliTable):
+            return NotImplemented
+        elif not isinstance(other, (Number, PauliTerm, PauliSum)):
             raise ValueError("Cannot multiply PauliSum by term that is not a Number, PauliTerm, or"
                              "PauliSum")
         elif isinstance(other, PauliSum):
@@ -612,6 +618,8 @@ class PauliSum(object):
             other = PauliSum([other])
         elif isinstance(other, Number):
             other = PauliSum([other * ID()])
+        elif isinstance(other, PauliTable):
+            return NotImplemented
         new_terms = [term.copy() for term in self.terms]
         new_terms.extend(other.terms)
         new_sum = PauliSum(new_terms)
@@ -678,96 +686,186 @@ class PauliSum(object):
         return programs, coefficients
 
 
-def simplify_pauli_sum(pauli_sum):
-    """Simplify the sum of Pauli operators according to Pauli algebra rules."""
+class PauliSumBuilder(object):
+    """
+    Accumulates PauliTerms in place, merging the coefficients of terms with the same operations
+    as they are added, to build a simplified PauliSum in time linear in the number of terms.
+    Adding terms to a PauliSum instead copies and simplifies the whole sum every time.
+
+    >>> builder = PauliSumBuilder()
+    >>> for q in range(3):
+    ...     builder += 0.5 * sZ(q) * sZ(q + 1)
+    ...     builder -= 0.5
+    >>> print(builder.build())
+    (0.5+0j)*Z0*Z1 + (-1.5+0j)*I + (0.5+0j)*Z1*Z2 + (0.5+0j)*Z2*Z3
+
+    :param terms: A PauliTerm, PauliSum or Number to start from.
+    """
 
-    # You might want to use a defaultdict(list) here, but don't because
-    # we want to do our best to preserve the order of terms.
-    like_terms = OrderedDict()
-    for term in pauli_sum.terms:
-        key = term.operations_as_set()
-        if key in like_terms:
-            like_terms[key].append(term)
-        else:
-            like_terms[key] = [term]
+    def __init__(self, terms=None):
+        # the first term with each set of operations, and the sum of their coefficients
+        self._terms = OrderedDict()
+        if terms is not None:
+            self += terms
 
-    terms = []
-    for term_list in like_terms.values():
-        first_term = term_list[0]
-        if len(term_list) == 1 and not np.isclose(first_term.coefficient, 0.0):
-            terms.append(first_term)
+    def _add(self, other, sign):
+        if isinstance(other, Number):
+            other = PauliTerm("I", 0, other)
+        if isinstance(other, PauliTerm):
+            terms = [other]
+        elif isinstance(other, PauliSum):
+            terms = other.terms
         else:
-            coeff = sum(t.coefficient for t in term_list)
-            for t in term_list:
-                if list(t._ops.items()) != list(first_term._ops.items()):
+            raise ValueError("Can only add a PauliTerm, PauliSum or Number to a PauliSumBuilder.")
+
+        for term in terms:
+            key = term.operations_as_set()
+            if key in self._terms:
+                first_term, coefficient = self._terms[key]
+                if list(term._ops.items()) != list(first_term._ops.items()):
                     warnings.warn("The term {} will be combined with {}, but they have different "
                                   "orders of operations. This doesn't matter for QVM or "
                                   "wavefunction simulation but may be important when "
                                   "running on an actual device."
-                                  .format(t.id(sort_ops=False), first_term.id(sort_ops=False)))
+                                  .format(term.id(sort_ops=False), first_term.id(sort_ops=False)))
+                self._terms[key][1] = coefficient + sign * term.coefficient
+            else:
+                self._terms[key] = [term, sign * term.coefficient]
+        return self
+
+    def __iadd__(self, other):
+        """
+        Add a PauliTerm, PauliSum or Number to the terms of this builder.
+
+        :param other: a PauliTerm, PauliSum or Number object
+        :return: This builder.
+        :rtype: PauliSumBuilder
+        """
+        return self._add(other, 1)
+
+    def __isub__(self, other):
+        """
+        Subtract a PauliTerm, PauliSum or Number from the terms of this builder.
 
-            if not np.isclose(coeff, 0.0):
-                terms.append(term_with_coeff(term_list[0], coeff))
-    return PauliSum(terms)
+        :param other: a PauliTerm, PauliSum or Number object
+        :return: This builder.
+        :rtype: PauliSumBuilder
+        """
+        return self._add(other, -1)
+
+    def __len__(self):
+        """
+        The number of distinct terms added to the builder, including those which cancelled out.
+        """
+        return len(self._terms)
+
+    def build(self):
+        """
+        The sum of the terms added to the builder, in the order in which they were first added,
+        without the terms whose coefficients are close to zero.
+
+        :return: A simplified PauliSum.
+        :rtype: PauliSum
+        """
+        terms = []
+        for term, coefficient in self._terms.values():
+            if not np.isclose(coefficient, 0.0):
+                terms.append(term if coefficient == term.coefficient
+                             else term_with_coeff(term, coefficient))
+        return PauliSum(terms)
+
+
+def simplify_pauli_sum(pauli_sum):
+    """Simplify the sum of Pauli operators according to Pauli algebra rules."""
+    return PauliSumBuilder(pauli_sum).build()
 
 
 def check_commutation(pauli_list, pauli_two):
     """
     Check if commuting a PauliTerm commutes with a list of other terms by natural calculation.
-    Uses the result in Section 3 of arXiv:1405.5749v2, modified slightly here to check for the
-    number of anti-coincidences (which must always be even for commuting PauliTerms)
-    instead of the no. of coincidences, as in the paper.
+    Uses the result in Section 3 of arXiv:1405.5749v2: two terms commute if they anti-commute
+    on an even number of qubits, which is computed as the symplectic inner product of the bits
+    of their PauliTable.
 
     :param list pauli_list: A list of PauliTerm objects
     :param PauliTerm pauli_two_term: A PauliTerm object
     :returns: True if pauli_two object commutes with pauli_list, False otherwise
     :rtype: bool
     """
+    return bool(PauliTable.from_pauli_sum(PauliSum(list(pauli_list))).commutes(pauli_two).all())
 
-    def coincident_parity(p1, p2):
-        non_similar = 0
-        p1_indices = set(p1._ops.keys())
-        p2_indices = set(p2._ops.keys())
-        for idx in p1_indices.intersection(p2_indices):
-            if p1[idx] != p2[idx]:
-                non_similar += 1
-        return non_similar % 2 == 0
 
-    for term in pauli_list:
-        if not coincident_parity(term, pauli_two):
-            return False
-    return True
-
-
-def commuting_sets(pauli_terms):
+def commuting_sets(pauli_terms, qubitwise=False, strategy='sequential'):
     """Gather the Pauli terms of pauli_terms variable into commuting sets
 
     Uses algorithm defined in (Raeisi, Wiebe, Sanders, arXiv:1108.4318, 2011)
     to find commuting sets. Except uses commutation check from arXiv:1405.5749v2
 
+    This is a greedy colouring of the graph whose edges join the terms which don't commute, in
+    which each term gets the first set with which it commutes. The edges are computed in bulk
+    from the PauliTable of the terms.
+
     :param PauliSum pauli_terms: A PauliSum object
+    :param bool qubitwise: Whether the terms of a set must commute qubit-wise, i.e. have the same
+        Pauli on every qubit on which they both act, rather than just commute.
+    :param str strategy: The order in which terms are added to sets: 'sequential' for the order
+        of the terms in the sum, or 'largest_first' for the terms which don't commute with the
+        most other terms first, which usually gives fewer sets.
     :returns: List of lists where each list contains a commuting set
     :rtype: list
     """
-
-    m_terms = len(pauli_terms.terms)
-    m_s = 1
-    groups = []
-    groups.append([pauli_terms.terms[0]])
-    for j in range(1, m_terms):
-        isAssigned_bool = False
-        for p in range(m_s):  # check if it commutes with each group
-            if isAssigned_bool is False:
-
-                if check_commutation(groups[p], pauli_terms.terms[j]):
-                    isAssigned_bool = True
-                    groups[p].append(pauli_terms.terms[j])
-        if isAssigned_bool is False:
-            m_s += 1
-            groups.append([pauli_terms.terms[j]])
+    table = PauliTable.from_pauli_sum(pauli_terms)
+    colours = _greedy_colouring(table, qubitwise, strategy)
+    groups = [[] for _ in range(colours.max() + 1)]
+    for term, colour in zip(pauli_terms.terms, colours.tolist()):
+        groups[colour].append(term)
     return groups
 
 
+def _conflicts(rows, table, qubitwise):
+    """Whether each term of ``rows`` doesn't (qubit-wise) commute with each term of ``table``."""
+    return ~(rows.qubitwise_commutes(table) if qubitwise else rows.commutes(table))
+
+
+def _greedy_colouring(table, qubitwise, strategy, block_size=256):
+    """
+    Colour the terms of a PauliTable so that terms which don't commute have different colours,
+    giving each term the smallest colour not used by the terms before it in the order of
+    ``strategy`` with which it doesn't commute. The conflicts of blocks of terms are computed
+    together to bound the memory used.
+
+    :return: An array of the colour of each term.
+    """
+    n = len(table)
+    if strategy == 'sequential':
+        order = np.arange(n)
+    elif strategy == 'largest_first':
+        degrees = np.concatenate([_conflicts(table[start:start + block_size], table,
+                                             qubitwise).sum(axis=1)
+                                  for start in range(0, n, block_size)])
+        order = np.argsort(-degrees, kind='stable')
+    else:
+        raise ValueError(f"Unknown strategy {strategy!r}, which should be 'sequential' or "
+                         "'largest_first'.")
+
+    table = table[order]
+    colours = np.zeros(n, dtype=np.int64)
+    n_colours = 0
+    for start in range(0, n, block_size):
+        block = table[start:start + block_size]
+        conflicts = _conflicts(block, table[:start + len(block)], qubitwise)
+        for row in range(len(block)):
+            i = start + row
+            used = np.zeros(n_colours + 1, dtype=bool)
+            used[colours[:i][conflicts[row, :i]]] = True
+            colours[i] = np.argmin(used)
+            n_colours = max(n_colours, colours[i] + 1)
+
+    result = np.empty(n, dtype=np.int64)
+    result[order] = colours
+    return result
+
+
 def is_identity(term):
     """
     Tests to see if a PauliTerm or PauliSum is a scalar multiple of identity
@@ -993,3 +1091,281 @@ def trotterize(first_pauli_term, second_pauli_term, trotter_order=1,
             exp_prog = param_prog(1)
             prog += exp_prog
     return prog
+
+
+# The number of set bits in each byte.
+_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+_PARITY = _POPCOUNT % 2 == 1
+# The powers of i, indexed by the exponent modulo 4.
+_I_POWERS = np.array([1, 1j, -1, -1j])
+
+
+class PauliTable(object):
+    """
+    A sum of Pauli terms in the symplectic representation: each term is a row of bits which are
+    set on the qubits where it has an X or a Z, with a Y on the qubits where both are set, and a
+    complex coefficient which includes the phase of the term. The bits are packed eight to a
+    byte, so that products, commutation checks and simplification of tables of many terms are
+    computed by numpy rather than term by term.
+
+    >>> table = PauliTable.from_pauli_sum(sX(0) * sZ(1) + 0.5 * sY(1))
+    >>> (table * table).to_pauli_sum()
+    (1.25+0j)*I
+
+    :param x: A boolean array with a row for each term and a column for each qubit, which is set
+        where the term has an X or a Y.
+    :param z: The same for Z or Y.
+    :param coefficients: The coefficients of the terms.
+    :param qubits: The qubits of the columns of ``x`` and ``z``.
+    """
+
+    def __init__(self, x, z, coefficients, qubits):
+        x, z = np.asarray(x, dtype=bool), np.asarray(z, dtype=bool)
+        coefficients = np.asarray(coefficients, dtype=complex)
+        qubits = tuple(qubits)
+        if x.shape != z.shape or x.shape != (len(coefficients), len(qubits)):
+            raise ValueError("x and z must have a row for each coefficient and a column for each "
+                             "qubit.")
+        if len(set(qubits)) != len(qubits):
+            raise ValueError("The qubits of a PauliTable must be distinct.")
+        self._x = np.packbits(x, axis=1)
+        self._z = np.packbits(z, axis=1)
+        self.coefficients = coefficients
+        self.qubits = qubits
+
+    @classmethod
+    def _from_packed(cls, x, z, coefficients, qubits):
+        table = cls.__new__(cls)
+        table._x, table._z, table.coefficients, table.qubits = x, z, coefficients, qubits
+        return table
+
+    @classmethod
+    def from_pauli_sum(cls, pauli_sum, qubits=None):
+        """
+        Convert a PauliSum or PauliTerm to a PauliTable.
+
+        :param pauli_sum: The PauliSum or PauliTerm.
+        :param qubits: The qubits of the table, which must include those of ``pauli_sum``.
+            Defaults to the qubits of its terms in order of appearance.
+        :return: A PauliTable with a row for each term.
+        """
+        terms = [pauli_sum] if isinstance(pauli_sum, PauliTerm) else pauli_sum.terms
+        if qubits is None:
+            qubits = list(OrderedDict.fromkeys(q for term in terms for q in term._ops))
+        columns = {q: i for i, q in enumerate(qubits)}
+        x = np.zeros((len(terms), len(columns)), dtype=bool)
+        z = np.zeros((len(terms), len(columns)), dtype=bool)
+        for row, term in enumerate(terms):
+            for q, op in term._ops.items():
+                if q not in columns:
+                    raise ValueError(f"The qubit {q} of {term} is not one of the qubits {qubits}")
+                x[row, columns[q]] = op != 'Z'
+                z[row, columns[q]] = op != 'X'
+        return cls(x, z, [term.coefficient for term in terms], qubits)
+
+    def to_pauli_sum(self):
+        """
+        Convert this PauliTable to a PauliSum, with a term for each row.
+
+        :return: A PauliSum.
+        """
+        # 1 for X, 2 for Z and 3 for Y
+        ops = self.x.view(np.int8) + 2 * self.z.view(np.int8)
+        terms = []
+        for row, coefficient in zip(ops, self.coefficients.tolist()):
+            term = PauliTerm("I", 0, coefficient)
+            for column in np.flatnonzero(row).tolist():
+                term._ops[self.qubits[column]] = "IXZY"[row[column]]
+            terms.append(term)
+        return PauliSum(terms)
+
+    @property
+    def x(self):
+        """The boolean array which is set where the terms have an X or a Y."""
+        return np.unpackbits(self._x, axis=1)[:, :len(self.qubits)].astype(bool)
+
+    @property
+    def z(self):
+        """The boolean array which is set where the terms have a Z or a Y."""
+        return np.unpackbits(self._z, axis=1)[:, :len(self.qubits)].astype(bool)
+
+    def __len__(self):
+        """The number of terms in the table."""
+        return len(self.coefficients)
+
+    def __getitem__(self, rows):
+        """
+        :param rows: An index, slice or array of the rows to select.
+        :return: A PauliTable of the selected rows.
+        """
+        if isinstance(rows, integer_types):
+            rows = [rows]
+        return PauliTable._from_packed(self._x[rows], self._z[rows], self.coefficients[rows],
+                                       self.qubits)
+
+    def __str__(self):
+        return str(self.to_pauli_sum())
+
+    def on_qubits(self, qubits):
+        """
+        The same terms as this PauliTable on more qubits, or in another order.
+
+        :param qubits: The qubits of the new table, which must include those of this one.
+        :return: A PauliTable with the columns of ``qubits``.
+        """
+        qubits = tuple(qubits)
+        if qubits == self.qubits:
+            return self
+        columns = {q: i for i, q in enumerate(qubits)}
+        if not all(q in columns for q in self.qubits):
+            raise ValueError(f"The qubits {qubits} don't include all of {self.qubits}")
+        x = np.zeros((len(self), len(qubits)), dtype=bool)
+        z = np.zeros((len(self), len(qubits)), dtype=bool)
+        indices = [columns[q] for q in self.qubits]
+        x[:, indices], z[:, indices] = self.x, self.z
+        return PauliTable(x, z, self.coefficients, qubits)
+
+    def _aligned(self, other):
+        """This table and ``other`` (a PauliTable, PauliSum or PauliTerm) on the same qubits."""
+        if not isinstance(other, PauliTable):
+            other = PauliTable.from_pauli_sum(other)
+        known = set(self.qubits)
+        qubits = self.qubits + tuple(q for q in other.qubits if q not in known)
+        return self.on_qubits(qubits), other.on_qubits(qubits)
+
+    def __mul__(self, other):
+        """
+        Multiply each term of this PauliTable with each term of another PauliTable, PauliSum or
+        PauliTerm, and simplify the products, or multiply the coefficients by a number.
+
+        :param other: A PauliTable, PauliSum, PauliTerm or Number.
+        :return: The product as a new PauliTable.
+        """
+        if isinstance(other, Number):
+            return PauliTable._from_packed(self._x, self._z, self.coefficients * other, self.qubits)
+        return self.product(other).simplify()
+
+    def __rmul__(self, other):
+        if isinstance(other, Number):
+            return self * other
+        return PauliTable.from_pauli_sum(other) * self
+
+    def product(self, other):
+        """
+        Multiply each term of this PauliTable with each term of another PauliTable, PauliSum or
+        PauliTerm, without simplifying the products.
+
+        :param other: A PauliTable, PauliSum or PauliTerm.
+        :return: A PauliTable of the products, in which the product of the i-th term of this
+            table and the j-th term of ``other`` is the row ``i * len(other) + j``.
+        """
+        left, right = self._aligned(other)
+        x1, z1 = left._x[:, np.newaxis], left._z[:, np.newaxis]
+        x2, z2 = right._x[np.newaxis], right._z[np.newaxis]
+        # The product of two Paulis on a qubit has a phase of i for XY, YZ and ZX and of -i for
+        # YX, ZY and XZ.
+        plus = (x1 & ~z1 & x2 & z2) | (x1 & z1 & ~x2 & z2) | (~x1 & z1 & x2 & ~z2)
+        minus = (x1 & z1 & x2 & ~z2) | (~x1 & z1 & x2 & z2) | (x1 & ~z1 & ~x2 & z2)
+        exponents = _POPCOUNT[plus].sum(axis=-1) - _POPCOUNT[minus].sum(axis=-1)
+        coefficients = (left.coefficients[:, np.newaxis] * right.coefficients[np.newaxis]
+                        * _I_POWERS[exponents % 4])
+        shape = (len(left) * len(right), left._x.shape[1])
+        return PauliTable._from_packed((x1 ^ x2).reshape(shape), (z1 ^ z2).reshape(shape),
+                                       coefficients.reshape(-1), left.qubits)
+
+    def __add__(self, other):
+        """
+        Add another PauliTable, PauliSum, PauliTerm or Number to this PauliTable, and simplify the
+        sum.
+
+        :param other: A PauliTable, PauliSum, PauliTerm or Number.
+        :return: The sum as a new PauliTable.
+        """
+        if isinstance(other, Number):
+            other = other * ID()
+        left, right = self._aligned(other)
+        return PauliTable._from_packed(np.concatenate([left._x, right._x]),
+                                       np.concatenate([left._z, right._z]),
+                                       np.concatenate([left.coefficients, right.coefficients]),
+                                       left.qubits).simplify()
+
+    def __radd__(self, other):
+        if isinstance(other, Number):
+            return self + other
+        return PauliTable.from_pauli_sum(other) + self
+
+    def __sub__(self, other):
+        return self + -1. * other
+
+    def __rsub__(self, other):
+        return other + -1. * self
+
+    def commutes(self, other):
+        """
+        Check whether each term of this PauliTable commutes with each term of another PauliTable,
+        PauliSum or PauliTerm, i.e. whether they anti-commute on an even number of qubits.
+
+        :param other: A PauliTable, PauliSum or PauliTerm.
+        :return: A boolean array with a row for each term of this table and a column for each
+            term of ``other``.
+        """
+        left, right = self._aligned(other)
+        # the parity of the number of set bits is that of the XOR of the bytes, which is
+        # accumulated a column of bytes at a time to work on contiguous arrays
+        anticommuting = np.zeros((len(left), len(right)), dtype=np.uint8)
+        for x1, z1, x2, z2 in zip(left._x.T, left._z.T, right._x.T, right._z.T):
+            anticommuting ^= np.bitwise_and.outer(x1, z2)
+            anticommuting ^= np.bitwise_and.outer(z1, x2)
+        return ~_PARITY[anticommuting]
+
+    def qubitwise_commutes(self, other):
+        """
+        Check whether each term of this PauliTable commutes qubit-wise with each term of another
+        PauliTable, PauliSum or PauliTerm, i.e. whether they have the same Pauli on every qubit
+        on which they both act.
+
+        :param other: A PauliTable, PauliSum or PauliTerm.
+        :return: A boolean array with a row for each term of this table and a column for each
+            term of ``other``.
+        """
+        left, right = self._aligned(other)
+        different = np.zeros((len(left), len(right)), dtype=np.uint8)
+        for x1, z1, x2, z2 in zip(left._x.T, left._z.T, right._x.T, right._z.T):
+            different |= (np.bitwise_and.outer(x1 | z1, x2 | z2)
+                          & (np.bitwise_xor.outer(x1, x2) | np.bitwise_xor.outer(z1, z2)))
+        return different == 0
+
+    def commutator(self, other):
+        """
+        The commutator ``self * other - other * self`` of this PauliTable and another PauliTable,
+        PauliSum or PauliTerm.
+
+        :param other: A PauliTable, PauliSum or PauliTerm.
+        :return: The simplified commutator as a new PauliTable.
+        """
+        product = self.product(other)
+        # terms which commute cancel, and those which anti-commute are doubled
+        commuting = self.commutes(other).reshape(-1)
+        return PauliTable._from_packed(product._x[~commuting], product._z[~commuting],
+                                       2 * product.coefficients[~commuting],
+                                       product.qubits).simplify()
+
+    def simplify(self):
+        """
+        Combine the terms of this PauliTable which have the same Paulis, in the order in which they
+        first appear, and remove those with a coefficient close to zero.
+
+        :return: The simplified PauliTable.
+        """
+        if len(self) == 0:
+            return self
+        keys = np.concatenate([self._x, self._z], axis=1)
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        coefficients = (np.bincount(inverse, self.coefficients.real, len(first))
+                        + 1j * np.bincount(inverse, self.coefficients.imag, len(first)))
+        order = np.argsort(first, kind='stable')
+        rows, coefficients = first[order], coefficients[order]
+        nonzero = ~np.isclose(coefficients, 0.0)
+        rows, coefficients = rows[nonzero], coefficients[nonzero]
+        return PauliTable._from_packed(self._x[rows], self._z[rows], coefficients, self.qubits)
@@ -0,0 +1,190 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+A local peephole optimizer which removes obvious redundancies from a program before it is sent
+to the compiler.
+
+The optimizer makes a single pass over the program, keeping for each qubit a stack of the gates
+that act on it and haven't been removed. A gate is compared with the gate on top of the stacks
+of its qubits, i.e. the gate it would be adjacent to if the program were drawn as a circuit.
+"""
+import sys
+from math import pi
+from numbers import Real
+from typing import Dict, List, Tuple
+
+from pyquil.quil import Program, _inverse_gate
+from pyquil.quilatom import Expression
+from pyquil.quilbase import Declare, Gate, Measurement, Pragma, ResetQubit
+
+if sys.version_info < (3, 7):
+    from pyquil.external.dataclasses import dataclass
+else:
+    from dataclasses import dataclass
+
+# Gates with a single angle such that applying the gate twice adds the angles.
+_ADDITIVE_ROTATIONS = frozenset(['RX', 'RY', 'RZ', 'PHASE', 'CPHASE', 'CPHASE00', 'CPHASE01',
+                                 'CPHASE10'])
+
+# Angles closer than this to a multiple of 2 pi are removed.
+_ANGLE_ATOL = 1e-10
+
+
+@dataclass(frozen=True)
+class PeepholeReport:
+    """
+    The reduction achieved by :py:func:`peephole_optimize`.
+    """
+    original_length: int
+    """The number of instructions in the program."""
+    optimized_length: int
+    """The number of instructions in the optimized program."""
+    cancelled_pairs: int
+    """The number of pairs of adjacent gates that were removed because they are inverses."""
+    merged_rotations: int
+    """The number of rotations that were merged into the previous rotation on their qubits."""
+    removed_identities: int
+    """The number of rotations by a multiple of 2 pi that were removed."""
+
+    @property
+    def reduction(self) -> int:
+        """The number of instructions removed."""
+        return self.original_length - self.optimized_length
+
+
+def _same_params(first, second) -> bool:
+    if isinstance(first, Expression) or isinstance(second, Expression):
+        return str(first) == str(second)
+    return first == second
+
+
+def _same_gate(first: Gate, second: Gate) -> bool:
+    return first.name == second.name and first.qubits == second.qubits \
+        and first.modifiers == second.modifiers and len(first.params) == len(second.params) \
+        and all(_same_params(a, b) for a, b in zip(first.params, second.params))
+
+
+def _is_symbolic(gate: Gate) -> bool:
+    return any(isinstance(param, Expression) for param in gate.params)
+
+
+def _is_zero_angle(angle) -> bool:
+    return isinstance(angle, Real) and abs((angle + pi) % (2 * pi) - pi) < _ANGLE_ATOL
+
+
+def peephole_optimize(program: Program) -> Tuple[Program, PeepholeReport]:
+    """
+    Remove obvious redundancies from a program in time linear in its length.
+
+    The following rewrites are applied until none applies:
+
+    - Adjacent gates which are inverses of each other, such as ``H 0; H 0``,
+      ``CNOT 0 1; CNOT 0 1`` or ``S 0; DAGGER S 0``, are removed.
+    - Adjacent rotations of the same kind on the same qubits, such as ``RZ(a) 0; RZ(b) 0``, are
+      merged into one rotation by the sum of their angles.
+    - Rotations by a multiple of 2 pi, such as ``RX(0) 0``, are removed. ``I`` gates are kept,
+      since they are often used as delays or to apply noise.
+
+    Two gates are adjacent if no instruction in between acts on one of their qubits.
+    Measurements and qubit resets block rewrites on their qubit. Instructions that don't act on
+    specific qubits, such as classical instructions, PRAGMAs, jumps and RESET, block all
+    rewrites across them, and the contents of ``PRESERVE_BLOCK`` pragmas are left untouched.
+
+    Only the global phase of the program may change, so programs that rely on noise attached to
+    particular gates (e.g. with ``ADD-KRAUS`` pragmas) should not be optimized.
+
+    .. code-block:: python
+
+        optimized, report = peephole_optimize(Program(H(0), H(0), RZ(0.1, 1), RZ(0.2, 1)))
+        optimized.out()  # 'RZ(0.30000000000000004) 1\\n'
+        report.reduction  # 3
+
+    :param program: The program to optimize.
+    :return: The optimized program and a report of the reduction.
+    """
+    defined_gate_names = {dg.name for dg in program.defined_gates}
+    instructions = []  # type: List
+    # the indices in `instructions` of the gates on each qubit which haven't been removed
+    stacks = {}  # type: Dict[object, List[int]]
+    # measurements into memory may change the value of the parameters of later gates, so a pair
+    # of gates one of which has symbolic parameters is only rewritten if no measurement happened
+    # between them
+    measurements = 0
+    measurements_before = {}  # type: Dict[int, int]
+    preserving = False
+    original_length = cancelled = merged = removed = 0
+
+    for instr in program:
+        original_length += 1
+        if isinstance(instr, Gate) and not preserving:
+            gate = instr
+            is_rotation = gate.name in _ADDITIVE_ROTATIONS and not gate.modifiers \
+                and gate.name not in defined_gate_names
+            if is_rotation and _is_zero_angle(gate.params[0]):
+                removed += 1
+                continue
+
+            tops = {stacks[q][-1] if stacks.get(q) else None for q in gate.qubits}
+            previous = instructions[tops.pop()] if len(tops) == 1 and None not in tops else None
+            if previous is not None and len(previous.qubits) == len(gate.qubits) \
+                    and (measurements_before[stacks[gate.qubits[0]][-1]] == measurements
+                         or not (_is_symbolic(previous) or _is_symbolic(gate))):
+                if _same_gate(_inverse_gate(previous, defined_gate_names), gate):
+                    for q in previous.qubits:
+                        instructions[stacks[q].pop()] = None
+                    cancelled += 1
+                    continue
+                if is_rotation and previous.name == gate.name and not previous.modifiers \
+                        and previous.qubits == gate.qubits:
+                    angle = previous.params[0] + gate.params[0]
+                    index = stacks[gate.qubits[0]][-1]
+                    merged += 1
+                    if _is_zero_angle(angle):
+                        for q in previous.qubits:
+                            stacks[q].pop()
+                        instructions[index] = None
+                        removed += 1
+                    else:
+                        instructions[index] = Gate(gate.name, [angle], gate.qubits)
+                    continue
+
+            for q in gate.qubits:
+                stacks.setdefault(q, []).append(len(instructions))
+            measurements_before[len(instructions)] = measurements
+            instructions.append(gate)
+        elif isinstance(instr, (Measurement, ResetQubit)):
+            stacks.pop(instr.qubit, None)
+            if isinstance(instr, Measurement) and instr.classical_reg is not None:
+                measurements += 1
+            instructions.append(instr)
+        elif isinstance(instr, Declare):
+            instructions.append(instr)
+        else:
+            stacks.clear()
+            if isinstance(instr, Pragma) and instr.command == 'PRESERVE_BLOCK':
+                preserving = True
+            elif isinstance(instr, Pragma) and instr.command == 'END_PRESERVE_BLOCK':
+                preserving = False
+            instructions.append(instr)
+
+    new_prog = program.copy_everything_except_instructions()
+    new_prog.inst([instr for instr in instructions if instr is not None])
+    report = PeepholeReport(original_length=original_length,
+                            optimized_length=len(new_prog),
+                            cancelled_pairs=cancelled,
+                            merged_rotations=merged,
+                            removed_identities=removed)
+    return new_prog, report
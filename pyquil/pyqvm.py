@@ -15,14 +15,16 @@
 ##############################################################################
 import warnings
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from typing import Type, Dict, Tuple, Union, List, Sequence
+from collections import defaultdict, OrderedDict
+from typing import Type, Dict, Tuple, Union, List, Sequence, Optional, Hashable
 
 import numpy as np
 from numpy.random.mtrand import RandomState
 
 from pyquil.api import QAM
 from pyquil.api._compiler import _extract_program_from_pyquil_executable_response
+from pyquil.circuit_array import CircuitArray
+from pyquil.light_cone import light_cone, split_program
 from pyquil.paulis import PauliTerm, PauliSum
 from pyquil.quil import Program
 from pyquil.quilbase import Gate, Measurement, ResetQubit, DefGate, JumpTarget, JumpConditional, \
@@ -32,7 +34,8 @@ from pyquil.quilbase import Gate, Measurement, ResetQubit, DefGate, JumpTarget,
     ClassicalExchange, ClassicalConvert, ClassicalLoad, ClassicalStore, ClassicalComparison, \
     ClassicalEqual, ClassicalLessThan, ClassicalLessEqual, ClassicalGreaterThan, \
     ClassicalGreaterEqual, Jump, Pragma, Declare, RawInstr
-from pyquil.quilatom import Label, MemoryReference
+from pyquil.quilatom import Label, MemoryReference, Qubit
+from pyquil.simulator_selection import SimulatorDecision, analyze_program, select_simulator
 
 import logging
 
@@ -78,19 +81,36 @@ class AbstractQuantumSimulator(ABC):
         :return: ``self`` to support method chaining.
         """
 
-    def do_program(self, program: Program) -> 'AbstractQuantumSimulator':
+    def do_program(self, program: Union[Program, CircuitArray]) -> 'AbstractQuantumSimulator':
         """
         Perform a sequence of gates contained within a program.
 
-        :param program: The program
+        :param program: The program, or a :py:class:`~pyquil.circuit_array.CircuitArray`.
         :return: self
         """
+        if isinstance(program, CircuitArray):
+            return self.do_circuit(program)
         for gate in program:
             if not isinstance(gate, Gate):
                 raise ValueError("Can only compute the simulate a program composed of `Gate`s")
             self.do_gate(gate)
         return self
 
+    def do_circuit(self, circuit: CircuitArray) -> 'AbstractQuantumSimulator':
+        """
+        Perform the gates of a :py:class:`~pyquil.circuit_array.CircuitArray`.
+
+        Gate matrices are computed once per distinct gate and applied with
+        :py:func:`do_gate_matrix`, without creating a :py:class:`Gate` for each row. Unlike
+        :py:func:`do_gate`, the DAGGER and CONTROLLED modifiers are honored.
+
+        :param circuit: The circuit.
+        :return: self
+        """
+        for matrix, qubits in circuit.unitaries():
+            self.do_gate_matrix(matrix, qubits)
+        return self
+
     @abstractmethod
     def do_measurement(self, qubit: int) -> int:
         """
@@ -144,6 +164,98 @@ class NotRunAndMeasureProgramError(ValueError):
     pass
 
 
+# The attributes holding the quantum state of the simulators that ship with pyQuil.
+_SIMULATOR_STATE_ATTRIBUTES = ('wf', 'density')
+
+
+def _get_simulator_state(simulator: AbstractQuantumSimulator) -> Optional[np.ndarray]:
+    for attr in _SIMULATOR_STATE_ATTRIBUTES:
+        state = getattr(simulator, attr, None)
+        if isinstance(state, np.ndarray):
+            return state
+    return None
+
+
+def _set_simulator_state(simulator: AbstractQuantumSimulator, state: np.ndarray):
+    for attr in _SIMULATOR_STATE_ATTRIBUTES:
+        if isinstance(getattr(simulator, attr, None), np.ndarray):
+            setattr(simulator, attr, state.copy())
+            return
+    raise ValueError("Can't set the state of a {}".format(type(simulator).__name__))
+
+
+class PrefixStateCache:
+    """
+    A cache of simulator states reached after running a prefix of a program from ``|0...0>``.
+
+    Entries are keyed by a structural hash of the prefix (see :py:meth:`prefix_keys`) and
+    evicted least-recently-used first once their total size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        :param max_bytes: The maximum total size of the cached states in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._states = OrderedDict()  # type: Dict[int, np.ndarray]
+
+    def __len__(self):
+        return len(self._states)
+
+    @staticmethod
+    def prefix_keys(program: Program, context: Hashable = None) -> List[int]:
+        """
+        Compute the cache key of every prefix of a program.
+
+        :param program: The program.
+        :param context: Anything else the simulated state depends on, e.g. the simulator type
+            and noise model.
+        :return: A list whose ``i``-th entry is the key of the first ``i`` instructions.
+        """
+        key = hash((context, tuple(dg.out() for dg in program.defined_gates)))
+        keys = [key]
+        for instr in program:
+            key = hash((key, instr.out()))
+            keys.append(key)
+        return keys
+
+    def lookup(self, keys: Sequence[int]) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Find the longest cached prefix.
+
+        :param keys: The prefix keys of a program, as returned by :py:meth:`prefix_keys`.
+        :return: The length of the longest cached prefix and its state, or ``(0, None)``.
+        """
+        for length in range(len(keys) - 1, 0, -1):
+            state = self._states.get(keys[length])
+            if state is not None:
+                self._states.move_to_end(keys[length])
+                self.hits += 1
+                return length, state
+        self.misses += 1
+        return 0, None
+
+    def store(self, key: int, state: np.ndarray):
+        """
+        Store a copy of ``state`` under ``key``, evicting old entries to stay within
+        ``max_bytes``.
+        """
+        if key in self._states or state.nbytes > self.max_bytes:
+            return
+        self._states[key] = state.copy()
+        self.n_bytes += state.nbytes
+        while self.n_bytes > self.max_bytes:
+            _, evicted = self._states.popitem(last=False)
+            self.n_bytes -= evicted.nbytes
+
+    def clear(self):
+        self._states.clear()
+        self.n_bytes = 0
+
+
 def _make_ram_program(program):
     """
     Check that this program is a series of quantum gates with terminal MEASURE instructions; pop
@@ -198,10 +310,36 @@ def _make_ram_program(program):
     return new_prog, qubit_to_ram, ro_size
 
 
+def _remap_qubits(program: Program, qubit_mapping: Dict[int, int]) -> Program:
+    """
+    Relabel the qubits of a run-and-measure program.
+
+    :param program: A program as returned by :py:func:`_make_ram_program`, i.e. without
+        MEASURE instructions.
+    :param qubit_mapping: A mapping from the qubit indices used in ``program`` to new indices.
+    :return: A new program acting on the new qubit indices.
+    """
+    new_prog = program.copy_everything_except_instructions()
+    for instr in program:
+        if isinstance(instr, Gate):
+            gate = Gate(instr.name, instr.params,
+                        [Qubit(qubit_mapping[q.index]) for q in instr.qubits])
+            gate.modifiers = instr.modifiers.copy()
+            new_prog += gate
+        else:
+            # PRAGMAs and DECLAREs don't touch the wavefunction.
+            new_prog += instr
+    return new_prog
+
+
 class PyQVM(QAM):
-    def __init__(self, n_qubits, quantum_simulator_type: Type[AbstractQuantumSimulator] = None,
+    def __init__(self, n_qubits,
+                 quantum_simulator_type: Union[Type[AbstractQuantumSimulator], str] = None,
                  seed=None,
                  post_gate_noise_probabilities: Dict[str, float] = None,
+                 compact_qubits: bool = True,
+                 prune_program: bool = True,
+                 prefix_cache_bytes: int = 2 ** 27,
                  ):
         """
         PyQuil's built-in Quil virtual machine.
@@ -214,13 +352,41 @@ class PyQVM(QAM):
             ndarray, so be judicious.
         :param quantum_simulator_type: A class that can be instantiated to handle the quantum
             aspects of this QVM. If not specified, the default will be either
-            NumpyWavefunctionSimulator (no noise) or ReferenceDensitySimulator (noise)
+            NumpyWavefunctionSimulator (no noise) or ReferenceDensitySimulator (noise). If
+            ``'auto'``, each program is analyzed when it is loaded and run on the backend with
+            the smallest predicted memory footprint for the (possibly compacted) register,
+            refusing programs that would not fit in memory. Only noise is taken into account
+            besides the register size: whether the program is Clifford and how its qubits
+            cluster are recorded in :py:attr:`simulator_decision` but do not change the choice,
+            as there is no stabilizer backend and every backend stores the whole register. See
+            :py:mod:`pyquil.simulator_selection`.
         :param post_gate_noise_probabilities: A specification of noise model given by
             probabilities of certain types of noise. The dictionary keys are from "relaxation",
             "dephasing", "depolarizing", "phase_flip", "bit_flip", and "bitphase_flip".
             WARNING: experimental. This interface will likely change.
         :param seed: An optional random seed for performing stochastic aspects of the QVM.
+        :param compact_qubits: Whether :py:func:`load` should relabel the qubits used by a
+            program onto a dense register ``0..k-1`` and only simulate those ``k`` qubits. This
+            lets programs compiled for a lattice (e.g. using qubits 10-17) run without
+            allocating a state over every qubit index up to the largest one. Results are still
+            written to the ``ro`` offsets given in the program. Note that when the register is
+            compacted, a :py:attr:`wf_simulator` created by the PyQVM is replaced by a fresh
+            simulator of the smaller size.
+        :param prune_program: Whether :py:func:`load` should drop gates outside the backward
+            light cone of the measured qubits (so gates on unmeasured qubits, or after a qubit's
+            measurement, are allowed), and :py:func:`run` should simulate clusters of
+            qubits that never interact on separate, smaller simulators. See
+            :py:mod:`pyquil.light_cone`. Clusters are simulated from the ``|0...0>`` state, so
+            turn this off if you set a custom initial state on :py:attr:`wf_simulator`.
+        :param prefix_cache_bytes: The memory budget of :py:attr:`prefix_cache`, which lets
+            :py:func:`run` resume from the simulated state of an instruction prefix shared with
+            a previously run program, e.g. the common body of tomography experiments. Set to 0
+            to disable the cache.
         """
+        self.auto_select_simulator = quantum_simulator_type == 'auto'
+        if self.auto_select_simulator:
+            quantum_simulator_type = None
+
         if quantum_simulator_type is None:
             if post_gate_noise_probabilities is None:
                 from pyquil.numpy_simulator import NumpyWavefunctionSimulator
@@ -231,6 +397,8 @@ class PyQVM(QAM):
                 quantum_simulator_type = ReferenceDensitySimulator
 
         self.n_qubits = n_qubits
+        self.compact_qubits = compact_qubits
+        self.prune_program = prune_program
         self.ram = {}
 
         if post_gate_noise_probabilities is None:
@@ -241,27 +409,111 @@ class PyQVM(QAM):
         self.program_counter = None  # type: int
         self.defined_gates = dict()  # type: Dict[str, np.ndarray]
 
+        # A mapping from the qubits used by the loaded program to the simulator's qubits. This
+        # is the identity unless the register was compacted in `load`.
+        self.qubit_mapping = None  # type: Dict[int, int]
+
         # private implementation details
         self._qubit_to_ram = None  # type: Dict[int, int]
         self._ro_size = None  # type :int
         self._bitstrings = None  # type: np.ndarray
+        self._cluster_programs = None  # type: List[Tuple[List[int], Program]]
+
+        # The backend chosen for the last program when `quantum_simulator_type='auto'`.
+        self.simulator_decision = None  # type: SimulatorDecision
+
+        self.prefix_cache = PrefixStateCache(max_bytes=prefix_cache_bytes)
+        self._previous_prefix_keys = []  # type: List[int]
 
         self.rs = np.random.RandomState(seed=seed)
-        self.wf_simulator = quantum_simulator_type(n_qubits=n_qubits, rs=self.rs)
+        self._quantum_simulator_type = quantum_simulator_type
+        # The simulator most recently created by the PyQVM, which it may resize at will.
+        self._own_simulator = None  # type: AbstractQuantumSimulator
+        self._new_simulator(n_qubits)
         self._last_measure_program_loc = None
 
+    def _ensure_simulator_size(self, n_qubits: int):
+        """
+        Make sure :py:attr:`wf_simulator` can simulate ``n_qubits`` qubits, replacing it with a
+        fresh simulator if necessary.
+
+        A simulator created by the PyQVM is resized to exactly ``n_qubits`` qubits. One
+        assigned to :py:attr:`wf_simulator` by the user (e.g. with its own random state) is
+        only replaced when it is too small.
+        """
+        if self.wf_simulator is self._own_simulator:
+            replace = self.wf_simulator.n_qubits != n_qubits
+        else:
+            replace = self.wf_simulator.n_qubits < n_qubits
+        if replace:
+            self._new_simulator(n_qubits)
+
+    def _new_simulator(self, n_qubits: int):
+        self.wf_simulator = self._quantum_simulator_type(n_qubits=n_qubits, rs=self.rs)
+        self._own_simulator = self.wf_simulator
+
+    def _select_simulator(self, program: Program, n_qubits: int):
+        """
+        Choose the simulator backend for ``program`` and record the decision.
+
+        :param program: The program that is about to be simulated.
+        :param n_qubits: The number of qubits the simulator will be allocated with.
+        """
+        analysis = analyze_program(program)
+        if len(analysis.noise_pragmas) > 0:
+            warnings.warn("PyQVM does not apply noise PRAGMAs; use "
+                          "post_gate_noise_probabilities instead")
+        self.simulator_decision = select_simulator(
+            analysis, noisy=len(self.post_gate_noise_probabilities) > 0, n_qubits=n_qubits)
+        log.info("Using %s", self.simulator_decision)
+        self._quantum_simulator_type = self.simulator_decision.simulator_type
+        if type(self.wf_simulator) is not self._quantum_simulator_type:
+            self._new_simulator(n_qubits)
+
     def load(self, executable):
         if isinstance(executable, PyQuilExecutableResponse):
             program = _extract_program_from_pyquil_executable_response(executable)
         else:
             program = executable
 
+        if self.prune_program:
+            program = light_cone(program)
+
         try:
             program, self._qubit_to_ram, self._ro_size = _make_ram_program(program)
         except NotRunAndMeasureProgramError as e:
             raise ValueError("PyQVM can only run run-and-measure style programs: {}"
                              .format(e))
 
+        active_qubits = sorted(program.get_qubits() | set(self._qubit_to_ram))
+        if len(active_qubits) > self.n_qubits:
+            raise ValueError("This program uses {} qubits but the PyQVM only has {}"
+                             .format(len(active_qubits), self.n_qubits))
+
+        if self.compact_qubits and 0 < len(active_qubits) \
+                and active_qubits != list(range(self.n_qubits)):
+            self.qubit_mapping = {q: i for i, q in enumerate(active_qubits)}
+            program = _remap_qubits(program, self.qubit_mapping)
+            self._qubit_to_ram = {self.qubit_mapping[q]: offset
+                                  for q, offset in self._qubit_to_ram.items()}
+            register_size = len(active_qubits)
+        else:
+            self.qubit_mapping = {q: q for q in active_qubits}
+            register_size = self.n_qubits
+
+        if self.auto_select_simulator:
+            self._select_simulator(program, register_size)
+        self._ensure_simulator_size(register_size)
+
+        self._cluster_programs = None
+        if self.prune_program:
+            clusters = split_program(program, self._qubit_to_ram)
+            if len(clusters) > 1:
+                self._cluster_programs = [
+                    (qubits, _remap_qubits(cluster_program,
+                                           {q: i for i, q in enumerate(qubits)}))
+                    for qubits, cluster_program in clusters]
+
         # initialize program counter
         self.program = program
         self.program_counter = 0
@@ -290,13 +542,13 @@ class PyQVM(QAM):
                 raise NotImplementedError("PyQVM does not support parameterized DEFGATEs")
             self.defined_gates[dg.name] = dg.matrix
 
-        halted = len(self.program) == 0
-        while not halted:
-            halted = self.transition()
-
-        bitstrings = self.wf_simulator.sample_bitstrings(self.program.num_shots)
-
         n_shots = self.program.num_shots
+        if self._cluster_programs is None:
+            self._run_with_prefix_cache()
+            bitstrings = self.wf_simulator.sample_bitstrings(n_shots)
+        else:
+            bitstrings = self._run_clusters(n_shots)
+
         self.ram['ro'] = np.zeros((n_shots, self._ro_size), dtype=int)
         for q in range(bitstrings.shape[1]):
             if q in self._qubit_to_ram:
@@ -308,6 +560,75 @@ class PyQVM(QAM):
         self.wf_simulator.reset()
         return self
 
+    def _run_with_prefix_cache(self):
+        """
+        Run the loaded program to completion, resuming from the longest prefix in
+        :py:attr:`prefix_cache` and snapshotting the state at the end of the prefix shared with
+        the previously run program.
+        """
+        state = _get_simulator_state(self.wf_simulator)
+        if self.prefix_cache.max_bytes <= 0 or state is None \
+                or not np.isclose(state.flat[0], 1):
+            # the cached states all start from |0...0>
+            self.program_counter = 0
+            halted = len(self.program) == 0
+            while not halted:
+                halted = self.transition()
+            return
+
+        context = (type(self.wf_simulator), self.wf_simulator.n_qubits,
+                   tuple(sorted(self.post_gate_noise_probabilities.items())))
+        keys = PrefixStateCache.prefix_keys(self.program, context)
+        start, cached_state = self.prefix_cache.lookup(keys)
+        if cached_state is not None:
+            _set_simulator_state(self.wf_simulator, cached_state)
+            # Only gates change the simulator's state; replay everything else (e.g. DECLARE).
+            for index in range(start):
+                if not isinstance(self.program[index], Gate):
+                    self.program_counter = index
+                    self.transition()
+
+        checkpoint = 0
+        for key, previous_key in zip(keys, self._previous_prefix_keys):
+            if key != previous_key:
+                break
+            checkpoint += 1
+        checkpoint -= 1
+        self._previous_prefix_keys = keys
+
+        self.program_counter = start
+        halted = start >= len(self.program)
+        while True:
+            if self.program_counter == checkpoint and checkpoint > start:
+                self.prefix_cache.store(keys[checkpoint],
+                                        _get_simulator_state(self.wf_simulator))
+            if halted:
+                break
+            halted = self.transition()
+
+    def _run_clusters(self, n_shots: int) -> np.ndarray:
+        """
+        Simulate each cluster of non-interacting qubits on its own simulator and stitch the
+        sampled bitstrings back together.
+
+        :param n_shots: The number of bitstrings to sample.
+        :return: An array of shape (n_shots, n_qubits of the simulator)
+        """
+        bitstrings = np.zeros((n_shots, self.wf_simulator.n_qubits), dtype=int)
+        program, wf_simulator = self.program, self.wf_simulator
+        try:
+            for qubits, cluster_program in self._cluster_programs:
+                self.program = cluster_program
+                self.program_counter = 0
+                self.wf_simulator = self._quantum_simulator_type(n_qubits=len(qubits), rs=self.rs)
+                halted = len(self.program) == 0
+                while not halted:
+                    halted = self.transition()
+                bitstrings[:, qubits] = self.wf_simulator.sample_bitstrings(n_shots)
+        finally:
+            self.program, self.wf_simulator = program, wf_simulator
+        return bitstrings
+
     def wait(self):
         assert self.status == 'running'
         self.status = 'done'
@@ -509,6 +830,11 @@ class PyQVM(QAM):
 
         :return: ``self`` to support method chaining.
         """
+        # A previous `load` may have compacted the register; arbitrary programs need all of it.
+        if self.auto_select_simulator:
+            self._select_simulator(program, self.n_qubits)
+        self._ensure_simulator_size(self.n_qubits)
+
         # TODO: why are DEFGATEs not just included in the list of instructions?
         for dg in program.defined_gates:
             if dg.parameters is not None:
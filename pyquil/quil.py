@@ -18,17 +18,15 @@ Module for creating and defining Quil programs.
 """
 import itertools
 import types
-from typing import Iterable, Set
+from typing import Iterable, Set, TYPE_CHECKING
 import warnings
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, namedtuple
 from math import pi
 
 import numpy as np
-from rpcq.messages import NativeQuilMetadata
 from six import string_types
 from typing import List, Dict
 
-from pyquil._parser.PyQuilListener import run_parser
 from pyquil.noise import _check_kraus_ops, _create_kraus_pragmas, pauli_kraus_map
 from pyquil.parameters import format_parameter
 from pyquil.quilatom import (LabelPlaceholder, QubitPlaceholder, unpack_qubit, Addr,
@@ -38,6 +36,153 @@ from pyquil.quilbase import (DefGate, Gate, Measurement, Pragma, AbstractInstruc
                              Jump, Label, JumpConditional, JumpTarget, JumpUnless, JumpWhen,
                              Declare, Halt, Reset, ResetQubit)
 
+if TYPE_CHECKING:
+    from rpcq.messages import NativeQuilMetadata
+
+
+class _InstructionRope(object):
+    """
+    An immutable concatenation of two instruction sequences, each a tuple or another
+    ``_InstructionRope``. Programs share these so that concatenating them doesn't copy.
+    """
+    __slots__ = ('left', 'right', 'length')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+
+    def __len__(self):
+        return self.length
+
+    def flatten(self):
+        """All the instructions, in order, as a new list."""
+        # iterative, since ropes built by repeated concatenation are as deep as they are long
+        result = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, _InstructionRope):
+                stack.append(node.right)
+                stack.append(node.left)
+            else:
+                result.extend(node)
+        return result
+
+    def __reduce__(self):
+        # pickle and deepcopy a flat tuple rather than recursing through the tree
+        return tuple, (self.flatten(),)
+
+
+def _concat_instructions(left, right):
+    if left is None or len(left) == 0:
+        return right
+    if right is None or len(right) == 0:
+        return left
+    return _InstructionRope(left, right)
+
+
+_FingerprintState = namedtuple('_FingerprintState', ['length', 'value', 'declares_memory',
+                                                     'measures_memory', 'has_label_placeholders',
+                                                     'changes'])
+"""
+A rolling hash of the first ``length`` instructions of a program, along with what is needed to
+tell whether :py:meth:`Program._synthesize` could change them, and the value of
+``AbstractInstruction._changes`` when it was computed, after which it is stale.
+"""
+
+_EMPTY_FINGERPRINT = _FingerprintState(0, 0, False, False, False, 0)
+_FINGERPRINT_BASE = 1000003
+_FINGERPRINT_MODULUS = (1 << 61) - 1
+
+
+def _has_label_placeholder(instr):
+    if isinstance(instr, (Jump, JumpConditional)):
+        return isinstance(instr.target, LabelPlaceholder)
+    if isinstance(instr, JumpTarget):
+        return isinstance(instr.label, LabelPlaceholder)
+    return False
+
+
+def _extend_fingerprint(state, instructions):
+    """Update a fingerprint with instructions appended after the ones it covers."""
+    length, value, declares_memory, measures_memory, has_label_placeholders, _ = state
+    for instr in instructions:
+        length += 1
+        if _has_label_placeholder(instr):
+            # These can't be serialized on their own; the fingerprint of the program is
+            # computed from its synthesized instructions instead.
+            has_label_placeholders = True
+            digest = 0
+        else:
+            digest = hash(instr)
+        value = (value * _FINGERPRINT_BASE + digest) % _FINGERPRINT_MODULUS
+        if isinstance(instr, Declare):
+            declares_memory = True
+        elif isinstance(instr, Measurement) and instr.classical_reg is not None:
+            measures_memory = True
+    return _FingerprintState(length, value, declares_memory, measures_memory,
+                             has_label_placeholders, AbstractInstruction._changes)
+
+
+def _synthesis_may_change(state):
+    """
+    Whether :py:meth:`Program._synthesize` may rewrite the instructions a fingerprint state
+    covers, by instantiating label placeholders or implicitly declaring ``ro``.
+    """
+    return state.has_label_placeholders or (state.measures_memory and not state.declares_memory)
+
+
+def _is_current(state):
+    """Whether no instruction was changed in place since a fingerprint state was computed."""
+    return state.length == 0 or state.changes == AbstractInstruction._changes
+
+
+def _concat_fingerprints(first, second):
+    """The fingerprint of two instruction sequences, one after the other."""
+    shift = pow(_FINGERPRINT_BASE, second.length, _FINGERPRINT_MODULUS)
+    return _FingerprintState(
+        first.length + second.length,
+        (first.value * shift + second.value) % _FINGERPRINT_MODULUS,
+        first.declares_memory or second.declares_memory,
+        first.measures_memory or second.measures_memory,
+        first.has_label_placeholders or second.has_label_placeholders,
+        AbstractInstruction._changes,
+    )
+
+
+# Standard gates which are their own inverse, and those whose inverse negates their angle.
+_SELF_INVERSE_GATES = frozenset(['I', 'X', 'Y', 'Z', 'H', 'CZ', 'CNOT', 'CCNOT', 'SWAP', 'CSWAP'])
+_ANGLE_INVERSE_GATES = frozenset(['RX', 'RY', 'RZ', 'PHASE', 'CPHASE00', 'CPHASE01', 'CPHASE10',
+                                  'CPHASE', 'PSWAP'])
+
+
+def _inverse_gate(gate, defined_gate_names):
+    """
+    A new gate applying the inverse of ``gate``. Standard gates are inverted analytically and
+    other gates are given a DAGGER modifier.
+
+    :param Gate gate: The gate to invert.
+    :param defined_gate_names: The names of the gates defined by the program containing ``gate``,
+        which may shadow the standard gates.
+    :rtype: Gate
+    """
+    if gate.name in defined_gate_names:
+        inverse = Gate(gate.name, gate.params, gate.qubits)
+        inverse.modifiers = ['DAGGER'] + gate.modifiers
+        return inverse
+
+    # DAGGER and CONTROLLED commute with taking the inverse, so keep them as they are.
+    if gate.name in _SELF_INVERSE_GATES:
+        inverse = Gate(gate.name, gate.params, gate.qubits)
+    elif gate.name in _ANGLE_INVERSE_GATES:
+        inverse = Gate(gate.name, [-gate.params[0]], gate.qubits)
+    else:
+        inverse = Gate(gate.name, gate.params, gate.qubits)
+        inverse.modifiers = ['DAGGER']
+    inverse.modifiers += gate.modifiers
+    return inverse
+
 
 class Program(object):
     """A list of pyQuil instructions that comprise a quantum program.
@@ -53,7 +198,14 @@ class Program(object):
         # Implementation note: the key difference between the private _instructions and
         # the public instructions property below is that the private _instructions list
         # may contain placeholder labels.
-        self._instructions = []
+        #
+        # Performance optimization: _instructions is stored as an immutable prefix which may be
+        # shared with other programs (_shared_instructions, a tuple or _InstructionRope) followed
+        # by a list this program owns (_own_instructions). Concatenation and copying share the
+        # prefix instead of copying it, and it is only flattened into the owned list when
+        # _instructions is accessed.
+        self._shared_instructions = None
+        self._own_instructions = []
 
         # Performance optimization: as stated above _instructions may contain placeholder
         # labels so the program must first be have its labels instantiated.
@@ -61,6 +213,14 @@ class Program(object):
         # method.  It is marked as None whenever new instructions are added.
         self._synthesized_instructions = None
 
+        # Performance optimization: a rolling hash of (a prefix of) _instructions, which is
+        # extended as instructions are added and reset when they are removed. See fingerprint().
+        self._fingerprint_state = _EMPTY_FINGERPRINT
+
+        # Performance optimization: the result of out() along with the gate definitions and the
+        # number of instructions it covers. Appending instructions extends it on the next call.
+        self._out_cache = None
+
         self.inst(*instructions)
 
         # Filled in with quil_to_native_quil
@@ -95,9 +255,51 @@ class Program(object):
         :return: a new Program
         """
         new_prog = self.copy_everything_except_instructions()
-        new_prog._instructions = self._instructions.copy()
+        new_prog._shared_instructions = self._share_instructions()
+        new_prog._fingerprint_state = self._fingerprint_state
+        new_prog._out_cache = self._out_cache
         return new_prog
 
+    @property
+    def _instructions(self):
+        """
+        The list of instructions owned by this program, which may contain placeholders.
+        """
+        if self._shared_instructions is not None:
+            if isinstance(self._shared_instructions, _InstructionRope):
+                instructions = self._shared_instructions.flatten()
+            else:
+                instructions = list(self._shared_instructions)
+            instructions.extend(self._own_instructions)
+            self._own_instructions = instructions
+            self._shared_instructions = None
+        return self._own_instructions
+
+    @_instructions.setter
+    def _instructions(self, instructions):
+        self._shared_instructions = None
+        self._own_instructions = instructions
+        self._synthesized_instructions = None
+        self._fingerprint_state = _EMPTY_FINGERPRINT
+        self._out_cache = None
+
+    def _instruction_count(self):
+        """The length of _instructions, without flattening it."""
+        shared = 0 if self._shared_instructions is None else len(self._shared_instructions)
+        return shared + len(self._own_instructions)
+
+    def _share_instructions(self):
+        """
+        Freeze the instructions of this program so they can be shared with another program.
+
+        :return: An immutable sequence of the instructions.
+        """
+        if len(self._own_instructions) > 0:
+            self._shared_instructions = _concat_instructions(self._shared_instructions,
+                                                             tuple(self._own_instructions))
+            self._own_instructions = []
+        return self._shared_instructions
+
     @property
     def defined_gates(self):
         """
@@ -142,7 +344,8 @@ class Program(object):
             if isinstance(instruction, list):
                 self.inst(*instruction)
             elif isinstance(instruction, types.GeneratorType):
-                self.inst(*instruction)
+                for instr in instruction:
+                    self.inst(instr)
             elif isinstance(instruction, tuple):
                 if len(instruction) == 0:
                     raise ValueError("tuple should have at least one element")
@@ -165,15 +368,28 @@ class Program(object):
                             rest = [possible_params] + list(rest)
                         self.gate(op, params, rest)
             elif isinstance(instruction, string_types):
-                self.inst(run_parser(instruction.strip()))
+                from pyquil.parser import parse
+                self.inst(parse(instruction.strip()))
             elif isinstance(instruction, Program):
                 if id(self) == id(instruction):
                     raise ValueError("Nesting a program inside itself is not supported")
 
                 for defgate in instruction._defined_gates:
                     self.inst(defgate)
-                for instr in instruction._instructions:
-                    self.inst(instr)
+                fingerprint = None
+                if (self._fingerprint_state.length == self._instruction_count()
+                        and instruction._fingerprint_state.length
+                        == instruction._instruction_count()
+                        and _is_current(self._fingerprint_state)
+                        and _is_current(instruction._fingerprint_state)):
+                    fingerprint = _concat_fingerprints(self._fingerprint_state,
+                                                       instruction._fingerprint_state)
+                # share rather than copy the other program's instructions
+                self._shared_instructions = _concat_instructions(
+                    self._share_instructions(), instruction._share_instructions())
+                self._synthesized_instructions = None
+                if fingerprint is not None:
+                    self._fingerprint_state = fingerprint
 
             # Implementation note: these two base cases are the only ones which modify the program
             elif isinstance(instruction, DefGate):
@@ -184,7 +400,7 @@ class Program(object):
 
                 self._defined_gates.append(instruction)
             elif isinstance(instruction, AbstractInstruction):
-                self._instructions.append(instruction)
+                self._own_instructions.append(instruction)
                 self._synthesized_instructions = None
             else:
                 raise TypeError("Invalid instruction: {}".format(instruction))
@@ -484,12 +700,54 @@ class Program(object):
     def out(self):
         """
         Serializes the Quil program to a string suitable for submitting to the QVM or QPU.
+
+        The result is cached, and extended rather than recomputed when instructions are added.
         """
-        return '\n'.join(itertools.chain(
-            (dg.out() for dg in self._defined_gates),
-            (instr.out() for instr in self.instructions),
-            [''],
-        ))
+        state = self._update_fingerprint_state()
+        if _synthesis_may_change(state):
+            return '\n'.join(itertools.chain(
+                (dg._cached_out() for dg in self._defined_gates),
+                (instr._cached_out() for instr in self.instructions),
+                [''],
+            ))
+
+        # The instructions are serialized as they are, so the text of the previous call only
+        # needs the instructions added since then, unless an instruction was changed in place.
+        defined_gates, length, text, changes = self._out_cache or ((), 0, None, None)
+        if text is None or changes != AbstractInstruction._changes \
+                or len(defined_gates) != len(self._defined_gates) \
+                or any(old is not new for old, new in zip(defined_gates, self._defined_gates)):
+            defined_gates = tuple(self._defined_gates)
+            length = 0
+            text = ''.join(dg._cached_out() + '\n' for dg in defined_gates)
+        if length < state.length:
+            text += ''.join(instr._cached_out() + '\n'
+                            for instr in itertools.islice(self._instructions, length, None))
+        self._out_cache = (defined_gates, state.length, text, AbstractInstruction._changes)
+        return text
+
+    def dump(self, path):
+        """
+        Save the program to a file in pyQuil's binary format, which is much faster to save and
+        load than Quil text. See :py:mod:`pyquil.binary_format`.
+
+        :param str path: The path of the file.
+        """
+        from pyquil.binary_format import dump_program
+        dump_program(self, path)
+
+    @staticmethod
+    def load(path):
+        """
+        Load a program saved with :py:meth:`Program.dump`. The file must come from a trusted
+        source.
+
+        :param str path: The path of the file.
+        :return: The program.
+        :rtype: Program
+        """
+        from pyquil.binary_format import load_program
+        return load_program(path)
 
     def get_qubits(self, indices=True):
         """
@@ -553,6 +811,8 @@ class Program(object):
         """
         res = self._instructions.pop()
         self._synthesized_instructions = None
+        self._fingerprint_state = _EMPTY_FINGERPRINT
+        self._out_cache = None
         return res
 
     def dagger(self, inv_dict=None, suffix="-INV"):
@@ -560,6 +820,10 @@ class Program(object):
         Creates the conjugate transpose of the Quil program. The program must
         contain only gate applications.
 
+        The gates are inverted in reverse order. Self-inverse standard gates are kept as they
+        are, rotations such as ``RX(theta)`` become ``RX(-theta)`` and any other gate is given a
+        ``DAGGER`` modifier.
+
         Note: the keyword arguments inv_dict and suffix are kept only
         for backwards compatibility and have no effect.
 
@@ -570,10 +834,12 @@ class Program(object):
         if any(not isinstance(instr, Gate) for instr in self._instructions):
             raise ValueError("Program to be daggered must contain only gate applications")
 
-        # This is a bit hacky. Gate.dagger() mutates the gate object,
-        # rather than returning a fresh (and daggered) copy.
-        return Program([instr.dagger() for instr
-                        in reversed(Program(self.out())._instructions)])
+        defined_gate_names = {dg.name for dg in self._defined_gates}
+        new_prog = Program()
+        new_prog._defined_gates = self._defined_gates.copy()
+        new_prog.inst([_inverse_gate(instr, defined_gate_names)
+                       for instr in reversed(self._instructions)])
+        return new_prog
 
     def _synthesize(self):
         """
@@ -637,8 +903,52 @@ class Program(object):
         """
         return self.instructions.__iter__()
 
+    def fingerprint(self):
+        """
+        A structural hash of the program's gate definitions and instructions. Equal programs
+        have equal fingerprints.
+
+        The hash of the instructions is extended as instructions are added, and concatenating
+        programs combines their hashes, so fingerprinting a growing program only hashes the new
+        instructions. Changing an instruction in place, e.g. with :py:meth:`Gate.dagger`, makes
+        the fingerprints of all programs be recomputed from their current instructions. Like the
+        hash of a string, the value is only stable within one Python process, and it changes when
+        the program is changed.
+
+        :return: The fingerprint.
+        :rtype: int
+        """
+        state = self._update_fingerprint_state()
+        if _synthesis_may_change(state):
+            # hash the instructions that out() serializes
+            value = _extend_fingerprint(_EMPTY_FINGERPRINT, self.instructions).value
+        else:
+            value = state.value
+        return hash((tuple(hash(dg) for dg in self._defined_gates), value))
+
+    def _update_fingerprint_state(self):
+        """
+        Extend the fingerprint state to cover all of the instructions, or recompute it if an
+        instruction was changed in place since it was computed.
+        """
+        state = self._fingerprint_state
+        if not _is_current(state):
+            state = self._fingerprint_state = _EMPTY_FINGERPRINT
+        if state.length < self._instruction_count():
+            state = _extend_fingerprint(
+                state, itertools.islice(self._instructions, state.length, None))
+            self._fingerprint_state = state
+        return state
+
+    def __hash__(self):
+        return self.fingerprint()
+
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.out() == other.out()
+        if not isinstance(other, self.__class__):
+            return False
+        # programs with different fingerprints can't be equal, which is much cheaper to check
+        # than comparing their serializations
+        return self.fingerprint() == other.fingerprint() and self.out() == other.out()
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -949,7 +1259,10 @@ def merge_programs(prog_list):
             seen[name] = [definition]
     new_definitions = [gate for key in seen.keys() for gate in reversed(seen[key])]
 
-    p = sum([Program(prog).instructions for prog in prog_list], Program())  # Combine programs without gate definitions
+    # Combine programs without gate definitions
+    p = Program()
+    for prog in prog_list:
+        p.inst(Program(prog).instructions)
 
     for definition in new_definitions:
         p.defgate(definition.name, definition.matrix, definition.parameters)
@@ -17,12 +17,16 @@ import numpy as np
 from six import integer_types
 from warnings import warn
 from fractions import Fraction
+from functools import lru_cache
+from numbers import Number
+from typing import Dict
 
 
 class QuilAtom(object):
     """
     Abstract class for atomic elements of Quil.
     """
+    __slots__ = ()
 
     def out(self):
         raise NotImplementedError()
@@ -44,13 +48,39 @@ class Qubit(QuilAtom):
     """
     Representation of a qubit.
 
+    Qubits are immutable and interned: ``Qubit(i)`` always returns the same instance for a
+    given index.
+
     :param int index: Index of the qubit.
     """
+    __slots__ = ('index',)
+
+    _interned = {}  # type: Dict[int, Qubit]
 
-    def __init__(self, index):
+    def __new__(cls, index):
+        try:
+            return cls._interned[index]
+        except (KeyError, TypeError):
+            pass
         if not (isinstance(index, integer_types) and index >= 0):
             raise TypeError("Addr index must be a non-negative int")
-        self.index = index
+        qubit = super(Qubit, cls).__new__(cls)
+        object.__setattr__(qubit, 'index', index)
+        if cls is Qubit:
+            cls._interned[index] = qubit
+        return qubit
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Qubits are immutable")
+
+    def __reduce__(self):
+        return type(self), (self.index,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def out(self):
         return str(self.index)
@@ -69,6 +99,8 @@ class Qubit(QuilAtom):
 
 
 class QubitPlaceholder(QuilAtom):
+    __slots__ = ()
+
     def out(self):
         raise RuntimeError("Qubit {} has not been assigned an index".format(self))
 
@@ -152,6 +184,7 @@ class Label(QuilAtom):
 
     :param string label_name: The label name.
     """
+    __slots__ = ('name',)
 
     def __init__(self, label_name):
         self.name = label_name
@@ -173,6 +206,8 @@ class Label(QuilAtom):
 
 
 class LabelPlaceholder(QuilAtom):
+    __slots__ = ('prefix',)
+
     def __init__(self, prefix="L"):
         self.prefix = prefix
 
@@ -245,11 +280,17 @@ class Expression(object):
 
     This class overrides all the Python operators that are supported by Quil.
     """
+    __slots__ = ()
+
     def __str__(self):
         return _expression_to_string(self)
 
     def __repr__(self):
-        return str(self.__class__.__name__) + '(' + ','.join(map(repr, self.__dict__.values())) + ')'
+        return str(self.__class__.__name__) + '(' + ','.join(map(repr, self._slot_values())) + ')'
+
+    def _slot_values(self):
+        return [getattr(self, name) for cls in reversed(type(self).__mro__)
+                for name in cls.__dict__.get('__slots__', ())]
 
     def __add__(self, other):
         return Add(self, other)
@@ -318,13 +359,20 @@ def substitute_array(a, d):
     :rtype: np.array
     """
     a = np.asarray(a, order="C")
-    return np.array([substitute(v, d) for v in a.flat]).reshape(a.shape)
+    try:
+        compiled = CompiledExpressions(a.flat, variables=d)
+    except ValueError:
+        # some parameters are left unsubstituted
+        return np.array([substitute(v, d) for v in a.flat]).reshape(a.shape)
+    values = compiled(list(d.values()))
+    return values.reshape(a.shape + values.shape[1:])
 
 
 class Parameter(QuilAtom, Expression):
     """
     Parameters in Quil are represented as a label like '%x' for the parameter named 'x'.
     """
+    __slots__ = ('name',)
 
     def __init__(self, name):
         self.name = name
@@ -349,6 +397,8 @@ class Function(Expression):
     """
     Supported functions in Quil are sin, cos, sqrt, exp, and cis
     """
+    __slots__ = ('name', 'expression', 'fn')
+
     def __init__(self, name, expression, fn):
         self.name = name
         self.expression = expression
@@ -390,6 +440,8 @@ def quil_cis(expression):
 
 
 class BinaryExp(Expression):
+    __slots__ = ('op1', 'op2')
+
     operator = None     # type: str
     precedence = None   # type: int
     associates = None   # type: str
@@ -416,6 +468,7 @@ class BinaryExp(Expression):
 
 
 class Add(BinaryExp):
+    __slots__ = ()
     operator = ' + '
     precedence = 1
     associates = 'both'
@@ -429,6 +482,7 @@ class Add(BinaryExp):
 
 
 class Sub(BinaryExp):
+    __slots__ = ()
     operator = ' - '
     precedence = 1
     associates = 'left'
@@ -442,6 +496,7 @@ class Sub(BinaryExp):
 
 
 class Mul(BinaryExp):
+    __slots__ = ()
     operator = '*'
     precedence = 2
     associates = 'both'
@@ -455,6 +510,7 @@ class Mul(BinaryExp):
 
 
 class Div(BinaryExp):
+    __slots__ = ()
     operator = '/'
     precedence = 2
     associates = 'left'
@@ -468,6 +524,7 @@ class Div(BinaryExp):
 
 
 class Pow(BinaryExp):
+    __slots__ = ()
     operator = '^'
     precedence = 3
     associates = 'right'
@@ -531,6 +588,95 @@ def _contained_parameters(expression):
         return set()
 
 
+_OPERATORS = {'+': '+', '-': '-', '*': '*', '/': '/', '^': '**'}
+
+
+@lru_cache(maxsize=128)
+def _compile_function(source):
+    namespace = {}
+    exec(compile(source, '<compiled expressions>', 'exec'), namespace)
+    return namespace['_evaluate']
+
+
+class CompiledExpressions(object):
+    """
+    Expressions compiled once into a function which evaluates all of them with numpy, from the
+    values of the parameters and memory references which they contain. For example::
+
+        >>> theta = MemoryReference('theta')
+        >>> evaluate = CompiledExpressions([3 * theta, quil_cos(theta), 0.5])
+        >>> evaluate([np.pi])
+        array([ 9.42477796, -1.        ,  0.5       ])
+
+    Each expression is compiled to a few lines of Python with a line for each operation, so
+    evaluating the expressions doesn't walk their trees. The values may also be arrays, e.g. of
+    the values of a parameter sweep, in which case the result has a row for each expression.
+
+    :param expressions: The expressions, or numbers, to compile.
+    :param variables: The parameters and memory references contained in the expressions, in the
+        order of their values when the expressions are evaluated. Defaults to those contained in
+        the expressions in order of appearance, which are then listed by the ``variables``
+        attribute.
+    :raises ValueError: if an expression contains anything other than numbers, parameters, memory
+        references, functions and arithmetic, or a variable which isn't listed in ``variables``.
+    """
+    __slots__ = ('variables', '_constants', '_functions', '_function')
+
+    def __init__(self, expressions, variables=None):
+        self.variables = [] if variables is None else list(variables)
+        self._constants = []
+        self._functions = []
+        indices = {variable: i for i, variable in enumerate(self.variables)}
+        lines = []
+
+        def operand(expression):
+            if isinstance(expression, (Parameter, MemoryReference)):
+                if expression not in indices:
+                    if variables is not None:
+                        raise ValueError(f"{expression} is not one of the variables")
+                    indices[expression] = len(self.variables)
+                    self.variables.append(expression)
+                return f'm[{indices[expression]}]'
+            elif isinstance(expression, Number):
+                self._constants.append(expression)
+                return f'c[{len(self._constants) - 1}]'
+            elif isinstance(expression, BinaryExp):
+                op1, op2 = operand(expression.op1), operand(expression.op2)
+                if expression.operator in _OPERATORS:
+                    lines.append(f'{op1} {_OPERATORS[expression.operator]} {op2}')
+                else:
+                    self._functions.append(expression.fn)
+                    lines.append(f'f[{len(self._functions) - 1}]({op1}, {op2})')
+            elif isinstance(expression, Function):
+                argument = operand(expression.expression)
+                self._functions.append(expression.fn)
+                lines.append(f'f[{len(self._functions) - 1}]({argument})')
+            else:
+                raise ValueError(f"Unexpected expression: {expression!r}")
+            return f't{len(lines) - 1}'
+
+        results = [operand(expression) for expression in expressions]
+        source = ''.join(f'    t{i} = {line}\n' for i, line in enumerate(lines))
+        self._function = _compile_function(
+            f'def _evaluate(m, c, f):\n{source}    return ({"".join(r + ", " for r in results)})\n')
+
+    def __call__(self, values):
+        """
+        Evaluate the expressions.
+
+        :param values: The values of the variables, which are numbers or arrays that broadcast
+            together.
+        :return: The values of the expressions, in an array with a row for each expression if the
+            values of some variables are arrays.
+        """
+        if any(np.ndim(value) > 0 for value in values):
+            values = np.array(np.broadcast_arrays(*values))
+            results = self._function(values, self._constants, self._functions)
+            return np.array([np.broadcast_to(r, values.shape[1:]) for r in results]).reshape(
+                (len(results),) + values.shape[1:])
+        return np.array(self._function(values, self._constants, self._functions))
+
+
 def _check_for_pi(element):
     """
     Check to see if there exists a rational number r = p/q
@@ -540,24 +686,38 @@ def _check_for_pi(element):
     :param element: float
     :return element: pretty print string if true, else standard representation.
     """
-    frac = Fraction(element / np.pi).limit_denominator(8)
+    ratio = element / np.pi
+    if abs(ratio) < 2 ** 40:
+        # Fast path, equivalent to the one below: multiples of 1/8 are far enough apart at this
+        # magnitude that a fraction equal to ``ratio`` is also the closest one to it.
+        for den in range(1, 9):
+            num = round(ratio * den)
+            if num / float(den) == ratio:
+                return _format_pi_fraction(num, den)
+        return repr(element)
+
+    frac = Fraction(ratio).limit_denominator(8)
     num, den = frac.numerator, frac.denominator
-    sign = "-" if num < 0 else ""
-    if num / float(den) == element / np.pi:
-        if num == 0:
-            return "0"
-        elif abs(num) == 1 and den == 1:
-            return sign + "pi"
-        elif abs(num) == 1:
-            return sign + "pi/" + repr(den)
-        elif den == 1:
-            return repr(num) + "*pi"
-        else:
-            return repr(num) + "*pi/" + repr(den)
+    if num / float(den) == ratio:
+        return _format_pi_fraction(num, den)
     else:
         return repr(element)
 
 
+def _format_pi_fraction(num, den):
+    sign = "-" if num < 0 else ""
+    if num == 0:
+        return "0"
+    elif abs(num) == 1 and den == 1:
+        return sign + "pi"
+    elif abs(num) == 1:
+        return sign + "pi/" + repr(den)
+    elif den == 1:
+        return repr(num) + "*pi"
+    else:
+        return repr(num) + "*pi/" + repr(den)
+
+
 class MemoryReference(QuilAtom, Expression):
     """
     Representation of a reference to a classical memory address.
@@ -569,6 +729,7 @@ class MemoryReference(QuilAtom, Expression):
         memory references with offset 0 as either e.g. ``ro[0]`` or ``beta`` depending on whether
         the declared variable is of length >1 or 1, resp.
     """
+    __slots__ = ('name', 'offset', 'declared_size')
 
     def __init__(self, name, offset=0, declared_size=None):
         if not isinstance(offset, integer_types) or offset < 0:
@@ -623,6 +784,7 @@ class Addr(MemoryReference):
 
     :param int value: The classical address.
     """
+    __slots__ = ()
 
     def __init__(self, value):
         warn("Addr objects have been deprecated. Defaulting to memory region \"ro\". Use MemoryReference instead.")
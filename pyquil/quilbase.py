@@ -28,22 +28,48 @@ from pyquil.quilatom import (Qubit, MemoryReference, Label, unpack_qubit, QubitP
 class AbstractInstruction(object):
     """
     Abstract class for representing single instructions.
+
+    The result of :py:meth:`out` is cached for :py:meth:`Program.out`, equality and hashing, and
+    recomputed when an attribute of the instruction is set.
+    """
+    __slots__ = ('_out_text',)
+
+    _changes = 0
+    """
+    The number of times an instruction was changed after its text was cached. Programs compare it
+    with its value when they cached their own text and fingerprint.
     """
 
     def out(self):
         pass
 
+    def _cached_out(self):
+        """
+        The result of :py:meth:`out`, computed once.
+        """
+        text = getattr(self, '_out_text', None)
+        if text is None:
+            text = self.out()
+            object.__setattr__(self, '_out_text', text)
+        return text
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != '_out_text' and getattr(self, '_out_text', None) is not None:
+            object.__setattr__(self, '_out_text', None)
+            AbstractInstruction._changes += 1
+
     def __str__(self):
         return self.out()
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.out() == other.out()
+        return isinstance(other, self.__class__) and self._cached_out() == other._cached_out()
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash(self.out())
+        return hash(self._cached_out())
 
 
 RESERVED_WORDS = ['DEFGATE', 'DEFCIRCUIT', 'MEASURE',
@@ -88,6 +114,7 @@ class Gate(AbstractInstruction):
     """
     This is the pyQuil object for a quantum gate instruction.
     """
+    __slots__ = ('name', 'params', 'qubits', '_modifiers')
 
     def __init__(self, name, params, qubits):
         if not isinstance(name, string_types):
@@ -96,19 +123,30 @@ class Gate(AbstractInstruction):
         if name in RESERVED_WORDS:
             raise ValueError("Cannot use {} for a gate name since it's a reserved word".format(name))
 
-        if not isinstance(params, list):
+        if not isinstance(params, (list, tuple)):
             raise TypeError("Gate params must be a list")
 
-        if not isinstance(qubits, list) or not qubits:
+        if not isinstance(qubits, (list, tuple)) or not qubits:
             raise TypeError("Gate arguments must be a non-empty list")
         for qubit in qubits:
             if not isinstance(qubit, (Qubit, QubitPlaceholder)):
                 raise TypeError("Gate arguments must all be Qubits")
 
         self.name = name
-        self.params = params
-        self.qubits = qubits
-        self.modifiers = []
+        self.params = tuple(params)
+        self.qubits = tuple(qubits)
+        self._modifiers = ()
+
+    @property
+    def modifiers(self):
+        """
+        The modifiers of the gate, outermost first. Changing the list changes the gate.
+        """
+        return _Modifiers(self, self._modifiers)
+
+    @modifiers.setter
+    def modifiers(self, modifiers):
+        self._modifiers = tuple(modifiers)
 
     def get_qubits(self, indices=True):
         return {_extract_qubit_index(q, indices) for q in self.qubits}
@@ -116,12 +154,12 @@ class Gate(AbstractInstruction):
     def out(self):
         if self.params:
             return "{}{}{} {}".format(
-                ' '.join(self.modifiers) + ' ' if self.modifiers else '',
+                ' '.join(self._modifiers) + ' ' if self._modifiers else '',
                 self.name, _format_params(self.params),
                 _format_qubits_out(self.qubits))
         else:
             return "{}{} {}".format(
-                ' '.join(self.modifiers) + ' ' if self.modifiers else '',
+                ' '.join(self._modifiers) + ' ' if self._modifiers else '',
                 self.name, _format_qubits_out(self.qubits))
 
     def controlled(self, control_qubit):
@@ -130,8 +168,8 @@ class Gate(AbstractInstruction):
         """
         control_qubit = unpack_qubit(control_qubit)
 
-        self.modifiers.insert(0, "CONTROLLED")
-        self.qubits.insert(0, control_qubit)
+        self._modifiers = ("CONTROLLED",) + self._modifiers
+        self.qubits = (control_qubit,) + self.qubits
 
         return self
 
@@ -139,7 +177,7 @@ class Gate(AbstractInstruction):
         """
         Add the DAGGER modifier to the gate.
         """
-        self.modifiers.insert(0, "DAGGER")
+        self._modifiers = ("DAGGER",) + self._modifiers
 
         return self
 
@@ -149,19 +187,56 @@ class Gate(AbstractInstruction):
     def __str__(self):
         if self.params:
             return "{}{}{} {}".format(
-                ' '.join(self.modifiers) + ' ' if self.modifiers else '',
+                ' '.join(self._modifiers) + ' ' if self._modifiers else '',
                 self.name, _format_params(self.params),
                 _format_qubits_str(self.qubits))
         else:
             return "{}{} {}".format(
-                ' '.join(self.modifiers) + ' ' if self.modifiers else '',
+                ' '.join(self._modifiers) + ' ' if self._modifiers else '',
                 self.name, _format_qubits_str(self.qubits))
 
 
+def _mutator(method):
+    def mutate(self, *args):
+        result = method(self, *args)
+        self._gate.modifiers = self
+        return result
+    mutate.__name__ = method.__name__
+    return mutate
+
+
+class _Modifiers(list):
+    """
+    The list of modifiers of a gate, which writes itself back to the gate when it is changed.
+    """
+    __slots__ = ('_gate',)
+
+    def __init__(self, gate, modifiers):
+        super().__init__(modifiers)
+        self._gate = gate
+
+    append = _mutator(list.append)
+    extend = _mutator(list.extend)
+    insert = _mutator(list.insert)
+    pop = _mutator(list.pop)
+    remove = _mutator(list.remove)
+    clear = _mutator(list.clear)
+    reverse = _mutator(list.reverse)
+    __setitem__ = _mutator(list.__setitem__)
+    __delitem__ = _mutator(list.__delitem__)
+    __iadd__ = _mutator(list.__iadd__)
+    __imul__ = _mutator(list.__imul__)
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self._gate.modifiers = self
+
+
 class Measurement(AbstractInstruction):
     """
     This is the pyQuil object for a Quil measurement instruction.
     """
+    __slots__ = ('qubit', 'classical_reg')
 
     def __init__(self, qubit, classical_reg):
         if not isinstance(qubit, (Qubit, QubitPlaceholder)):
@@ -192,6 +267,7 @@ class ResetQubit(AbstractInstruction):
     """
     This is the pyQuil object for a Quil targeted reset instruction.
     """
+    __slots__ = ('qubit',)
 
     def __init__(self, qubit):
         if not isinstance(qubit, (Qubit, QubitPlaceholder)):
@@ -216,6 +292,7 @@ class DefGate(AbstractInstruction):
     :param array-like matrix: {list, nparray, np.matrix} The matrix defining this gate.
     :param list parameters: list of parameters that are used in this gate
     """
+    __slots__ = ('name', 'matrix', 'parameters')
 
     def __init__(self, name, matrix, parameters=None):
         if not isinstance(name, string_types):
@@ -312,6 +389,8 @@ class DefGate(AbstractInstruction):
 
 
 class DefPermutationGate(DefGate):
+    __slots__ = ('permutation',)
+
     def __init__(self, name, permutation):
         if not isinstance(name, string_types):
             raise TypeError("Gate name must be a string")
@@ -351,6 +430,7 @@ class JumpTarget(AbstractInstruction):
     """
     Representation of a target that can be jumped to.
     """
+    __slots__ = ('label',)
 
     def __init__(self, label):
         if not isinstance(label, (Label, LabelPlaceholder)):
@@ -368,6 +448,7 @@ class JumpConditional(AbstractInstruction):
     """
     Abstract representation of an conditional jump instruction.
     """
+    __slots__ = ('target', 'condition')
     op = NotImplemented
 
     def __init__(self, target, condition):
@@ -386,6 +467,7 @@ class JumpWhen(JumpConditional):
     """
     The JUMP-WHEN instruction.
     """
+    __slots__ = ()
     op = "JUMP-WHEN"
 
 
@@ -393,6 +475,7 @@ class JumpUnless(JumpConditional):
     """
     The JUMP-UNLESS instruction.
     """
+    __slots__ = ()
     op = "JUMP-UNLESS"
 
 
@@ -400,6 +483,7 @@ class SimpleInstruction(AbstractInstruction):
     """
     Abstract class for simple instructions with no arguments.
     """
+    __slots__ = ()
 
     def out(self):
         return self.op
@@ -409,6 +493,7 @@ class Halt(SimpleInstruction):
     """
     The HALT instruction.
     """
+    __slots__ = ()
     op = "HALT"
 
 
@@ -416,6 +501,7 @@ class Wait(SimpleInstruction):
     """
     The WAIT instruction.
     """
+    __slots__ = ()
     op = "WAIT"
 
 
@@ -423,6 +509,7 @@ class Reset(SimpleInstruction):
     """
     The RESET instruction.
     """
+    __slots__ = ()
     op = "RESET"
 
 
@@ -430,6 +517,7 @@ class Nop(SimpleInstruction):
     """
     The NOP instruction.
     """
+    __slots__ = ()
     op = "NOP"
 
 
@@ -437,6 +525,7 @@ class UnaryClassicalInstruction(AbstractInstruction):
     """
     The abstract class for unary classical instructions.
     """
+    __slots__ = ('target',)
 
     def __init__(self, target):
         if not isinstance(target, MemoryReference):
@@ -451,6 +540,7 @@ class ClassicalNeg(UnaryClassicalInstruction):
     """
     The NEG instruction.
     """
+    __slots__ = ()
     op = "NEG"
 
 
@@ -458,6 +548,7 @@ class ClassicalNot(UnaryClassicalInstruction):
     """
     The NOT instruction.
     """
+    __slots__ = ()
     op = "NOT"
 
 
@@ -465,6 +556,7 @@ class LogicalBinaryOp(AbstractInstruction):
     """
     The abstract class for binary logical classical instructions.
     """
+    __slots__ = ('left', 'right')
     op = NotImplemented
 
     def __init__(self, left, right):
@@ -489,6 +581,7 @@ class ClassicalAnd(LogicalBinaryOp):
 
         AND %target %source
     """
+    __slots__ = ()
 
     op = "AND"
 
@@ -497,6 +590,7 @@ class ClassicalInclusiveOr(LogicalBinaryOp):
     """
     The IOR instruction.
     """
+    __slots__ = ()
     op = "IOR"
 
 
@@ -504,6 +598,7 @@ class ClassicalExclusiveOr(LogicalBinaryOp):
     """
     The XOR instruction.
     """
+    __slots__ = ()
     op = "XOR"
 
 
@@ -511,6 +606,7 @@ class ClassicalOr(ClassicalInclusiveOr):
     """
     Deprecated class.
     """
+    __slots__ = ()
 
     def __init__(self, left, right):
         warn("ClassicalOr has been deprecated. Replacing with "
@@ -524,6 +620,7 @@ class ArithmeticBinaryOp(AbstractInstruction):
     """
     The abstract class for binary arithmetic classical instructions.
     """
+    __slots__ = ('left', 'right')
 
     def __init__(self, left, right):
         if not isinstance(left, MemoryReference):
@@ -541,6 +638,7 @@ class ClassicalAdd(ArithmeticBinaryOp):
     """
     The ADD instruction.
     """
+    __slots__ = ()
     op = "ADD"
 
 
@@ -548,6 +646,7 @@ class ClassicalSub(ArithmeticBinaryOp):
     """
     The SUB instruction.
     """
+    __slots__ = ()
     op = "SUB"
 
 
@@ -555,6 +654,7 @@ class ClassicalMul(ArithmeticBinaryOp):
     """
     The MUL instruction.
     """
+    __slots__ = ()
     op = "MUL"
 
 
@@ -562,6 +662,7 @@ class ClassicalDiv(ArithmeticBinaryOp):
     """
     The DIV instruction.
     """
+    __slots__ = ()
     op = "DIV"
 
 
@@ -573,6 +674,7 @@ class ClassicalMove(AbstractInstruction):
              In pyQuil 1.9, the order of operands was MOVE <source> <target>.
              These have reversed.
     """
+    __slots__ = ('left', 'right')
     op = "MOVE"
 
     def __init__(self, left, right):
@@ -594,6 +696,7 @@ class ClassicalFalse(ClassicalMove):
     """
     Deprecated class.
     """
+    __slots__ = ()
 
     def __init__(self, target):
         super().__init__(target, 0)
@@ -604,6 +707,7 @@ class ClassicalTrue(ClassicalMove):
     """
     Deprecated class.
     """
+    __slots__ = ()
 
     def __init__(self, target):
         super().__init__(target, 1)
@@ -614,6 +718,7 @@ class ClassicalExchange(AbstractInstruction):
     """
     The EXCHANGE instruction.
     """
+    __slots__ = ('left', 'right')
 
     op = "EXCHANGE"
 
@@ -633,6 +738,7 @@ class ClassicalConvert(AbstractInstruction):
     """
     The CONVERT instruction.
     """
+    __slots__ = ('left', 'right')
 
     op = "CONVERT"
 
@@ -652,6 +758,7 @@ class ClassicalLoad(AbstractInstruction):
     """
     The LOAD instruction.
     """
+    __slots__ = ('target', 'left', 'right')
 
     op = "LOAD"
 
@@ -672,6 +779,7 @@ class ClassicalStore(AbstractInstruction):
     """
     The STORE instruction.
     """
+    __slots__ = ('target', 'left', 'right')
 
     op = "STORE"
 
@@ -692,6 +800,7 @@ class ClassicalComparison(AbstractInstruction):
     """
     Abstract class for ternary comparison instructions.
     """
+    __slots__ = ('target', 'left', 'right')
 
     def __init__(self, target, left, right):
         if not isinstance(target, MemoryReference):
@@ -710,6 +819,7 @@ class ClassicalEqual(ClassicalComparison):
     """
     The EQ comparison instruction.
     """
+    __slots__ = ()
 
     op = "EQ"
 
@@ -718,6 +828,7 @@ class ClassicalLessThan(ClassicalComparison):
     """
     The LT comparison instruction.
     """
+    __slots__ = ()
 
     op = "LT"
 
@@ -726,6 +837,7 @@ class ClassicalLessEqual(ClassicalComparison):
     """
     The LE comparison instruction.
     """
+    __slots__ = ()
 
     op = "LE"
 
@@ -734,6 +846,7 @@ class ClassicalGreaterThan(ClassicalComparison):
     """
     The GT comparison instruction.
     """
+    __slots__ = ()
 
     op = "GT"
 
@@ -742,6 +855,7 @@ class ClassicalGreaterEqual(ClassicalComparison):
     """
     The GE comparison instruction.
     """
+    __slots__ = ()
 
     op = "GE"
 
@@ -750,6 +864,7 @@ class Jump(AbstractInstruction):
     """
     Representation of an unconditional jump instruction (JUMP).
     """
+    __slots__ = ('target',)
 
     def __init__(self, target):
         if not isinstance(target, (Label, LabelPlaceholder)):
@@ -769,6 +884,7 @@ class Pragma(AbstractInstruction):
         PRAGMA <command> <arg1> <arg2> ... <argn> "<freeform_string>"
 
     """
+    __slots__ = ('command', 'args', 'freeform_string')
 
     def __init__(self, command, args=(), freeform_string=""):
         if not isinstance(command, string_types):
@@ -811,6 +927,7 @@ class Declare(AbstractInstruction):
         DECLARE <name> <memory-type> (SHARING <other-name> (OFFSET <amount> <type>)* )?
 
     """
+    __slots__ = ('name', 'memory_type', 'memory_size', 'shared_region', 'offsets')
 
     def __init__(self, name, memory_type, memory_size=1, shared_region=None, offsets=None):
         self.name = name
@@ -848,6 +965,7 @@ class RawInstr(AbstractInstruction):
     """
     A raw instruction represented as a string.
     """
+    __slots__ = ('instr',)
 
     def __init__(self, instr_str):
         if not isinstance(instr_str, string_types):
@@ -25,6 +25,17 @@ def _term_expectation(wf, term: PauliTerm, n_qubits):
     return term.coefficient * (wf.conj().T @ wf2)
 
 
+def _term_expectation_density(density, term: PauliTerm, n_qubits):
+    # Computes Tr[XYZ..XXZ rho]
+    density2 = density
+    for qubit_i, op_str in term._ops.items():
+        op_mat = QUANTUM_GATES[op_str]
+        op_mat = lifted_gate_matrix(matrix=op_mat, qubit_inds=[qubit_i], n_qubits=n_qubits)
+        density2 = op_mat @ density2
+
+    return term.coefficient * np.trace(density2)
+
+
 def _is_valid_quantum_state(state_matrix: np.ndarray, rtol=1e-05, atol=1e-08) -> bool:
     """
     Checks if a quantum state is valid, i.e. the matrix is Hermitian; trace one, and that the
@@ -307,7 +318,17 @@ class ReferenceDensitySimulator(AbstractQuantumSimulator):
             return 1
 
     def expectation(self, operator: Union[PauliTerm, PauliSum]):
-        raise NotImplementedError("To implement")
+        """
+        Compute the expectation of an operator.
+
+        :param operator: The operator
+        :return: The operator's expectation value
+        """
+        if not isinstance(operator, PauliSum):
+            operator = PauliSum([operator])
+
+        return sum(_term_expectation_density(self.density, term, n_qubits=self.n_qubits)
+                   for term in operator)
 
     def reset(self) -> 'AbstractQuantumSimulator':
         """
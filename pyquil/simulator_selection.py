@@ -0,0 +1,229 @@
+##############################################################################
+# Copyright 2019 Rigetti Computing
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##############################################################################
+"""
+Pick the cheapest :py:class:`~pyquil.pyqvm.PyQVM` simulator backend for a program.
+
+:py:func:`analyze_program` summarizes the properties of a program that matter for simulation
+and :py:func:`select_simulator` uses that summary to choose between the simulators that can run
+it, refusing up front if none of them fits in memory. The result is a
+:py:class:`SimulatorDecision`, which records everything that went into the choice.
+"""
+import os
+import sys
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from pyquil.light_cone import qubit_clusters
+from pyquil.quil import Program
+from pyquil.quilbase import Gate, Pragma
+
+if sys.version_info < (3, 7):
+    from pyquil.external.dataclasses import dataclass
+else:
+    from dataclasses import dataclass
+
+CLIFFORD_GATES = {'I', 'X', 'Y', 'Z', 'H', 'S', 'CNOT', 'CZ', 'SWAP', 'ISWAP'}
+"""Gates which are Clifford regardless of their parameters and DAGGER modifiers."""
+
+CLIFFORD_ROTATIONS = {'RX', 'RY', 'RZ', 'PHASE'}
+"""Rotations which are Clifford when their angle is a multiple of pi/2."""
+
+NOISE_PRAGMAS = {'ADD-KRAUS', 'READOUT-POVM'}
+
+_BYTES_PER_AMPLITUDE = np.dtype(np.complex128).itemsize
+
+
+@dataclass(frozen=True)
+class ProgramAnalysis:
+    """
+    The properties of a program that determine how expensive it is to simulate.
+    """
+    n_qubits: int
+    """The number of distinct qubits the program acts on or measures."""
+
+    n_gates: int
+
+    is_clifford: bool
+    """Whether every gate is a Clifford gate."""
+
+    noise_pragmas: Tuple[str, ...]
+    """The noise PRAGMAs (e.g. ``ADD-KRAUS``) found in the program."""
+
+    cluster_sizes: Tuple[int, ...]
+    """The sizes of the clusters of qubits that never interact, largest first.
+    A program whose largest cluster has one qubit never creates entanglement."""
+
+    @property
+    def max_entangled_qubits(self) -> int:
+        return self.cluster_sizes[0] if len(self.cluster_sizes) > 0 else 0
+
+
+@dataclass(frozen=True)
+class SimulatorDecision:
+    """
+    An audit record of a backend selection made by :py:func:`select_simulator`.
+    """
+    simulator_type: Type
+    """The chosen simulator class."""
+
+    n_qubits: int
+    """The number of qubits the chosen simulator will be allocated with."""
+
+    memory_bytes: int
+    """The predicted peak memory footprint of the chosen simulator."""
+
+    memory_limit: Optional[int]
+
+    noisy: bool
+    """Whether a backend capable of simulating noise was required."""
+
+    analysis: ProgramAnalysis
+
+    candidates: Dict[str, int]
+    """The predicted memory footprint of every backend that could run the program."""
+
+    def __str__(self):
+        return (f'{self.simulator_type.__name__} for {self.n_qubits} qubits '
+                f'(~{self.memory_bytes} bytes; noisy={self.noisy}, '
+                f'clifford={self.analysis.is_clifford}, '
+                f'max entangled qubits={self.analysis.max_entangled_qubits}, '
+                f'candidates={self.candidates})')
+
+
+def _is_clifford_gate(gate: Gate) -> bool:
+    if any(modifier != 'DAGGER' for modifier in gate.modifiers):
+        return False
+    if gate.name in CLIFFORD_GATES:
+        return True
+    if gate.name in CLIFFORD_ROTATIONS:
+        angle = gate.params[0]
+        if not isinstance(angle, (int, float, np.number)):
+            return False
+        quarter_turns = angle / (np.pi / 2)
+        return bool(np.isclose(quarter_turns, np.round(quarter_turns)))
+    return False
+
+
+def analyze_program(program: Program) -> ProgramAnalysis:
+    """
+    Inspect a program for the properties that determine how expensive it is to simulate.
+
+    :param program: The program. Qubits must not be placeholders.
+    :return: A summary of the program.
+    """
+    gates = [instr for instr in program if isinstance(instr, Gate)]
+    noise_pragmas = tuple(instr.command for instr in program
+                          if isinstance(instr, Pragma) and instr.command in NOISE_PRAGMAS)
+    cluster_sizes = sorted((len(cluster) for cluster in qubit_clusters(program)), reverse=True)
+    return ProgramAnalysis(
+        n_qubits=len(program.get_qubits()),
+        n_gates=len(gates),
+        is_clifford=all(_is_clifford_gate(gate) for gate in gates),
+        noise_pragmas=noise_pragmas,
+        cluster_sizes=tuple(cluster_sizes),
+    )
+
+
+def estimate_memory(simulator_type: Type, n_qubits: int) -> int:
+    """
+    Predict the peak number of bytes a simulator allocates while running a program.
+
+    :param simulator_type: One of the simulators in :py:mod:`pyquil.numpy_simulator` or
+        :py:mod:`pyquil.reference_simulator`.
+    :param n_qubits: The number of qubits the simulator is allocated with.
+    :return: The predicted number of bytes.
+    """
+    from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+    from pyquil.reference_simulator import (ReferenceWavefunctionSimulator,
+                                            ReferenceDensitySimulator)
+    dim = 2 ** n_qubits
+    if issubclass(simulator_type, NumpyWavefunctionSimulator):
+        # the state and the result of one tensor contraction
+        return 2 * dim * _BYTES_PER_AMPLITUDE
+    if issubclass(simulator_type, ReferenceWavefunctionSimulator):
+        # the state and one gate lifted to the full Hilbert space
+        return (dim + dim ** 2) * _BYTES_PER_AMPLITUDE
+    if issubclass(simulator_type, ReferenceDensitySimulator):
+        # the density matrix, a lifted gate and two intermediate products
+        return 4 * dim ** 2 * _BYTES_PER_AMPLITUDE
+    raise ValueError(f"Don't know how much memory {simulator_type.__name__} uses")
+
+
+def available_memory() -> Optional[int]:
+    """
+    The amount of physical memory on this machine in bytes, or None if it can't be determined.
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _candidate_simulators(noisy: bool) -> List[Type]:
+    from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+    from pyquil.reference_simulator import (ReferenceWavefunctionSimulator,
+                                            ReferenceDensitySimulator)
+    if noisy:
+        # only the density simulator can represent the mixed states noise produces
+        return [ReferenceDensitySimulator]
+    return [NumpyWavefunctionSimulator, ReferenceWavefunctionSimulator,
+            ReferenceDensitySimulator]
+
+
+def select_simulator(analysis: ProgramAnalysis, noisy: bool = False,
+                     n_qubits: int = None,
+                     memory_limit: int = None) -> SimulatorDecision:
+    """
+    Choose the simulator with the smallest predicted memory footprint that can run a program.
+
+    Clifford circuits and circuits made of small entangled clusters are recorded in the
+    analysis, but every available backend stores the full state of the register, so the
+    choice is made on the register size and whether noise has to be simulated.
+
+    :param analysis: The output of :py:func:`analyze_program`.
+    :param noisy: Whether the program is run with post-gate noise, which requires a backend
+        that can represent mixed states.
+    :param n_qubits: The number of qubits the simulator will be allocated with. Defaults to the
+        number of qubits used by the program.
+    :param memory_limit: The number of bytes the simulator may use. Defaults to the physical
+        memory of this machine, if it can be determined.
+    :return: A record of the decision.
+    :raises MemoryError: If no backend that can run the program fits in ``memory_limit``.
+    """
+    if n_qubits is None:
+        n_qubits = analysis.n_qubits
+    if memory_limit is None:
+        memory_limit = available_memory()
+
+    candidates = {sim_type: estimate_memory(sim_type, n_qubits)
+                  for sim_type in _candidate_simulators(noisy)}
+    simulator_type = min(candidates, key=candidates.get)
+    memory_bytes = candidates[simulator_type]
+    if memory_limit is not None and memory_bytes > memory_limit:
+        raise MemoryError(f"Simulating {n_qubits} qubits with {simulator_type.__name__} needs "
+                          f"about {memory_bytes} bytes, which exceeds the limit of "
+                          f"{memory_limit} bytes")
+
+    return SimulatorDecision(
+        simulator_type=simulator_type,
+        n_qubits=n_qubits,
+        memory_bytes=memory_bytes,
+        memory_limit=memory_limit,
+        noisy=noisy,
+        analysis=analysis,
+        candidates={sim_type.__name__: size for sim_type, size in candidates.items()},
+    )
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.binary_format import dumps_program, loads_arrays, loads_program
+from pyquil.gates import CNOT, H, MEASURE, PHASE, RX, RZ, X
+from pyquil.parameters import Parameter, quil_cos, quil_sin
+from pyquil.quil import address_qubits
+from pyquil.quilatom import MemoryReference, QubitPlaceholder
+from pyquil.quilbase import DefGate, Pragma
+
+
+def test_round_trip():
+    theta = Parameter('theta')
+    dg = DefGate('MYPHASE', np.array([[1, 0], [0, quil_cos(theta) + 1j * quil_sin(theta)]]),
+                 [theta])
+    prog = Program(dg, Pragma('INITIAL_REWIRING', freeform_string='PARTIAL'))
+    ro = prog.declare('ro', 'BIT', 2)
+    alpha = prog.declare('alpha', 'REAL')
+    prog += [H(0), RX(0.5, 1), RZ(2 * alpha, 0), RZ(2 * alpha, 1), PHASE(1, 0), RX(1j, 1),
+             RX(np.float64(0.25), 0), X(1).controlled(0).dagger(),
+             dg.get_constructor()(alpha)(1), MEASURE(0, ro[0]), MEASURE(1, ro[1])]
+    prog.wrap_in_numshots_loop(100)
+
+    loaded = loads_program(dumps_program(prog))
+    assert loaded.out() == prog.out()
+    assert loaded.defined_gates == [dg]
+    assert loaded.num_shots == 100
+    assert [type(p) for instr in loaded[4:10] for p in instr.params] == \
+        [type(p) for instr in prog[4:10] for p in instr.params]
+    assert loaded[-4].modifiers == ['DAGGER', 'CONTROLLED']
+
+
+def test_placeholders():
+    q = QubitPlaceholder.register(2)
+    prog = Program()
+    ro = prog.declare('ro', 'BIT')
+    prog += [H(q[0]), CNOT(q[0], q[1]), MEASURE(q[1], ro)]
+    prog += Program(X(q[1])).while_do(ro, Program(H(q[0])))
+    loaded = loads_program(dumps_program(prog))
+    assert len(loaded) == len(prog)
+
+    # placeholders are shared between instructions like in the original program
+    assert loaded[1].qubits[0] is loaded[2].qubits[0]
+    assert loaded[2].qubits[1] is loaded[3].qubit
+    assert loaded[1].qubits[0] is not q[0]
+    assert address_qubits(loaded, {loaded[1].qubits[0]: 0, loaded[2].qubits[1]: 1}) == \
+        address_qubits(prog, {q[0]: 0, q[1]: 1})
+
+
+def test_arrays():
+    data = dumps_program(Program(H(0), CNOT(0, 1), RX(0.5, 300), RX(Parameter('a'), 0)))
+    header, arrays = loads_arrays(data)
+    assert header['gate_names'] == ['H', 'CNOT', 'RX']
+    assert arrays['opcodes'].tolist() == [0, 1, 2, 2]
+    assert arrays['opcodes'].dtype == np.int8
+    assert arrays['qubits'].tolist() == [0, 0, 1, 300, 0]
+    assert arrays['qubits'].dtype == np.int16
+    assert arrays['params'][0] == 0.5
+    assert arrays['param_symbols'].tolist() == [-1, 0]
+    # the arrays are views of the serialized bytes
+    assert not arrays['params'].flags.writeable
+
+    with pytest.raises(ValueError):
+        loads_arrays(b'PROGRAM' + data)
+
+
+def test_dump_and_load(tmp_path):
+    prog = Program(H(0), CNOT(0, 1), MEASURE(0, MemoryReference('ro')))
+    path = str(tmp_path / 'program.bin')
+    prog.dump(path)
+    assert Program.load(path) == prog
+    assert Program.load(path).out() == prog.out()
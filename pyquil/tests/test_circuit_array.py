@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.circuit_array import CircuitArray
+from pyquil.gates import CNOT, CPHASE, H, MEASURE, PHASE, RX, RZ, X
+from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+from pyquil.parameters import Parameter, quil_cos
+from pyquil.quilatom import MemoryReference, QubitPlaceholder
+from pyquil.quilbase import DefGate
+from pyquil.reference_simulator import ReferenceDensitySimulator, ReferenceWavefunctionSimulator
+
+
+def _random_program(n_gates, n_qubits=5, seed=52):
+    rs = np.random.RandomState(seed)
+    prog = Program()
+    for _ in range(n_gates):
+        q = int(rs.randint(n_qubits))
+        choice = rs.randint(4)
+        if choice == 0:
+            prog += H(q)
+        elif choice == 1:
+            prog += RX(float(rs.choice([0.1, np.pi / 2, -np.pi])), q)
+        elif choice == 2:
+            prog += CNOT(q, (q + 1) % n_qubits)
+        else:
+            prog += CPHASE(float(rs.rand()), q, (q + 2) % n_qubits)
+    return prog
+
+
+def test_round_trip():
+    prog = _random_program(200)
+    prog.wrap_in_numshots_loop(10)
+    circuit = CircuitArray.from_program(prog)
+    assert len(circuit) == 200
+    assert set(circuit.gate_names) == {'H', 'RX', 'CNOT', 'CPHASE'}
+    assert circuit.qubits.shape == (200, 2)
+    assert circuit.params.shape == (200, 1)
+    assert circuit.out() == prog.out()
+    assert circuit.to_program() == prog
+    assert circuit.to_program().num_shots == 10
+    assert circuit.get_qubits() == prog.get_qubits()
+
+
+def test_round_trip_side_tables():
+    dg = DefGate('MYX', np.array([[0, 1], [1, 0]]))
+    prog = Program(dg, dg.get_constructor()(0), PHASE(1, 0), RX(1j, 1), RX(Parameter('a'), 1),
+                   RZ(quil_cos(MemoryReference('theta')) * 2, 0), RZ(0.25, 1).dagger(),
+                   X(1).controlled(0).dagger())
+    circuit = CircuitArray.from_program(prog)
+    assert circuit.modifiers == {5: ('DAGGER',), 6: ('DAGGER', 'CONTROLLED')}
+    assert set(circuit.symbolic_params) == {(1, 0), (2, 0), (3, 0), (4, 0)}
+    assert circuit.out() == prog.out()
+
+    program = circuit.to_program()
+    assert program == prog
+    assert program.defined_gates == [dg]
+    assert isinstance(program[1].params[0], int)
+    assert program[-1].modifiers == ['DAGGER', 'CONTROLLED']
+
+
+def test_from_arrays():
+    circuit = CircuitArray(gate_names=['H', 'RX', 'CZ'], opcodes=[0, 1, 2, 1],
+                           qubits=[[0, -1], [1, -1], [0, 1], [1, -1]],
+                           params=[[np.nan], [0.5], [np.nan], [np.pi]])
+    assert circuit.n_params.tolist() == [0, 1, 0, 1]
+    assert circuit.out() == 'H 0\nRX(0.5) 1\nCZ 0 1\nRX(pi) 1\n'
+
+    with pytest.raises(ValueError):
+        CircuitArray(gate_names=['H'], opcodes=[1], qubits=[[0]])
+    with pytest.raises(ValueError):
+        CircuitArray(gate_names=['CZ'], opcodes=[0], qubits=[[-1, 0]])
+
+
+def test_only_gates():
+    with pytest.raises(ValueError):
+        CircuitArray.from_program(Program(H(0), MEASURE(0, None)))
+    with pytest.raises(ValueError):
+        CircuitArray.from_program(Program(H(QubitPlaceholder())))
+
+
+def test_empty():
+    circuit = CircuitArray.from_program(Program())
+    assert len(circuit) == 0
+    assert circuit.out() == ''
+    assert circuit.to_program() == Program()
+
+
+@pytest.mark.parametrize('simulator_type', [NumpyWavefunctionSimulator,
+                                            ReferenceWavefunctionSimulator,
+                                            ReferenceDensitySimulator])
+def test_simulators_consume_circuits(simulator_type):
+    prog = _random_program(100)
+    expected = simulator_type(n_qubits=5).do_program(prog)
+    actual = simulator_type(n_qubits=5).do_program(CircuitArray.from_program(prog))
+    for attr in ['wf', 'density']:
+        if hasattr(expected, attr):
+            np.testing.assert_allclose(getattr(actual, attr), getattr(expected, attr),
+                                       atol=1e-12)
+
+
+def test_simulate_modifiers():
+    circuit = CircuitArray.from_program(Program(H(0), RZ(0.3, 0), RZ(0.3, 0).dagger(),
+                                                X(1).controlled(0), H(0)))
+    wf = NumpyWavefunctionSimulator(n_qubits=2).do_circuit(circuit).wf
+    np.testing.assert_allclose(wf.reshape(-1), [0.5, 0.5, 0.5, -0.5], atol=1e-12)
+
+    with pytest.raises(ValueError):
+        NumpyWavefunctionSimulator(n_qubits=1).do_circuit(
+            CircuitArray.from_program(Program(RX(Parameter('a'), 0))))
@@ -0,0 +1,73 @@
+import pytest
+
+from pyquil import Program
+from pyquil.dependency_graph import DependencyGraph
+from pyquil.gates import CCNOT, CNOT, H, LOAD, MEASURE, MOVE, RESET, RX, STORE, X, Z
+from pyquil.quilatom import MemoryReference, QubitPlaceholder
+from pyquil.quilbase import Pragma
+
+
+def test_layers_and_depths():
+    p = Program()
+    ro = p.declare('ro', 'BIT', 3)
+    p += [H(0), CNOT(0, 1), H(2), X(3), CNOT(1, 2), Z(0), CCNOT(0, 1, 3)]
+    p += [MEASURE(q, ro[i]) for i, q in enumerate([0, 1, 2])]
+    graph = DependencyGraph(p)
+
+    assert len(graph) == 10
+    assert graph.layers(indices=True) == [[0, 2, 3], [1], [4, 5], [6, 9], [7, 8]]
+    assert graph.layers()[0] == [H(0), H(2), X(3)]
+    assert graph.depth() == 5
+    assert graph.gate_depth() == 4
+    assert graph.multiqubit_gate_depth() == 3
+    assert graph.critical_path() == [H(0), CNOT(0, 1), CNOT(1, 2), CCNOT(0, 1, 3),
+                                     MEASURE(0, ro[0])]
+    assert graph.predecessors[6] == [3, 4, 5]
+    assert graph.successors[1] == [4, 5]
+    assert graph.ancestors([9]) == [0, 1, 2, 4, 9]
+
+
+def test_empty():
+    graph = DependencyGraph(Program())
+    assert graph.layers() == []
+    assert graph.critical_path() == []
+    assert graph.depth() == graph.gate_depth() == graph.multiqubit_gate_depth() == 0
+
+
+def test_memory_dependencies():
+    p = Program()
+    theta = p.declare('theta', 'REAL', 2)
+    ro = p.declare('ro', 'BIT', 2)
+    p += [RX(theta[0], 0), RX(2 * theta[0], 1), MOVE(theta[0], 0.5), RX(theta[1], 2),
+          MEASURE(0, ro[0]), MEASURE(1, ro[0]), MEASURE(2, ro[1])]
+    graph = DependencyGraph(p)
+
+    # gates reading the same location are independent, but a write waits for the reads
+    assert graph.predecessors[:4] == [[], [], [0, 1], []]
+    # measurements into the same location are ordered
+    assert graph.predecessors[4:] == [[0], [1, 4], [3]]
+
+
+def test_whole_region_accesses():
+    p = Program()
+    ro = p.declare('ro', 'BIT', 2)
+    index = p.declare('index', 'INTEGER')
+    p += [MEASURE(0, ro[0]), MEASURE(1, ro[1]), LOAD(index, 'ro', index), MEASURE(2, ro[1]),
+          STORE('ro', index, index), MOVE(ro[0], 1)]
+    graph = DependencyGraph(p)
+    assert graph.predecessors == [[], [], [0, 1], [2], [2, 3], [4]]
+
+
+def test_barriers():
+    p = Program(H(0), H(1), Pragma('PRESERVE_BLOCK'), H(0), RESET(), X(1), X(2))
+    graph = DependencyGraph(p)
+    assert graph.layers(indices=True) == [[0, 1], [2], [3], [4], [5, 6]]
+
+
+def test_placeholders_and_control_flow():
+    q = QubitPlaceholder.register(2)
+    graph = DependencyGraph([H(q[0]), H(q[1]), CNOT(q[0], q[1])])
+    assert graph.depth() == 2
+
+    with pytest.raises(ValueError):
+        DependencyGraph(Program(H(0)).while_do(MemoryReference('ro'), Program(X(0))))
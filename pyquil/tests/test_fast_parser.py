@@ -0,0 +1,128 @@
+import os
+import re
+
+import pytest
+
+from pyquil._parser.PyQuilListener import run_parser
+from pyquil._parser import fast_parser
+from pyquil._parser.fast_parser import (_Unsupported, _clean_line, _parse_line, iter_fast_parser,
+                                         run_fast_parser)
+from pyquil.quilbase import Gate
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'parser_conformance.quil')
+
+
+def _repr(value):
+    # without the addresses of functions, such as the one of CIS
+    return re.sub(' at 0x[0-9a-f]+', '', repr(value))
+
+
+def _describe(instructions):
+    """The type, Quil and attributes of instructions, which must be the same for both parsers."""
+    descriptions = []
+    for instr in instructions:
+        attributes = {name: (type(getattr(instr, name)), _repr(getattr(instr, name)))
+                      for name in getattr(instr, '__slots__', ()) if hasattr(instr, name)}
+        if isinstance(instr, Gate):
+            attributes['params'] = [(type(p), _repr(p)) for p in instr.params]
+            attributes['modifiers'] = list(instr.modifiers)
+        descriptions.append((type(instr), instr.out(), attributes))
+    return descriptions
+
+
+def _corpus():
+    with open(CORPUS) as f:
+        supported, fallback = f.read().split('# FALLBACK\n')
+    return supported, fallback
+
+
+def test_conformance_per_line():
+    supported, fallback = _corpus()
+    for line in supported.splitlines():
+        instruction = _parse_line(_clean_line(line, last=False))
+        expected = run_parser(line)
+        assert _describe([instruction] if instruction else []) == _describe(expected), line
+
+    for line in fallback.splitlines():
+        if line and not line.startswith(' '):
+            with pytest.raises(_Unsupported):
+                _parse_line(_clean_line(line, last=False))
+
+
+def test_conformance_whole_program():
+    supported, fallback = _corpus()
+    for quil in [supported, supported + fallback, fallback + supported,
+                 (supported + fallback).replace('\n', '\r\n')]:
+        assert _describe(run_fast_parser(quil)) == _describe(run_parser(quil))
+
+
+def test_long_fallback_runs(monkeypatch):
+    # runs of lines left to the ANTLR parser are split between instructions
+    monkeypatch.setattr(fast_parser, '_MAX_UNSUPPORTED_LINES', 2)
+    supported, fallback = _corpus()
+    lines = (supported + fallback).splitlines()
+    assert _describe(iter_fast_parser(lines)) == _describe(run_parser(supported + fallback))
+
+    lines[-1] = 'MOVE'
+    with pytest.raises(RuntimeError) as e:
+        list(iter_fast_parser(lines))
+    assert 'at line {} '.format(len(lines)) in str(e.value)
+
+
+def test_alternating_fallback_lines():
+    # each line left to the ANTLR parser is parsed on its own, with errors at the right line
+    lines = ['DECLARE x INTEGER'] + ['H 0', 'ADD x 1'] * 200
+    assert _describe(iter_fast_parser(lines)) == _describe(run_parser('\n'.join(lines)))
+
+    lines += ['ADD x 1', '', '# a comment', 'ADD x']
+    with pytest.raises(RuntimeError) as expected:
+        run_parser('\n'.join(lines))
+    with pytest.raises(RuntimeError) as actual:
+        list(iter_fast_parser(lines))
+    assert 'at line {} '.format(len(lines)) in str(actual.value)
+    assert str(actual.value) == str(expected.value)
+
+
+def test_dense_fallback_runs(monkeypatch):
+    # programs alternating between supported and unsupported lines are parsed at once
+    calls = []
+    monkeypatch.setattr(fast_parser, '_run_parser',
+                        lambda quil: calls.append(quil) or run_parser(quil))
+    quil = 'DECLARE x INTEGER\n' + 'H 0\nADD x 1\n' * 100
+    assert _describe(run_fast_parser(quil)) == _describe(run_parser(quil))
+    assert len(calls) == fast_parser._MAX_FALLBACK_RUNS + 1 and calls[-1] == quil
+
+    # but not programs with a few unsupported lines
+    calls.clear()
+    quil = 'DECLARE x INTEGER\n' + ('H 0\n' * 10 + 'ADD x 1\n') * 20
+    assert _describe(run_fast_parser(quil)) == _describe(run_parser(quil))
+    assert len(calls) == 20
+
+
+@pytest.mark.parametrize('quil', [
+    'H 0\nRX(0.5)\nH 1',
+    'H 0\nH    0',
+    'H 0\nMOVE\nH 1',
+    'H 0\nMEASURE 0 pi',
+    'H 0\nDEFGATE FOO:\nH 0',
+    'H 0\nRESET(0.5) 0',
+    'H 0\ni 0',
+    'H 0; H 1',
+    'H 0\nPRAGMA X "a # b',
+])
+def test_errors(quil):
+    # errors are reported by the ANTLR parser, at the right line
+    with pytest.raises(RuntimeError) as expected:
+        run_parser(quil)
+    with pytest.raises(RuntimeError) as actual:
+        run_fast_parser(quil)
+    assert str(actual.value) == str(expected.value)
+
+
+def test_listener_errors():
+    for quil in ['H 0 1', 'RX 0', 'RX(1/0) 0']:
+        with pytest.raises(Exception) as expected:
+            run_parser(quil)
+        with pytest.raises(Exception) as actual:
+            run_fast_parser(quil)
+        assert actual.type is expected.type
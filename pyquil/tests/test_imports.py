@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _run(code):
+    result = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="imports are eager before Python 3.7")
+def test_lazy_imports():
+    # dependencies which are slow to import are only imported on first use
+    lazy = ['requests', 'rpcq', 'zmq', 'networkx', 'antlr4', 'pyquil.api',
+            'pyquil.operator_estimation', 'pyquil._parser.PyQuilListener']
+    imported = _run('import sys, pyquil; pyquil.Program("H 0"); print(*sys.modules)')
+    assert [module for module in lazy if module in imported] == []
+
+
+def test_public_names():
+    assert _run('import pyquil; print(pyquil.get_qc.__module__)') == \
+        ['pyquil.api._quantum_computer']
+    assert _run('from pyquil.api import QVM; print(QVM.__module__)') == ['pyquil.api._qvm']
+    assert _run('import pyquil; print(pyquil.api.QPUConnection.__module__)') == ['pyquil.api._qpu']
+    assert _run('import pyquil; print(pyquil.paulis.sX.__name__)') == ['sX']
+    with pytest.raises(subprocess.CalledProcessError):
+        _run('import pyquil.api; pyquil.api.NotAName')
+
+
+def test_lazy_import_errors():
+    # an AttributeError raised while importing a module on first use isn't reported as a missing
+    # name, but as an ImportError caused by it
+    broken = ('import importlib.abc, importlib.util, sys\n'
+              'class Broken(importlib.abc.MetaPathFinder, importlib.abc.Loader):\n'
+              '    def find_spec(self, name, path, target=None):\n'
+              '        if name == "pyquil.api._qvm":\n'
+              '            return importlib.util.spec_from_loader(name, self)\n'
+              '    def exec_module(self, module):\n'
+              '        raise AttributeError("broken")\n'
+              'sys.meta_path.insert(0, Broken())\n')
+    for statement in ['from pyquil.api import QVM', 'import pyquil; pyquil.api.QVM']:
+        result = _run(broken + 'try:\n'
+                      '    ' + statement + '\n'
+                      'except ImportError as e:\n'
+                      '    print(type(e.__cause__).__name__, "broken" in str(e))\n')
+        assert result == ['AttributeError', 'True']
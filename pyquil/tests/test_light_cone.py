@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.gates import *
+from pyquil.light_cone import light_cone, qubit_clusters, split_program, light_cone_expectation
+from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+from pyquil.paulis import sX, sY, sZ
+from pyquil.quilbase import Declare
+from pyquil.tests.test_reference_wavefunction_simulator import (_generate_random_program,
+                                                                 _generate_random_pauli)
+
+
+def test_light_cone():
+    prog = Program(H(0), CNOT(0, 1), X(2), CNOT(2, 3), H(3))
+    assert light_cone(prog, [1]) == Program(H(0), CNOT(0, 1))
+    assert light_cone(prog, [3]) == Program(X(2), CNOT(2, 3), H(3))
+    assert light_cone(prog, [2]) == Program(X(2), CNOT(2, 3))
+    assert light_cone(prog, [4]) == Program()
+
+
+def test_light_cone_measurements():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += H(0)
+    prog += H(1)
+    prog += MEASURE(0, ro[0])
+    prog += CNOT(0, 2)
+    prog += MEASURE(1, None)
+    assert light_cone(prog) == Program(Declare('ro', 'BIT', 1), H(0), MEASURE(0, ro[0]))
+
+
+def test_qubit_clusters():
+    prog = Program(H(0), CNOT(0, 3), X(1), CZ(1, 2), CNOT(2, 4), Y(5))
+    assert qubit_clusters(prog) == [[0, 3], [1, 2, 4], [5]]
+    assert qubit_clusters(prog, [6]) == [[0, 3], [1, 2, 4], [5], [6]]
+
+
+def test_split_program():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 2)
+    prog += H(0)
+    prog += X(1)
+    prog += CNOT(0, 2)
+    prog += MEASURE(1, ro[1])
+    prog += MEASURE(2, ro[0])
+    (qubits_a, prog_a), (qubits_b, prog_b) = split_program(prog)
+    assert qubits_a == [0, 2]
+    assert prog_a == Program(Declare('ro', 'BIT', 2), H(0), CNOT(0, 2), MEASURE(2, ro[0]))
+    assert qubits_b == [1]
+    assert prog_b == Program(Declare('ro', 'BIT', 2), X(1), MEASURE(1, ro[1]))
+
+
+def test_light_cone_expectation_simple():
+    prog = Program(X(0), H(1), CNOT(1, 2), H(5))
+    assert np.isclose(light_cone_expectation(prog, sZ(0)), -1)
+    assert np.isclose(light_cone_expectation(prog, sZ(1) * sZ(2)), 1)
+    assert np.isclose(light_cone_expectation(prog, 0.5 * sZ(0) * sX(5)), -0.5)
+    # qubits that the program never touches are in |0>
+    assert np.isclose(light_cone_expectation(prog, sZ(7)), 1)
+    assert np.isclose(light_cone_expectation(prog, sX(7) + sY(7)), 0)
+
+
+@pytest.mark.parametrize('n_qubits', [3, 5])
+def test_light_cone_expectation_vs_full(n_qubits):
+    for _ in range(10):
+        prog = _generate_random_program(n_qubits=n_qubits, length=8)
+        operator = _generate_random_pauli(n_qubits=n_qubits, n_terms=5)
+        full = NumpyWavefunctionSimulator(n_qubits=n_qubits).do_program(prog)
+        np.testing.assert_allclose(light_cone_expectation(prog, operator),
+                                   full.expectation(operator), atol=1e-12)
+
+
+def test_light_cone_expectation_rejects_measure():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += MEASURE(0, ro[0])
+    with pytest.raises(ValueError):
+        light_cone_expectation(prog, sZ(0))
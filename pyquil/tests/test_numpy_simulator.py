@@ -7,8 +7,9 @@ from pyquil import Program
 from pyquil.gate_matrices import QUANTUM_GATES as GATES
 from pyquil.gates import *
 from pyquil.numpy_simulator import targeted_einsum, NumpyWavefunctionSimulator, \
-    all_bitstrings, targeted_tensordot, _term_expectation
-from pyquil.paulis import sZ, sX
+    all_bitstrings, targeted_tensordot, _term_expectation, expectation_and_gradient
+from pyquil.paulis import sZ, sX, sY
+from pyquil.quilatom import Parameter, quil_sin
 from pyquil.pyqvm import PyQVM
 from pyquil.reference_simulator import ReferenceWavefunctionSimulator
 from pyquil.tests.test_reference_wavefunction_simulator import _generate_random_program, \
@@ -346,3 +347,70 @@ def test_tensordot_reorders_matrices():
             0, 1, 0, 0,
         ]).reshape((2, 2, 2, 2)),
         atol=1e-8)
+
+
+def _variational_program(theta, beta, sin, phase_dagger):
+    prog = Program()
+    prog += RX(theta[0], 0)
+    prog += RY(2 * beta, 1)
+    prog += CNOT(0, 1)
+    prog += RZ(theta[1] - beta / 2, 1)
+    prog += H(2)
+    prog += CPHASE(theta[2] * theta[0], 1, 2)
+    prog += phase_dagger(sin(beta), 0)
+    prog += PSWAP(theta[1] ** 2, 0, 2)
+    prog += RX(0.3, 2)
+    prog += CPHASE10(theta[3], 0, 1)
+    prog += RY(-theta[3], 0)
+    return prog
+
+
+def _numeric_expectation(memory_map, operator):
+    # the simulators don't apply modifiers, so spell out the inverse
+    prog = _variational_program(memory_map['theta'], memory_map['beta'], np.sin,
+                                lambda angle, qubit: PHASE(-angle, qubit))
+    return np.real(NumpyWavefunctionSimulator(n_qubits=3).do_program(prog).expectation(operator))
+
+
+def test_expectation_and_gradient_vs_finite_differences():
+    prog = Program()
+    theta = prog.declare('theta', 'REAL', 4)
+    prog += _variational_program(theta, Parameter('beta'), quil_sin,
+                                 lambda angle, qubit: PHASE(angle, qubit).dagger())
+    operator = 0.7 * sZ(0) * sZ(1) - 1.3 * sX(2) + 0.2 * sY(1) * sX(0) + 0.5
+
+    rs = np.random.RandomState(52)
+    for _ in range(5):
+        memory_map = {'theta': rs.uniform(-np.pi, np.pi, size=4), 'beta': rs.uniform(-1, 1)}
+        expectation, gradient = expectation_and_gradient(prog, operator, memory_map)
+        np.testing.assert_allclose(expectation, _numeric_expectation(memory_map, operator))
+        assert set(gradient) == {'theta', 'beta'}
+        assert gradient['theta'].shape == (4,)
+
+        eps = 1e-6
+        for offset in range(4):
+            plus = {**memory_map, 'theta': memory_map['theta'] + eps * np.eye(4)[offset]}
+            minus = {**memory_map, 'theta': memory_map['theta'] - eps * np.eye(4)[offset]}
+            fd = (_numeric_expectation(plus, operator)
+                  - _numeric_expectation(minus, operator)) / (2 * eps)
+            np.testing.assert_allclose(gradient['theta'][offset], fd, atol=1e-7)
+
+        plus = {**memory_map, 'beta': memory_map['beta'] + eps}
+        minus = {**memory_map, 'beta': memory_map['beta'] - eps}
+        fd = (_numeric_expectation(plus, operator)
+              - _numeric_expectation(minus, operator)) / (2 * eps)
+        np.testing.assert_allclose(gradient['beta'], fd, atol=1e-7)
+
+
+def test_expectation_and_gradient_errors():
+    prog = Program()
+    theta = prog.declare('theta', 'REAL')
+    prog += RX(theta, 0)
+    with pytest.raises(ValueError):
+        expectation_and_gradient(prog, sZ(0))
+    with pytest.raises(ValueError):
+        expectation_and_gradient(prog, 1j * sZ(0), {'theta': 0.1})
+    with pytest.raises(ValueError):
+        expectation_and_gradient(prog + MEASURE(0, None), sZ(0), {'theta': 0.1})
+    with pytest.raises(NotImplementedError):
+        expectation_and_gradient(Program(RX(theta, 0).controlled(1)), sZ(0), {'theta': 0.1})
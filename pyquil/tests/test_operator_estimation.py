@@ -15,7 +15,7 @@ from pyquil.gates import *
 from pyquil.api import WavefunctionSimulator, QVMConnection
 from pyquil.operator_estimation import ExperimentSetting, TomographyExperiment, to_json, read_json, \
     group_experiments, ExperimentResult, measure_observables, SIC0, SIC1, SIC2, SIC3, \
-    plusX, minusX, plusY, minusY, plusZ, minusZ, _one_q_sic_prep, \
+    plusX, minusX, plusY, minusY, plusZ, minusZ, _one_q_sic_prep, _one_q_state_prep, \
     _max_tpb_overlap, _max_weight_operator, _max_weight_state, _max_tpb_overlap, \
     TensorProductState, zeros_state, \
     group_experiments, group_experiments_greedy, ExperimentResult, measure_observables, \
@@ -2023,3 +2023,59 @@ def test_unitary_state_fidelity_readout_error(forest):
     # how close is this state to |0>
     expected_fidelity = (np.cos(theta / 2)) ** 2
     np.testing.assert_allclose(expected_fidelity, estimated_fidelity, atol=2e-2)
+
+
+def _exact_expectation(in_state, program, operator):
+    from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+    prep = Program()
+    for oneq_state in in_state.states:
+        prep += _one_q_state_prep(oneq_state)
+    return NumpyWavefunctionSimulator(n_qubits=2).do_program(prep + program).expectation(operator)
+
+
+def test_measure_observables_exact():
+    expts = [
+        ExperimentSetting(in_state, o1 * o2)
+        for in_state in [zeros_state([0, 1]), plusX(0) * minusY(1)]
+        for o1, o2 in itertools.product([sI(0), sX(0), sY(0), sZ(0)], [sI(1), sX(1), sY(1), sZ(1)])
+    ]
+    program = Program(RY(0.4, 0), CNOT(0, 1), RX(1.1, 1))
+    suite = group_experiments(TomographyExperiment(expts, program=program))
+
+    qc = get_qc('2q-pyqvm')
+    results = list(measure_observables(qc, suite, n_shots=1000, exact=True))
+    assert len(results) == len(expts)
+    for res in results:
+        expected = _exact_expectation(res.setting.in_state, program, res.setting.out_operator)
+        np.testing.assert_allclose(res.expectation, expected.real, atol=1e-12)
+        assert res.std_err == 0.0
+        assert res.total_counts == 1000
+
+
+def test_measure_observables_exact_shot_noise():
+    expts = [ExperimentSetting(zeros_state([0, 1]), -0.5 * sZ(0) * sZ(1)),
+             ExperimentSetting(zeros_state([0, 1]), sX(0)),
+             ExperimentSetting(zeros_state([0, 1]), sI(0))]
+    program = Program(RY(0.7, 0), CNOT(0, 1))
+    suite = TomographyExperiment(expts, program=program)
+
+    qc = get_qc('2q-pyqvm')
+    n_shots = 10000
+    for res in measure_observables(qc, suite, n_shots=n_shots, exact=True, shot_noise=True):
+        expected = _exact_expectation(res.setting.in_state, program,
+                                      res.setting.out_operator).real
+        if res.setting.out_operator == sI(0):
+            assert res.expectation == 1.0 and res.std_err == 0.0
+            continue
+        coeff = abs(res.setting.out_operator.coefficient)
+        np.testing.assert_allclose(res.std_err, np.sqrt((coeff ** 2 - expected ** 2) / n_shots),
+                                   rtol=0.1)
+        assert np.abs(res.expectation - expected) <= 5 * res.std_err
+
+
+def test_measure_observables_exact_requires_pyqvm():
+    suite = TomographyExperiment([ExperimentSetting(zeros_state([0]), sZ(0))],
+                                 program=Program(X(0)))
+    qc = Mock()  # e.g. backed by a QVM
+    with pytest.raises(ValueError):
+        list(measure_observables(qc, suite, exact=True))
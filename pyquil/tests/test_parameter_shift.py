@@ -0,0 +1,132 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.api import QuantumComputer
+from pyquil.api._qam import QAM
+from pyquil.device import NxDevice
+from pyquil.gates import *
+from pyquil.gate_matrices import QUANTUM_GATES
+from pyquil.numpy_simulator import (NumpyWavefunctionSimulator, expectation_and_gradient,
+                                    _evaluate_with_derivatives)
+from pyquil.parameter_shift import ParameterShiftGradient
+from pyquil.paulis import sX, sY, sZ
+from pyquil.quilatom import MemoryReference, Qubit, quil_cos
+from pyquil.quilbase import Gate, Measurement
+from pyquil.tests.utils import DummyCompiler
+
+
+class SubstitutingQAM(QAM):
+    """A QAM that substitutes memory values into gate parameters and samples the result."""
+
+    def __init__(self, n_qubits, seed=None):
+        super().__init__()
+        self.n_qubits = n_qubits
+        self.rs = np.random.RandomState(seed)
+        self.n_loads = 0
+
+    def load(self, executable):
+        self.n_loads += 1
+        return super().load(executable)
+
+    def run(self):
+        super().run()
+        values = {MemoryReference(aref.name, aref.index): value
+                  for aref, value in self._variables_shim.items()}
+        simulator = NumpyWavefunctionSimulator(n_qubits=self.n_qubits, rs=self.rs)
+        qubit_to_ram = {}
+        for instr in self._executable:
+            if isinstance(instr, Gate):
+                params = [_evaluate_with_derivatives(p, values)[0] for p in instr.params]
+                matrix = QUANTUM_GATES[instr.name](*params) if params else QUANTUM_GATES[instr.name]
+                if instr.modifiers.count('DAGGER') % 2 == 1:
+                    matrix = matrix.conj().T
+                simulator.do_gate_matrix(matrix, [q.index for q in instr.qubits])
+            elif isinstance(instr, Measurement):
+                qubit_to_ram[instr.qubit.index] = instr.classical_reg.offset
+        samples = simulator.sample_bitstrings(self._executable.num_shots)
+        self._bitstrings = np.zeros((len(samples), len(qubit_to_ram)), dtype=int)
+        for qubit, offset in qubit_to_ram.items():
+            self._bitstrings[:, offset] = samples[:, qubit]
+        return self
+
+
+def _qc(n_qubits, seed=None):
+    return QuantumComputer(name='testy!', qam=SubstitutingQAM(n_qubits, seed=seed),
+                           device=NxDevice(nx.complete_graph(n_qubits)),
+                           compiler=DummyCompiler())
+
+
+def _program():
+    prog = Program()
+    theta = prog.declare('theta', 'REAL', 3)
+    prog += RX(theta[0], 0)
+    prog += RY(2 * theta[1] + 0.1, 1)
+    prog += CNOT(0, 1)
+    prog += RZ(theta[0] * theta[2], 1)
+    prog += H(2)
+    prog += CPHASE(quil_cos(theta[2]), 1, 2)
+    prog += RX(0.3, 2)
+    return prog
+
+
+def test_parameter_shift_gradient():
+    prog = _program()
+    observable = 0.5 * sZ(0) * sZ(1) - sX(2) + 0.7 * sY(1) * sX(2) + 0.25
+    qc = _qc(3, seed=52)
+    n_shots = 4000
+    gradient = ParameterShiftGradient(qc, prog, observable, n_shots=n_shots)
+    # ZZ and X(2) share a basis; Y(1)X(2) needs its own
+    assert len(gradient._groups) == 2
+
+    memory_map = {'theta': [0.4, -0.3, 1.2]}
+    estimate = gradient(memory_map)
+    assert qc.qam.n_loads == 2
+
+    exact, exact_gradient = expectation_and_gradient(prog, observable, memory_map)
+    assert estimate.total_counts == n_shots
+    assert np.abs(estimate.expectation - exact) < 5 * estimate.std_err
+    assert estimate.gradient['theta'].shape == (3,)
+    assert np.all(estimate.gradient_std_err['theta'] > 0)
+    assert np.all(np.abs(estimate.gradient['theta'] - exact_gradient['theta'])
+                  < 5 * estimate.gradient_std_err['theta'])
+
+    # the executables are reused for new parameter values
+    estimate = gradient({'theta': [0.0, 0.0, 0.0]})
+    assert qc.qam.n_loads == 4
+
+
+def test_parameter_shift_gradient_vs_finite_differences():
+    prog = Program()
+    theta = prog.declare('theta', 'REAL', 2)
+    prog += [RX(0.3, 0), RY(theta[0], 0).dagger(), CNOT(0, 1), RZ(theta[1], 1), H(1)]
+    observable = sZ(0) - 0.5 * sX(1)
+    gradient = ParameterShiftGradient(_qc(2, seed=52), prog, observable, n_shots=4000)
+    values = np.array([0.7, -0.4])
+    estimate = gradient({'theta': list(values)})
+
+    eps = 1e-6
+    finite_differences = []
+    for k in range(2):
+        shift = eps * np.eye(2)[k]
+        plus, _ = expectation_and_gradient(prog, observable, {'theta': list(values + shift)})
+        minus, _ = expectation_and_gradient(prog, observable, {'theta': list(values - shift)})
+        finite_differences.append((plus - minus) / (2 * eps))
+    assert np.all(np.abs(estimate.gradient['theta'] - finite_differences)
+                  < 5 * estimate.gradient_std_err['theta'])
+
+
+def test_parameter_shift_gradient_errors():
+    qc = _qc(2)
+    prog = Program()
+    theta = prog.declare('theta', 'REAL')
+    with pytest.raises(ValueError):
+        ParameterShiftGradient(qc, prog + PSWAP(theta, 0, 1) + MEASURE(0, None), sZ(0))
+    with pytest.raises(ValueError):
+        ParameterShiftGradient(qc, prog + CZ(0, 1) + Gate('XY', [theta], [Qubit(0), Qubit(1)]), sZ(0))
+    with pytest.raises(ValueError):
+        ParameterShiftGradient(qc, prog + RX(theta, 0), 1j * sZ(0))
+    # the two-term rule doesn't apply to controlled rotations
+    with pytest.raises(ValueError):
+        ParameterShiftGradient(qc, prog + H(0) + RX(theta, 1).controlled(0), sX(0))
@@ -1,6 +1,7 @@
 from math import pi
 
 import numpy as np
+import pytest
 
 from pyquil.parameters import (Parameter, quil_sin, quil_cos, quil_sqrt, quil_exp, quil_cis,
                                _contained_parameters, format_parameter, quil_cis, substitute, substitute_array)
@@ -32,6 +33,10 @@ def test_pretty_print_pi():
         (pi / 9, '0.3490658503988659'),
         (pi / 8, 'pi/8'),
         (-90 * pi / 2, '-45*pi'),
+        (3 * pi / 4, '3*pi/4'),
+        (-7 * pi / 8, '-7*pi/8'),
+        (2 ** 50 * pi, '1125899906842624*pi'),
+        (0.1, '0.1'),
     ]
 
     for test_case in test_cases:
@@ -91,3 +96,36 @@ def test_eval():
 
     assert substitute(quil_cis(x), {y: 5}) == quil_cis(x)
     assert np.allclose(substitute_array([quil_sin(x), quil_cos(x)], {x: 5}), [np.sin(5), np.cos(5)])
+
+
+def test_compiled_expressions():
+    from pyquil.quilatom import CompiledExpressions, MemoryReference
+
+    x, y, theta = Parameter('x'), Parameter('y'), MemoryReference('theta')
+    expressions = [quil_sin(x * x ** 2 / y), quil_cis(x) - theta, 2 * theta ** 0.5, 1.5]
+    compiled = CompiledExpressions(expressions)
+    assert compiled.variables == [x, y, theta]
+    values = [5.0, 10.0, 4.0]
+    assert np.allclose(compiled(values), [np.sin(12.5), np.exp(5j) - 4, 4, 1.5])
+    # the values may be arrays, e.g. for a parameter sweep
+    sweep = compiled([np.linspace(0, 1, 5), np.ones(5), np.ones(5)])
+    assert sweep.shape == (4, 5)
+    assert np.allclose(sweep[:, 3], compiled([0.75, 1.0, 1.0]))
+    # or a mix of numbers and arrays
+    sweep = compiled([np.linspace(0, 1, 5), 1.0, np.ones((2, 1))])
+    assert sweep.shape == (4, 2, 5)
+    assert np.allclose(sweep[:, 1, 3], compiled([0.75, 1.0, 1.0]))
+
+    assert np.allclose(CompiledExpressions([y - x], variables=[x, y])([1.0, 3.0]), [2.0])
+    with pytest.raises(ValueError):
+        CompiledExpressions([x + y], variables=[x])
+    with pytest.raises(ValueError):
+        CompiledExpressions(['x'])
+
+    # arrays of expressions are evaluated for every value of their parameters
+    matrix = substitute_array([[quil_cos(x), -quil_sin(x)], [quil_sin(x), 1]],
+                              {x: np.array([0.0, pi / 2])})
+    assert np.allclose(matrix[..., 1], [[0, -1], [1, 1]])
+    matrix = substitute_array([x * y, y], {x: np.array([1.0, 2.0]), y: 3.0})
+    assert np.allclose(matrix, [[3.0, 6.0], [3.0, 3.0]])
+    assert substitute_array([x, y + 1], {x: 2})[0] == 2
@@ -13,12 +13,16 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##############################################################################
+import io
+
 import numpy as np
 import pytest
 
+from pyquil import Program
 from pyquil.gates import *
 from pyquil.parameters import Parameter, quil_sin, quil_cos
-from pyquil.parser import parse
+from pyquil.parser import (parse, parse_program, clear_parse_cache, iter_parse, parse_cache_info,
+                           parse_many, set_parse_cache_size)
 from pyquil.quilatom import Addr
 from pyquil.quilatom import MemoryReference
 from pyquil.quilbase import Declare, Reset, ResetQubit
@@ -323,3 +327,113 @@ def test_parse_dagger():
 def test_parse_controlled():
     s = "CONTROLLED X 0 1"
     parse_equals(s, X(1).controlled(0))
+
+
+def test_parse_cache():
+    clear_parse_cache()
+    first = parse("H 0\nCNOT 0 1")
+    second = parse("H 0\nCNOT 0 1")
+    assert first == second == [H(0), CNOT(0, 1)]
+    assert first is not second
+    assert parse_program("H 0\nCNOT 0 1") == parse_program("H 0\nCNOT 0 1")
+    info = parse_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (3, 1, 1)
+
+    # errors aren't cached
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            parse("H 0\nCNOT(0")
+    assert parse_cache_info().misses == 3
+
+    try:
+        set_parse_cache_size(1)
+        parse("H 0")
+        parse("X 0")
+        parse("H 0")
+        assert parse_cache_info() == (0, 3, 1, 1)
+        set_parse_cache_size(0)
+        parse("H 0")
+        assert parse_cache_info().currsize == 0
+
+        # long strings aren't cached
+        set_parse_cache_size(max_length=10)
+        assert parse("H 0\nCNOT 0 1") == [H(0), CNOT(0, 1)]
+        assert parse("H 0") == [H(0)]
+        assert parse_cache_info() == (0, 1, 128, 1)
+    finally:
+        set_parse_cache_size()
+    assert parse_cache_info().maxsize == 128
+
+
+def test_parse_cache_returns_copies():
+    # changing a parsed instruction doesn't change the instructions parsed later
+    program = Program('X 0\nRX(0.5) 1')
+    program[0].controlled(1)
+    program[1].dagger()
+    assert Program('X 0\nRX(0.5) 1').out() == 'X 0\nRX(0.5) 1\n'
+    gate = parse('H 2')[0]
+    gate.dagger()
+    assert parse('H 2') == [H(2)]
+    assert parse('H 2')[0].modifiers == []
+
+
+STREAMED_QUIL = """DECLARE ro BIT[2]
+DEFGATE SQRT-X:
+    0.5+0.5i, 0.5-0.5i
+
+    0.5-0.5i, 0.5+0.5i
+H 0
+SQRT-X 1
+DEFCIRCUIT BELL a b:
+    H a
+    CNOT a b
+# a comment
+BELL 0 1
+MOVE ro[0] 1
+MEASURE 1 ro[1]
+"""
+
+
+def test_iter_parse(tmp_path):
+    path = tmp_path / 'program.quil'
+    path.write_text(STREAMED_QUIL)
+    expected = parse(STREAMED_QUIL)
+    assert list(iter_parse(str(path))) == expected
+    assert list(iter_parse(path)) == expected
+    assert list(iter_parse(io.StringIO(STREAMED_QUIL.replace('\n', '\r\n')))) == expected
+    assert Program(iter_parse(str(path))) == parse_program(STREAMED_QUIL)
+
+
+def test_iter_parse_is_lazy():
+    read = []
+
+    def lines():
+        for line in STREAMED_QUIL.splitlines(keepends=True):
+            read.append(line)
+            yield line
+
+    instructions = iter_parse(lines())
+    assert next(instructions) == Declare('ro', 'BIT', 2)
+    assert isinstance(next(instructions), DefGate)
+    assert len(read) < 8
+
+
+def test_iter_parse_errors():
+    with pytest.raises(RuntimeError) as e:
+        list(iter_parse(io.StringIO("H 0\nH 1\nRX(0.5 2\nH 2\n")))
+    assert 'line 3 ' in str(e.value)
+
+
+def test_parse_many(tmp_path):
+    sources = [STREAMED_QUIL, "H 0\nCNOT 0 1", tmp_path / 'program.quil', "RX(pi/2) 0"]
+    sources[2].write_text("DECLARE ro BIT\nX 0\nMEASURE 0 ro")
+    expected = [parse_program(STREAMED_QUIL), Program(H(0), CNOT(0, 1)),
+                parse_program("DECLARE ro BIT\nX 0\nMEASURE 0 ro"), Program(RX(np.pi / 2, 0))]
+    assert parse_many(sources, workers=2, chunksize=1) == expected
+    assert parse_many(iter(sources), workers=1) == expected
+    assert parse_many([], workers=2) == []
+
+    with pytest.raises(RuntimeError):
+        parse_many(["H 0", "H("], workers=2)
+    with pytest.raises(ValueError):
+        parse_many(sources, workers=0)
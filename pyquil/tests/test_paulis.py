@@ -28,8 +28,9 @@ from six.moves import range
 from pyquil.gates import I, RX, RZ, CNOT, H, X, PHASE
 from pyquil.paulis import PauliTerm, PauliSum, exponential_map, exponentiate_commuting_pauli_sum, \
     ID, UnequalLengthWarning, exponentiate, trotterize, is_zero, check_commutation, commuting_sets, \
-    term_with_coeff, sI, sX, sY, sZ, ZERO, is_identity
+    term_with_coeff, sI, sX, sY, sZ, ZERO, is_identity, PauliTable, PauliSumBuilder
 from pyquil.quil import Program
+from pyquil.quilatom import QubitPlaceholder
 
 
 def isclose(a, b, rel_tol=1e-10, abs_tol=0.0):
@@ -504,7 +505,54 @@ def test_commuting_sets():
     term2 = PauliTerm("Y", 0) * PauliTerm("Y", 1)
     term3 = PauliTerm("Y", 0) * PauliTerm("Z", 2)
     pauli_sum = term1 + term2 + term3
-    commuting_sets(pauli_sum)
+    assert commuting_sets(pauli_sum) == [[term1, term2], [term3]]
+    assert commuting_sets(pauli_sum, qubitwise=True) == [[term1], [term2, term3]]
+    with pytest.raises(ValueError):
+        commuting_sets(pauli_sum, strategy='random')
+
+
+@pytest.mark.parametrize('qubitwise', [False, True])
+@pytest.mark.parametrize('strategy', ['sequential', 'largest_first'])
+def test_commuting_sets_random(qubitwise, strategy):
+    random_state = np.random.RandomState(7)
+    pauli_sum = _random_pauli_sum(random_state, 600, 6)
+    groups = commuting_sets(pauli_sum, qubitwise=qubitwise, strategy=strategy)
+    assert sorted(map(str, pauli_sum)) == sorted(str(term) for group in groups for term in group)
+    commutes = PauliTable.qubitwise_commutes if qubitwise else PauliTable.commutes
+    tables = [PauliTable.from_pauli_sum(PauliSum(group)) for group in groups]
+    for i, table in enumerate(tables):
+        assert commutes(table, table).all()
+        if strategy == 'sequential':
+            # each term is in the first set with which it commutes
+            for previous in tables[:i]:
+                assert not commutes(previous, table).all(axis=0).any()
+
+
+def test_pauli_sum_builder():
+    random_state = np.random.RandomState(3)
+    pauli_sum = _random_pauli_sum(random_state, 200, 3)
+    builder = PauliSumBuilder(2.0)
+    expected = PauliSum([2.0 * ID()])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for term in pauli_sum:
+            builder += term
+            expected += term
+        builder -= PauliSum(pauli_sum[:10])
+        expected -= PauliSum(pauli_sum[:10])
+        builder -= sX(0)
+        expected -= sX(0)
+    assert builder.build() == expected
+    assert len(builder) == len({t.operations_as_set() for t in pauli_sum.terms + [ID(), sX(0)]})
+
+    builder = PauliSumBuilder(sX(0) * sY(1))
+    builder -= sX(0) * sY(1)
+    assert builder.build() == ZERO()
+    with pytest.warns(UserWarning):
+        builder += sY(1) * sX(0)
+    assert builder.build().terms[0].id(sort_ops=False) == 'X0Y1'
+    with pytest.raises(ValueError):
+        builder += 'X0'
 
 
 def test_paulisum_iteration():
@@ -676,3 +724,70 @@ def test_identity_no_qubit():
 def test_qubit_validation():
     with pytest.raises(ValueError):
         op = sX(None)
+
+
+def _random_pauli_sum(random_state, n_terms, n_qubits):
+    terms = []
+    for _ in range(n_terms):
+        qubits = random_state.choice(n_qubits, random_state.randint(n_qubits + 1), replace=False)
+        terms.append(PauliTerm.from_list([(random_state.choice(list('IXYZ')), int(q))
+                                          for q in qubits],
+                                         complex(*random_state.normal(size=2))))
+    return PauliSum(terms)
+
+
+@pytest.mark.filterwarnings('ignore:The term')
+def test_pauli_table_matches_pauli_sum():
+    random_state = np.random.RandomState(42)
+    for _ in range(30):
+        a = _random_pauli_sum(random_state, random_state.randint(1, 8), 5)
+        b = _random_pauli_sum(random_state, random_state.randint(1, 8), 5)
+        table_a, table_b = PauliTable.from_pauli_sum(a), PauliTable.from_pauli_sum(b)
+
+        assert table_a.to_pauli_sum() == a
+        assert table_a.simplify().to_pauli_sum() == a.simplify()
+        assert (table_a * table_b).to_pauli_sum() == a * b
+        assert (table_a * b).to_pauli_sum() == a * b
+        assert (table_a + table_b).to_pauli_sum() == a + b
+        assert (table_a - b[0]).to_pauli_sum() == a - b[0]
+        # PauliSums and PauliTerms on the left give the same tables
+        assert (b * table_a).to_pauli_sum() == b * a
+        assert (b[0] * table_a).to_pauli_sum() == b[0] * a
+        assert (b + table_a).to_pauli_sum() == b + a
+        assert (b[0] + table_a).to_pauli_sum() == b[0] + a
+        assert (b[0] - table_a).to_pauli_sum() == b[0] - a
+        assert (b - table_a).to_pauli_sum() == b - a
+        assert (1 - table_a).to_pauli_sum() == 1 - a
+        assert (2j * table_a).simplify().to_pauli_sum() == 2j * a
+        assert table_a.commutator(table_b).to_pauli_sum() == a * b - b * a
+        assert table_a.commutes(table_b).tolist() == [
+            [check_commutation([s], t) for t in b] for s in a]
+        assert table_a.qubitwise_commutes(table_b).tolist() == [
+            [all(s[q] == t[q] or 'I' in (s[q], t[q]) for q in range(5)) for t in b] for s in a]
+
+
+def test_pauli_table():
+    table = PauliTable.from_pauli_sum(sX(0) * sZ(1) + 0.5 * sY(1))
+    assert table.qubits == (0, 1)
+    assert table.x.tolist() == [[True, False], [False, True]]
+    assert table.z.tolist() == [[False, True], [False, True]]
+    assert table.coefficients.tolist() == [1, 0.5]
+    assert (table * table).to_pauli_sum() == 1.25 * ID()
+    # the product of the i-th and j-th terms is the (i * len(other) + j)-th row
+    assert table.product(table).to_pauli_sum().terms[1] == -0.5j * sX(0) * sX(1)
+    assert table.commutator(sZ(0)).to_pauli_sum() == -2j * sY(0) * sZ(1)
+
+    # tables on different qubits, including placeholders, are aligned
+    q = QubitPlaceholder()
+    assert (table + sX(q)).qubits == (0, 1, q)
+    assert table.on_qubits([2, 1, 0]).to_pauli_sum() == table.to_pauli_sum()
+    assert (table - table).to_pauli_sum() == ZERO()
+    assert len(table - table) == 0
+
+    assert table[1].to_pauli_sum() == 0.5 * sY(1)
+    assert table.qubitwise_commutes(sZ(1) * sY(2)).tolist() == [[True], [False]]
+
+    with pytest.raises(ValueError):
+        PauliTable.from_pauli_sum(sX(0) * sZ(1), qubits=[0])
+    with pytest.raises(ValueError):
+        PauliTable([[True]], [[False]], [1, 2], [0])
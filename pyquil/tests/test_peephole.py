@@ -0,0 +1,75 @@
+import numpy as np
+
+from pyquil import Program
+from pyquil.circuit_array import CircuitArray
+from pyquil.gates import CNOT, CZ, H, I, MEASURE, RX, RY, RZ, S, T, X, Y
+from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+from pyquil.peephole import peephole_optimize
+from pyquil.quilatom import MemoryReference, Parameter
+from pyquil.quilbase import DefGate, Pragma
+
+
+def test_inverse_cancellation():
+    prog = Program(X(0), Y(0), CNOT(0, 1), H(1), H(1), CNOT(0, 1), Y(0), X(0), S(2),
+                   S(2).dagger(), CZ(2, 3), T(3), CZ(2, 3))
+    optimized, report = peephole_optimize(prog)
+    assert optimized == Program(CZ(2, 3), T(3), CZ(2, 3))
+    assert report.cancelled_pairs == 5
+    assert report.original_length == 13
+    assert report.optimized_length == 3
+    assert report.reduction == 10
+
+
+def test_rotation_merging_and_identities():
+    theta = Parameter('theta')
+    prog = Program(RZ(0.25, 0), RZ(0.5, 0), RX(0, 1), RX(2 * np.pi, 1), I(1), RY(theta, 2),
+                   RY(0.5, 2), RX(np.pi, 3), RX(np.pi, 3))
+    optimized, report = peephole_optimize(prog)
+    assert optimized == Program(RZ(0.75, 0), I(1), RY(theta + 0.5, 2))
+    assert report.merged_rotations == 3
+    assert report.removed_identities == 3
+    assert report.cancelled_pairs == 0
+
+
+def test_blocked_rewrites():
+    ro = MemoryReference('ro')
+    theta = MemoryReference('theta')
+    prog = Program(H(0), MEASURE(0, ro), H(0),
+                   X(1), CNOT(1, 2), X(1),
+                   X(3), Pragma('PRESERVE_BLOCK'), X(3), X(3), Pragma('END_PRESERVE_BLOCK'),
+                   RX(theta, 4), MEASURE(5, theta), RX(-theta, 4),
+                   RX(0.5, 6), MEASURE(5, theta), RX(theta, 6),
+                   RZ(theta, 7), MEASURE(5, theta), RZ(0.5, 7))
+    optimized, report = peephole_optimize(prog)
+    assert optimized == prog
+    assert report.reduction == 0
+
+    # numeric gates are still rewritten across measurements
+    prog = Program(RX(0.5, 4), MEASURE(5, theta), RX(0.25, 4), RX(theta, 4))
+    optimized, _ = peephole_optimize(prog)
+    assert optimized.instructions == [RX(0.75, 4), MEASURE(5, theta), RX(theta, 4)]
+
+    # DEFGATEs shadowing standard gates are only cancelled against their DAGGER
+    dg = DefGate('H', np.array([[1, 0], [0, 1j]]))
+    prog = Program(dg, H(0), H(0), H(1), H(1).dagger())
+    optimized, _ = peephole_optimize(prog)
+    assert optimized.defined_gates == [dg]
+    assert optimized.instructions == [H(0), H(0)]
+
+
+def test_equivalence():
+    rs = np.random.RandomState(52)
+    gates = [lambda q: H(q), lambda q: X(q), lambda q: S(q), lambda q: S(q).dagger(),
+             lambda q: RZ(rs.choice([0.5, -0.5, np.pi]), q), lambda q: CNOT(q, (q + 1) % 3)]
+    prog = Program([gates[rs.randint(len(gates))](int(rs.randint(3))) for _ in range(300)])
+    optimized, report = peephole_optimize(prog)
+    assert report.reduction > 0
+    assert len(optimized) == report.optimized_length
+
+    state_prep = Program(RX(0.7, 0), RY(0.3, 1), H(2))
+    expected = NumpyWavefunctionSimulator(n_qubits=3).do_circuit(
+        CircuitArray.from_program(state_prep + prog)).wf
+    actual = NumpyWavefunctionSimulator(n_qubits=3).do_circuit(
+        CircuitArray.from_program(state_prep + optimized)).wf
+    # the global phase may change
+    np.testing.assert_allclose(np.abs(np.vdot(expected, actual)), 1)
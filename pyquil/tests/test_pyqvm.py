@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.gates import *
+from pyquil.pyqvm import PyQVM, PrefixStateCache
+from pyquil.quilbase import Declare
+
+
+def _run(qam, program):
+    return qam.load(program).run().wait().read_memory(region_name='ro')
+
+
+def test_compact_sparse_qubits():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 3)
+    prog += X(17)
+    prog += CNOT(17, 30)
+    prog += MEASURE(10, ro[2])
+    prog += MEASURE(17, ro[0])
+    prog += MEASURE(30, ro[1])
+    prog.wrap_in_numshots_loop(10)
+
+    qam = PyQVM(n_qubits=3)
+    bitstrings = _run(qam, prog)
+    assert qam.qubit_mapping == {10: 0, 17: 1, 30: 2}
+    assert qam.wf_simulator.n_qubits == 3
+    np.testing.assert_array_equal(bitstrings, np.tile([1, 1, 0], (10, 1)))
+
+
+def test_compact_shrinks_register():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += X(5)
+    prog += MEASURE(5, ro[0])
+
+    qam = PyQVM(n_qubits=12)
+    bitstrings = _run(qam, prog)
+    assert qam.wf_simulator.n_qubits == 1
+    np.testing.assert_array_equal(bitstrings, [[1]])
+
+    # A program using the whole device gets the whole register back.
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 12)
+    prog += [X(q) for q in range(12)]
+    prog += [MEASURE(q, ro[q]) for q in range(12)]
+    bitstrings = _run(qam, prog)
+    assert qam.wf_simulator.n_qubits == 12
+    np.testing.assert_array_equal(bitstrings, np.ones((1, 12)))
+
+
+def test_compact_disabled():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += X(1)
+    prog += MEASURE(1, ro[0])
+
+    qam = PyQVM(n_qubits=3, compact_qubits=False)
+    bitstrings = _run(qam, prog)
+    assert qam.wf_simulator.n_qubits == 3
+    np.testing.assert_array_equal(bitstrings, [[1]])
+
+
+def test_too_many_qubits():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 3)
+    prog += [MEASURE(q, ro[i]) for i, q in enumerate([3, 7, 9])]
+    with pytest.raises(ValueError):
+        PyQVM(n_qubits=2).load(prog)
+
+
+def test_prune_unmeasured_gates():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += H(0)
+    prog += X(1)
+    prog += CNOT(0, 2)
+    prog += MEASURE(1, ro[0])
+    prog += H(1)
+
+    qam = PyQVM(n_qubits=3)
+    bitstrings = _run(qam, prog)
+    assert qam.program == Program(Declare('ro', 'BIT', 1), X(0))
+    np.testing.assert_array_equal(bitstrings, [[1]])
+
+
+def test_independent_clusters():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 4)
+    prog += H(0)
+    prog += CNOT(0, 1)
+    prog += H(2)
+    prog += CNOT(2, 3)
+    prog += [MEASURE(q, ro[q]) for q in range(4)]
+    prog.wrap_in_numshots_loop(200)
+
+    qam = PyQVM(n_qubits=4, seed=52)
+    bitstrings = _run(qam, prog)
+    assert [qubits for qubits, _ in qam._cluster_programs] == [[0, 1], [2, 3]]
+    assert bitstrings.shape == (200, 4)
+    np.testing.assert_array_equal(bitstrings[:, 0], bitstrings[:, 1])
+    np.testing.assert_array_equal(bitstrings[:, 2], bitstrings[:, 3])
+    # the two pairs are sampled independently
+    assert np.any(bitstrings[:, 0] != bitstrings[:, 2])
+    # the full-size simulator is restored after sampling
+    assert qam.wf_simulator.n_qubits == 4
+
+
+def test_prune_disabled():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += X(0)
+    prog += H(1)
+    prog += MEASURE(0, ro[0])
+
+    with pytest.raises(ValueError):
+        PyQVM(n_qubits=2, prune_program=False).load(prog)
+
+
+def _prefix_cache_programs():
+    body = Program(H(0), CNOT(0, 1), RX(0.3, 2), CNOT(1, 2), RY(0.7, 0))
+    programs = []
+    for rotation in [I, H, lambda q: RX(np.pi / 2, q)]:
+        prog = Program()
+        ro = prog.declare('ro', 'BIT', 3)
+        prog += body
+        prog += [rotation(q) for q in range(3)]
+        prog += [MEASURE(q, ro[q]) for q in range(3)]
+        prog.wrap_in_numshots_loop(500)
+        programs.append(prog)
+    return programs
+
+
+def test_prefix_cache():
+    programs = _prefix_cache_programs()
+    cached = PyQVM(n_qubits=3, seed=1)
+    uncached = PyQVM(n_qubits=3, seed=1, prefix_cache_bytes=0)
+    for prog in programs:
+        np.testing.assert_array_equal(_run(cached, prog), _run(uncached, prog))
+    # the second program stores the state after the common body; the third one resumes from it
+    assert len(cached.prefix_cache) == 1
+    assert cached.prefix_cache.hits == 1
+    assert len(uncached.prefix_cache) == 0
+
+    # running the same program again resumes from its final state
+    np.testing.assert_array_equal(_run(cached, programs[-1]), _run(uncached, programs[-1]))
+    np.testing.assert_array_equal(_run(cached, programs[-1]), _run(uncached, programs[-1]))
+    assert cached.prefix_cache.hits == 3
+
+
+def test_prefix_cache_eviction():
+    cache = PrefixStateCache(max_bytes=3 * 16)
+    for key in range(5):
+        cache.store(key, np.ones(1, dtype=np.complex128) * key)
+    assert len(cache) == 3
+    assert cache.n_bytes == 3 * 16
+    assert cache.lookup([None, 0, 1]) == (0, None)
+    length, state = cache.lookup([None, 2, 7])
+    assert length == 1
+    np.testing.assert_array_equal(state, [2])
+
+    # too big to ever fit
+    cache.store(10, np.ones(4, dtype=np.complex128))
+    assert len(cache) == 3
+
+
+def test_user_assigned_simulator_kept():
+    from pyquil.reference_simulator import ReferenceWavefunctionSimulator
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 1)
+    prog += X(5)
+    prog += MEASURE(5, ro[0])
+
+    qam = PyQVM(n_qubits=12)
+    simulator = ReferenceWavefunctionSimulator(n_qubits=2, rs=np.random.RandomState(7))
+    qam.wf_simulator = simulator
+    bitstrings = _run(qam, prog)
+    np.testing.assert_array_equal(bitstrings, [[1]])
+    assert qam.wf_simulator is simulator
+
+    # too small for the whole register, so it has to be replaced
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 3)
+    prog += [MEASURE(q, ro[q]) for q in range(3)]
+    _run(qam, prog)
+    assert qam.wf_simulator is not simulator
+    assert qam.wf_simulator.n_qubits == 3
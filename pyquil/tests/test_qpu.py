@@ -2,7 +2,7 @@ import networkx as nx
 import numpy as np
 import pytest
 
-from rpcq.messages import ParameterAref
+from rpcq.messages import BinaryExecutableResponse, ParameterAref, ParameterSpec
 
 from pyquil.parser import parse
 from pyquil import Program, get_qc
@@ -185,6 +185,13 @@ def test_build_patch_tables(gate_arithmetic_binaries, mock_qpu):
                 assert len(values) == 2
 
 
+def _recalculated_values(qpu):
+    # the values patched into the executable for the recalculation table, in radians
+    patch_values = qpu._build_patch_values()
+    return [v * 2 * np.pi for mr in qpu._executable.recalculation_table
+            for v in [patch_values[mr.name][mr.index]]]
+
+
 def test_recalculation(gate_arithmetic_binaries, mock_qpu):
     bin = gate_arithmetic_binaries[0]
     mock_qpu.load(bin)
@@ -192,24 +199,24 @@ def test_recalculation(gate_arithmetic_binaries, mock_qpu):
         beta = -1 * np.random.random()
         mock_qpu.write_memory(region_name='beta', value=beta)
         mock_qpu.write_memory(region_name='theta', value=theta)
-        mock_qpu._update_variables_shim_with_recalculation_table()
-        assert any(np.isclose(v, 3 * theta) for v in mock_qpu._variables_shim.values())
-        assert any(np.isclose(v, theta + beta) for v in mock_qpu._variables_shim.values())
-        assert any(np.isclose(v, theta) for v in mock_qpu._variables_shim.values())
+        values = _recalculated_values(mock_qpu)
+        assert any(np.isclose(v, 3 * theta) for v in values)
+        assert any(np.isclose(v, theta + beta) for v in values)
+        assert np.isclose(mock_qpu._build_patch_values()['theta'][0] * 2 * np.pi, theta)
     bin = gate_arithmetic_binaries[2]
     mock_qpu.load(bin)
     beta = np.random.random()
     mock_qpu.write_memory(region_name='beta', value=beta)
     for theta in np.linspace(0, 1, 10):
         mock_qpu.write_memory(region_name='theta', value=theta)
-        mock_qpu._update_variables_shim_with_recalculation_table()
-        assert any(np.isclose(v, 4 * beta + 0.5 * theta) for v in mock_qpu._variables_shim.values())
+        values = _recalculated_values(mock_qpu)
+        assert any(np.isclose(v, 4 * beta + 0.5 * theta) for v in values)
 
 
-def test_resolve_mem_references(gate_arithmetic_binaries, mock_qpu):
+def test_evaluate_expressions(gate_arithmetic_binaries, mock_qpu):
     def expression_test(expression, expected_val):
-        expression = parse_expression(expression)
-        assert np.isclose(mock_qpu._resolve_memory_references(expression), expected_val)
+        compiled = mock_qpu._compile_expressions([parse_expression(expression)])
+        assert np.isclose(mock_qpu._evaluate(compiled).item(), expected_val)
 
     def test_theta_and_beta(theta, beta):
         mock_qpu.write_memory(region_name='theta', value=theta)
@@ -228,6 +235,33 @@ def test_resolve_mem_references(gate_arithmetic_binaries, mock_qpu):
         test_theta_and_beta(np.random.random(), np.random.random() + np.random.randint(-100, 100))
 
 
+def test_recalculation_without_compiler(mock_qpu):
+    executable = BinaryExecutableResponse(program='', memory_descriptors={
+        'theta': ParameterSpec(type='REAL', length=1),
+        'beta': ParameterSpec(type='REAL', length=2),
+        '__P': ParameterSpec(type='REAL', length=3),
+    })
+    executable.recalculation_table = {
+        ParameterAref(name='__P', index=0): '3*theta',
+        ParameterAref(name='__P', index=1): 'COS(beta[1]) - theta/2',
+        ParameterAref(name='__P', index=2): '1.5',
+    }
+    mock_qpu.load(executable)
+    assert all(isinstance(rule, (Expression, float))
+               for rule in executable.recalculation_table.values())
+    patch_values = mock_qpu._build_patch_values()
+    assert np.allclose(np.array(patch_values['__P']) * 2 * np.pi, [0, 1, 1.5])
+    mock_qpu.write_memory(region_name='theta', value=0.5)
+    mock_qpu.write_memory(region_name='beta', offset=1, value=0.25)
+    patch_values = mock_qpu._build_patch_values()
+    assert np.allclose(np.array(patch_values['__P']) * 2 * np.pi, [1.5, np.cos(0.25) - 0.25, 1.5])
+    assert patch_values['beta'] == [0.0, 0.25 / (2 * np.pi)]
+
+    executable.recalculation_table = {ParameterAref(name='__P', index=0): '%theta'}
+    with pytest.raises(ValueError):
+        mock_qpu.load(executable)
+
+
 def parse_expression(expression):
     """ We have to use this as a hack for now, RZ is meaningless. """
     return parse(f"RZ({expression}) 0")[0].params[0]
@@ -316,6 +316,19 @@ def test_qc_compile():
     assert prog1 == prog
 
 
+def test_qc_compile_peephole(caplog):
+    qc = QuantumComputer(name='testy!', qam=None, device=NxDevice(nx.complete_graph(2)),
+                         compiler=DummyCompiler())
+    prog = Program(H(0), X(1), X(1), RZ(0.5, 0), RZ(0.5, 0))
+    prog.wrap_in_numshots_loop(10)
+    assert qc.compile(prog) == prog
+    with caplog.at_level('INFO', logger='pyquil.api._quantum_computer'):
+        compiled = qc.compile(prog, peephole=True)
+    assert compiled == Program(H(0), RZ(1.0, 0))
+    assert compiled.num_shots == 10
+    assert 'removed 3 of 5 instructions' in caplog.text
+
+
 def test_qc_error():
     # QVM is not a QPU
     with pytest.raises(ValueError):
@@ -14,16 +14,20 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##############################################################################
+import copy
+import pickle
 import re
 from math import pi
 
 import numpy as np
 import pytest
 
+from pyquil.circuit_array import CircuitArray
 from pyquil.gates import I, X, Y, Z, H, T, S, RX, RY, RZ, CNOT, CCNOT, PHASE, CPHASE00, CPHASE01, \
     CPHASE10, CPHASE, SWAP, CSWAP, ISWAP, PSWAP, MEASURE, HALT, WAIT, NOP, RESET, \
     TRUE, FALSE, NOT, AND, OR, MOVE, EXCHANGE, \
     LOAD, CONVERT, STORE, XOR, IOR, NEG, ADD, SUB, MUL, DIV, EQ, GT, GE, LT, LE
+from pyquil.numpy_simulator import NumpyWavefunctionSimulator
 from pyquil.parameters import Parameter, quil_sin, quil_cos
 from pyquil.paulis import exponential_map, sZ
 from pyquil.quil import Program, merge_programs, merge_with_pauli_noise, address_qubits, \
@@ -38,6 +42,49 @@ def test_gate():
     assert tg.out() == "TEST 1 2"
 
 
+def test_gate_stores_tuples():
+    tg = Gate("TEST", qubits=(Qubit(1), Qubit(2)), params=[0.5])
+    assert tg.qubits == (Qubit(1), Qubit(2))
+    assert tg.params == (0.5,)
+    assert tg == Gate("TEST", qubits=[Qubit(1), Qubit(2)], params=(0.5,))
+
+
+def test_instructions_have_no_dict():
+    ro = MemoryReference('ro')
+    for obj in [RX(0.5, 0), MEASURE(0, ro), RESET(1), HALT, NOT(ro), ADD(ro, 1),
+                LOAD(ro, 'theta', ro), Declare('ro', 'BIT'), Pragma('NOISY', [0]),
+                Qubit(0), ro, Parameter('x'), quil_sin(Parameter('x')) + 1]:
+        assert not hasattr(obj, '__dict__'), obj
+        with pytest.raises(AttributeError):
+            obj.not_an_attribute = None
+
+
+def test_qubits_are_interned():
+    assert Qubit(3) is Qubit(3)
+    assert CNOT(0, 3).qubits[1] is Qubit(3)
+    with pytest.raises(TypeError):
+        Qubit(-1)
+    with pytest.raises(AttributeError):
+        Qubit(3).index = 4
+    assert Qubit(3).index == 3
+
+
+def test_pickle_and_copy():
+    p = Program(H(0), RX(Parameter('theta') * 2, 1).controlled(0), MEASURE(1, MemoryReference('ro')))
+    for copied in [pickle.loads(pickle.dumps(p)), copy.deepcopy(p)]:
+        assert copied == p
+        assert copied[1].qubits[0] is Qubit(0)
+
+
+def test_controlled_does_not_alias_qubits():
+    gate = X(1)
+    qubits = gate.qubits
+    controlled = gate.controlled(0)
+    assert qubits == (Qubit(1),)
+    assert controlled.qubits == (Qubit(0), Qubit(1))
+    assert controlled.out() == 'CONTROLLED X 0 1'
+
+
 def test_defgate():
     dg = DefGate("TEST", np.array([[1., 0.],
                                    [0., 1.]]))
@@ -160,6 +207,152 @@ def test_program_plus_program():
     assert r.out() == "X 0\nY 0\n"
 
 
+def test_concatenation_shares_instructions():
+    p = Program(X(0), X(1))
+    q = Program(Y(0))
+    r = p + q
+    s = r + p
+    # the operands are shared, not copied, until they are modified
+    assert r._shared_instructions is not None and r._own_instructions == []
+
+    p += Z(0)
+    r.pop()
+    s.inst(H(0))
+    assert p.out() == "X 0\nX 1\nZ 0\n"
+    assert q.out() == "Y 0\n"
+    assert r.out() == "X 0\nX 1\n"
+    assert s.out() == "X 0\nX 1\nY 0\nX 0\nX 1\nH 0\n"
+
+    c = s.copy()
+    c += q
+    assert c.out() == s.out() + "Y 0\n"
+
+
+def test_long_concatenation():
+    pieces = [Program(H(i % 3), CNOT(i % 3, (i + 1) % 3)) for i in range(3000)]
+    p = Program()
+    for piece in pieces:
+        p = p + piece
+    assert sum(pieces, Program()).out() == p.out()
+    assert len(p) == 6000
+    assert p[5999] == CNOT(2, 0)
+
+    # deep chains of shared instructions don't recurse when pickled or copied
+    p = Program()
+    for piece in pieces:
+        p = p + piece
+    assert pickle.loads(pickle.dumps(p)) == p
+    assert copy.deepcopy(p) == p
+
+
+def test_fingerprint():
+    p = Program(H(0), CNOT(0, 1))
+    q = Program(H(0))
+    q += CNOT(0, 1)
+    assert p.fingerprint() == q.fingerprint()
+    assert hash(p) == hash(q)
+    assert len({p, q, Program(H(0), CNOT(0, 1))}) == 1
+
+    # the fingerprint is extended as instructions are added and reset when they are removed
+    fingerprint = p.fingerprint()
+    p += X(1)
+    assert p.fingerprint() != fingerprint
+    p.pop()
+    assert p.fingerprint() == fingerprint
+
+    # instructions changed in place are hashed again
+    fingerprint = p.fingerprint()
+    p[1].controlled(2)
+    assert p.fingerprint() != fingerprint
+    assert p == Program(p.out()) and hash(p) == hash(Program(p.out()))
+    assert p + X(0) == Program(p.out()) + X(0)
+
+    # gate definitions are part of the fingerprint
+    dg = DefGate('MYX', np.array([[0, 1], [1, 0]]))
+    assert Program(dg, H(0), CNOT(0, 1)).fingerprint() != fingerprint
+
+
+def test_fingerprint_concatenation():
+    pieces = [Program(RX(0.1 * i, i % 3), CNOT(i % 3, (i + 1) % 3)) for i in range(50)]
+    for piece in pieces:
+        piece.fingerprint()
+    p = Program()
+    for piece in pieces:
+        p += piece
+    # combined from the fingerprints of the pieces
+    assert p._fingerprint_state.length == 100
+    expected = Program([instr for piece in pieces for instr in piece])
+    assert p.fingerprint() == expected.fingerprint()
+    assert p == expected
+
+
+def test_fingerprint_synthesized_instructions():
+    # equal programs have equal fingerprints, even if _synthesize changes what is serialized
+    with pytest.warns(UserWarning):
+        implicit = Program(H(0), MEASURE(0, MemoryReference('ro')))
+        assert implicit == Program(Declare('ro', 'BIT', 1), H(0), MEASURE(0, MemoryReference('ro')))
+        assert hash(implicit) == hash(Program(Declare('ro', 'BIT', 1), H(0),
+                                              MEASURE(0, MemoryReference('ro'))))
+
+    with_placeholders = Program()
+    with_placeholders.if_then(MemoryReference('ro'), Program(X(0)))
+    with_placeholders = Program(Declare('ro', 'BIT')) + with_placeholders
+    with_labels = Program(with_placeholders.out())
+    assert with_placeholders == with_labels
+    assert hash(with_placeholders) == hash(with_labels)
+
+
+def test_eq_short_circuits_on_fingerprint():
+    p = Program(H(0), CNOT(0, 1))
+    q = Program(H(0), CNOT(1, 0))
+    p.out = q.out = lambda: pytest.fail("out() should not be called")
+    assert p != q
+    assert p != 'H 0\nCNOT 0 1\n'
+
+
+def test_out_is_cached_and_extended():
+    p = Program(H(0), RX(pi / 2, 1))
+    assert p.out() == 'H 0\nRX(pi/2) 1\n'
+    assert p.out() is p.out()
+
+    p += CNOT(0, 1)
+    assert p.out() == 'H 0\nRX(pi/2) 1\nCNOT 0 1\n'
+    p.defgate('MYX', np.array([[0, 1], [1, 0]]))
+    assert p.out().startswith('DEFGATE MYX:\n')
+    assert p.out().endswith('H 0\nRX(pi/2) 1\nCNOT 0 1\n')
+    assert p.copy().out() == p.out()
+
+
+def test_out_cache_invalidation():
+    p = Program(H(0), CNOT(0, 1))
+    p.out()
+    p.pop()
+    assert p.out() == 'H 0\n'
+
+    gate = RX(pi, 0)
+    assert gate.out() == 'RX(pi) 0'
+    assert str(gate.dagger()) == 'DAGGER RX(pi) 0'
+    assert Program(gate).out() == 'DAGGER RX(pi) 0\n'
+
+    p = Program(MEASURE(0, ('ro', 0)))
+    p.out()
+    p += Declare('ro', 'BIT')
+    assert p.out() == 'MEASURE 0 ro[0]\nDECLARE ro BIT[1]\n'
+
+    # instructions changed in place are serialized again
+    p = Program(H(0), X(1), MEASURE(1, None))
+    p.out()
+    p.instructions[1].controlled(0)
+    assert p.out() == 'H 0\nCONTROLLED X 0 1\nMEASURE 1\n'
+    p[0].modifiers.append('DAGGER')
+    assert p[0].modifiers == ['DAGGER']
+    p[2].qubit = Qubit(2)
+    assert p.out() == 'DAGGER H 0\nCONTROLLED X 0 1\nMEASURE 2\n'
+    p[1].modifiers.clear()
+    p[1].qubits = (Qubit(1),)
+    assert p.out() == 'DAGGER H 0\nX 1\nMEASURE 2\n'
+
+
 def test_program_tuple():
     p = Program()
     p.inst(("Y", 0),
@@ -287,9 +480,12 @@ def test_measure_all():
 
 
 def test_dagger():
-    p = Program(X(0), H(0))
-    assert p.dagger().out() == 'DAGGER H 0\n' \
-                               'DAGGER X 0\n'
+    p = Program(X(0), H(0), S(1), RX(pi / 2, 0), CPHASE(Parameter('theta'), 0, 1))
+    assert p.dagger().out() == 'CPHASE(-1*%theta) 0 1\n' \
+                               'RX(-pi/2) 0\n' \
+                               'DAGGER S 1\n' \
+                               'H 0\n' \
+                               'X 0\n'
 
     p = Program(X(0), MEASURE(0, 0))
     with pytest.raises(ValueError) as e:
@@ -309,9 +505,41 @@ def test_dagger():
     p += PHASE(pi, target).controlled(control)
     p += CNOT(cnot_control, target).controlled(control)
 
-    for instr, instr_dagger in zip(reversed(p._instructions),
-                                   p.dagger()._instructions):
-        assert 'DAGGER ' + instr.out() == instr_dagger.out()
+    assert p.dagger().out() == 'CONTROLLED CNOT 0 2 1\n' \
+                               'CONTROLLED PHASE(-pi) 0 1\n' \
+                               'DAGGER CONTROLLED T 0 1\n' \
+                               'DAGGER CONTROLLED S 0 1\n' \
+                               'CONTROLLED H 0 1\n' \
+                               'CONTROLLED Z 0 1\n' \
+                               'CONTROLLED Y 0 1\n' \
+                               'CONTROLLED X 0 1\n'
+    assert p.dagger().dagger().out() == p.out().replace('CONTROLLED S', 'DAGGER DAGGER CONTROLLED S') \
+        .replace('CONTROLLED T', 'DAGGER DAGGER CONTROLLED T')
+
+
+def test_dagger_is_inverse():
+    p = Program(H(0), RX(0.3, 1), RY(0.2, 0).dagger(), CPHASE10(0.4, 1, 0), PSWAP(0.5, 0, 1),
+                ISWAP(0, 1), CCNOT(0, 1, 2), T(0).controlled(1), S(2).dagger())
+    state_prep = Program(RX(0.7, 0), RY(0.3, 1), H(2), CNOT(2, 0))
+    expected = NumpyWavefunctionSimulator(n_qubits=3).do_program(state_prep).wf
+    actual = NumpyWavefunctionSimulator(n_qubits=3).do_circuit(
+        CircuitArray.from_program(state_prep + p + p.dagger())).wf
+    np.testing.assert_allclose(actual, expected, atol=1e-12)
+
+    dg = DefGate('SQRT-X', np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]]) / 2)
+    daggered = Program(dg, dg.get_constructor()(1)).dagger()
+    assert daggered.defined_gates == [dg]
+    assert daggered.out().endswith('DAGGER SQRT-X 1\n')
+
+    # standard gate names shadowed by a definition are not inverted analytically
+    my_x = DefGate('X', np.array([[0, 1], [1j, 0]]))
+    assert Program(my_x, X(0)).dagger().out().endswith('DAGGER X 0\n')
+
+    # the instructions are not modified and placeholders are allowed
+    gate = RX(0.5, QubitPlaceholder())
+    p = Program(gate)
+    assert p.dagger()[0].params == (-0.5,)
+    assert p[0] is gate and gate.params == (0.5,) and gate.modifiers == []
 
 
 def test_construction_syntax():
@@ -7,7 +7,7 @@ from pyquil import Program
 from pyquil.gates import *
 from pyquil.pyqvm import PyQVM
 from pyquil.reference_simulator import (ReferenceDensitySimulator, _is_valid_quantum_state)
-from pyquil.unitary_tools import lifted_gate_matrix
+from pyquil.unitary_tools import lifted_gate_matrix, lifted_pauli
 from pyquil.paulis import sI, sX, sY, sZ
 from pyquil.device import NxDevice
 from pyquil.api import QuantumComputer
@@ -351,3 +351,12 @@ def test_is_valid_quantum_state():
     with pytest.raises(ValueError):
         # not Hermitian
         _is_valid_quantum_state(np.array([[0, 1], [1, 0]]))
+
+
+def test_expectation():
+    qam = PyQVM(n_qubits=2, quantum_simulator_type=ReferenceDensitySimulator)
+    qam.execute(Program(H(0), CNOT(0, 1), RX(0.3, 1)))
+    rho = qam.wf_simulator.density
+    for operator in [sZ(0) * sZ(1), 0.5 * sX(0) + sY(1), sI(0) - 2 * sZ(1)]:
+        expected = np.trace(rho @ lifted_pauli(operator, qubits=[0, 1]))
+        np.testing.assert_allclose(qam.wf_simulator.expectation(operator), expected)
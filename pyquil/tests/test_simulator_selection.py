@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from pyquil import Program
+from pyquil.gates import *
+from pyquil.numpy_simulator import NumpyWavefunctionSimulator
+from pyquil.pyqvm import PyQVM
+from pyquil.reference_simulator import ReferenceDensitySimulator, ReferenceWavefunctionSimulator
+from pyquil.simulator_selection import analyze_program, estimate_memory, select_simulator
+
+
+def test_analyze_program():
+    prog = Program(H(0), CNOT(0, 1), S(2).dagger(), RZ(np.pi, 3), X(4))
+    prog += Program("PRAGMA READOUT-POVM 4 \"(0.9 0.2 0.1 0.8)\"")
+    analysis = analyze_program(prog)
+    assert analysis.n_qubits == 5
+    assert analysis.n_gates == 5
+    assert analysis.is_clifford
+    assert analysis.noise_pragmas == ('READOUT-POVM',)
+    assert analysis.cluster_sizes == (2, 1, 1, 1)
+    assert analysis.max_entangled_qubits == 2
+
+
+@pytest.mark.parametrize('gate', [T(0), RX(0.3, 0), CCNOT(0, 1, 2), X(0).controlled(1)])
+def test_analyze_program_non_clifford(gate):
+    assert not analyze_program(Program(H(0), gate)).is_clifford
+
+
+def test_estimate_memory():
+    assert estimate_memory(NumpyWavefunctionSimulator, 10) == 2 * 16 * 2 ** 10
+    assert estimate_memory(ReferenceWavefunctionSimulator, 10) > \
+        estimate_memory(NumpyWavefunctionSimulator, 10)
+    assert estimate_memory(ReferenceDensitySimulator, 10) > \
+        estimate_memory(ReferenceWavefunctionSimulator, 10)
+
+
+def test_select_simulator():
+    analysis = analyze_program(Program(H(0), CNOT(0, 1)))
+    decision = select_simulator(analysis)
+    assert decision.simulator_type is NumpyWavefunctionSimulator
+    assert decision.n_qubits == 2
+    assert set(decision.candidates) == {'NumpyWavefunctionSimulator',
+                                        'ReferenceWavefunctionSimulator',
+                                        'ReferenceDensitySimulator'}
+
+    decision = select_simulator(analysis, noisy=True)
+    assert decision.simulator_type is ReferenceDensitySimulator
+    assert set(decision.candidates) == {'ReferenceDensitySimulator'}
+
+
+def test_select_simulator_memory_limit():
+    analysis = analyze_program(Program(H(q) for q in range(40)))
+    with pytest.raises(MemoryError):
+        select_simulator(analysis)
+
+    analysis = analyze_program(Program(H(0), H(1)))
+    with pytest.raises(MemoryError):
+        select_simulator(analysis, noisy=True, memory_limit=1000)
+    assert select_simulator(analysis, memory_limit=1000).memory_bytes <= 1000
+
+
+def test_pyqvm_auto():
+    prog = Program()
+    ro = prog.declare('ro', 'BIT', 2)
+    prog += X(3)
+    prog += CNOT(3, 5)
+    prog += MEASURE(3, ro[0])
+    prog += MEASURE(5, ro[1])
+
+    qam = PyQVM(n_qubits=6, quantum_simulator_type='auto')
+    bitstrings = qam.load(prog).run().wait().read_memory(region_name='ro')
+    np.testing.assert_array_equal(bitstrings, [[1, 1]])
+    assert qam.simulator_decision.simulator_type is NumpyWavefunctionSimulator
+    assert qam.simulator_decision.n_qubits == 2
+    assert qam.simulator_decision.analysis.is_clifford
+
+    qam = PyQVM(n_qubits=6, quantum_simulator_type='auto',
+                post_gate_noise_probabilities={'relaxation': 0.01})
+    qam.load(prog).run().wait()
+    assert qam.simulator_decision.simulator_type is ReferenceDensitySimulator
+    assert isinstance(qam.wf_simulator, ReferenceDensitySimulator)
@@ -13,15 +13,17 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##############################################################################
-from typing import Union, List
+from typing import Union, List, TYPE_CHECKING
 
 import numpy as np
 
 from pyquil.gate_matrices import SWAP, QUANTUM_GATES, STATES
-from pyquil.operator_estimation import TensorProductState
 from pyquil.paulis import PauliSum, PauliTerm
 from pyquil.quilbase import Gate
 
+if TYPE_CHECKING:
+    from pyquil.operator_estimation import TensorProductState
+
 
 def all_bitstrings(n_bits):
     """All bitstrings in lexicographical order as a 2d np.ndarray.
@@ -356,7 +358,7 @@ def tensor_up(pauli_sum: Union[PauliSum, PauliTerm], qubits: List[int]):
     return lifted_pauli(pauli_sum=pauli_sum, qubits=qubits)
 
 
-def lifted_state_operator(state: TensorProductState, qubits: List[int]):
+def lifted_state_operator(state: 'TensorProductState', qubits: List[int]):
     """Take a TensorProductState along with a list of qubits and return a matrix
     corresponding to the tensored-up representation of the states' density operator form.
 